@@ -0,0 +1,251 @@
+"""
+Bounded executor for CPU-heavy engine calls, with admission control.
+
+Jobs run on a fixed set of worker threads in two priority classes.
+Interactive lookups (timeline, risk, ego networks) always go first, and
+``COMPUTE_RESERVED_INTERACTIVE`` workers are kept free of batch analytics
+(kingpins, fraud rings, sweeps), so a large analytics request cannot
+starve field lookups.
+
+Each class has a queue limit; a full queue rejects at once (429 with
+Retry-After) instead of letting latency pile up. Every job carries a
+deadline. A job still queued at its deadline is dropped. A running job
+is cancelled at its next ``check_deadline()`` checkpoint; the array
+analytics (centrality, ring evolution, cycles, shared infrastructure)
+check once per batch, window or search step. The one library call
+without checkpoints, networkx community detection for fraud rings, runs
+to completion, but its result is discarded and the request has already
+been answered.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from enum import IntEnum
+from typing import Any, Callable, Dict, Optional
+import logging
+
+from config import settings
+from metrics import REGISTRY, Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+class ComputeRejected(Exception):
+    """The executor did not run the job; carries the HTTP status to answer with"""
+
+    status_code = 503
+
+    def __init__(self, message: str, retry_after: Optional[int] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(self.retry_after)} if self.retry_after else {}
+
+
+class Overloaded(ComputeRejected):
+    status_code = 429
+
+
+class Unavailable(ComputeRejected):
+    status_code = 503
+
+
+class DeadlineExceeded(ComputeRejected):
+    status_code = 504
+
+
+COMPUTE_QUEUED = REGISTRY.register(Gauge(
+    "synapsters_compute_queued", "Jobs waiting for a compute worker", ("priority",)))
+COMPUTE_RUNNING = REGISTRY.register(Gauge(
+    "synapsters_compute_running", "Jobs running on compute workers", ("priority",)))
+COMPUTE_REJECTED = REGISTRY.register(Counter(
+    "synapsters_compute_rejected", "Jobs refused or abandoned by the compute executor", ("priority", "reason")))
+COMPUTE_WAIT = REGISTRY.register(Histogram(
+    "synapsters_compute_queue_wait_seconds", "Time jobs spent queued before a worker picked them up", ("priority",)))
+
+
+class Job:
+    __slots__ = ("priority", "fn", "args", "kwargs", "deadline", "future", "enqueued", "cancelled")
+
+    def __init__(self, priority: Priority, fn: Callable, args: tuple, kwargs: dict, deadline: float):
+        self.priority = priority
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.deadline = deadline  # time.monotonic()
+        self.future: Future = Future()
+        self.enqueued = time.monotonic()
+        self.cancelled = False
+
+    def expired(self) -> bool:
+        return self.cancelled or time.monotonic() > self.deadline
+
+
+_current_job: contextvars.ContextVar[Optional[Job]] = contextvars.ContextVar("compute_job", default=None)
+
+
+def check_deadline():
+    """Cancellation point for long loops; a no-op outside the executor"""
+    job = _current_job.get()
+    if job is not None and job.expired():
+        raise DeadlineExceeded("Request exceeded its compute budget")
+
+
+class ComputeExecutor:
+    def __init__(
+        self,
+        workers: int,
+        reserved_interactive: int,
+        queue_limits: Dict[Priority, int],
+        budgets: Dict[Priority, float]
+    ):
+        self.workers = max(1, workers)
+        # Batch may use every worker but the reserved ones (and always at least one)
+        self.batch_workers = max(1, self.workers - reserved_interactive)
+        self.queue_limits = queue_limits
+        self.budgets = budgets
+        self._queues = {priority: deque() for priority in Priority}
+        self._running = {priority: 0 for priority in Priority}
+        self._cond = threading.Condition()
+        self._threads = []
+        self._stopping = False
+
+    def start(self):
+        with self._cond:
+            if self._threads:
+                return
+            self._stopping = False
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"compute-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        logger.info(f"✓ Compute executor started: {self.workers} workers ({self.batch_workers} for batch)")
+
+    def shutdown(self):
+        with self._cond:
+            self._stopping = True
+            for queue in self._queues.values():
+                while queue:
+                    future = queue.popleft().future
+                    if future.set_running_or_notify_cancel():
+                        future.set_exception(Unavailable("Compute executor shutting down"))
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self._threads = []
+
+    def submit(self, priority: Priority, fn: Callable, *args, budget: Optional[float] = None, **kwargs) -> Job:
+        """Queue a job or refuse it immediately"""
+        job = Job(priority, fn, args, kwargs, time.monotonic() + (budget or self.budgets[priority]))
+        with self._cond:
+            if self._stopping or not self._threads:
+                COMPUTE_REJECTED.inc(priority=priority.name.lower(), reason="unavailable")
+                raise Unavailable("Compute executor is not running")
+            queue = self._queues[priority]
+            if len(queue) >= self.queue_limits[priority]:
+                COMPUTE_REJECTED.inc(priority=priority.name.lower(), reason="queue_full")
+                # Rough time for the queue ahead to drain
+                raise Overloaded(
+                    f"Too many queued {priority.name.lower()} requests ({len(queue)}); retry later",
+                    retry_after=max(1, int(self.budgets[priority] * len(queue) / self.workers)),
+                )
+            queue.append(job)
+            COMPUTE_QUEUED.inc(priority=priority.name.lower())
+            self._cond.notify()
+        return job
+
+    async def run(self, priority: Priority, fn: Callable, *args, budget: Optional[float] = None, **kwargs) -> Any:
+        """Run ``fn`` on a compute worker and await it within the job's deadline"""
+        job = self.submit(priority, fn, *args, budget=budget, **kwargs)
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(job.future), timeout=max(0.0, job.deadline - time.monotonic())
+            )
+        except asyncio.TimeoutError:
+            job.cancelled = True
+            COMPUTE_REJECTED.inc(priority=priority.name.lower(), reason="deadline")
+            raise DeadlineExceeded(f"{getattr(fn, '__name__', 'job')} exceeded its {priority.name.lower()} budget")
+        except asyncio.CancelledError:
+            # Client went away: let the worker skip or abandon the job
+            job.cancelled = True
+            raise
+
+    def _next_job(self) -> Optional[Job]:
+        """Highest-priority runnable job; caller holds the lock"""
+        for priority in Priority:
+            if priority is Priority.BATCH and self._running[priority] >= self.batch_workers:
+                continue
+            queue = self._queues[priority]
+            while queue:
+                job = queue.popleft()
+                COMPUTE_QUEUED.dec(priority=priority.name.lower())
+                # False when the awaiting request already gave up on it
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                if not job.expired():
+                    return job
+                # Expired while queued: never start it
+                job.future.set_exception(DeadlineExceeded("Request expired while queued"))
+        return None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    if self._stopping:
+                        return
+                    self._cond.wait()
+                    job = self._next_job()
+                self._running[job.priority] += 1
+
+            label = job.priority.name.lower()
+            COMPUTE_WAIT.observe(time.monotonic() - job.enqueued, priority=label)
+            COMPUTE_RUNNING.inc(priority=label)
+            try:
+                context = contextvars.copy_context()
+                context.run(_current_job.set, job)
+                result = context.run(job.fn, *job.args, **job.kwargs)
+                job.future.set_result(result)
+            except BaseException as e:
+                job.future.set_exception(e)
+            finally:
+                COMPUTE_RUNNING.dec(priority=label)
+                with self._cond:
+                    self._running[job.priority] -= 1
+                    # A batch slot may have opened up
+                    self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "batch_workers": self.batch_workers,
+                "queued": {p.name.lower(): len(q) for p, q in self._queues.items()},
+                "running": {p.name.lower(): n for p, n in self._running.items()},
+            }
+
+
+compute_executor = ComputeExecutor(
+    workers=settings.COMPUTE_WORKERS,
+    reserved_interactive=settings.COMPUTE_RESERVED_INTERACTIVE,
+    queue_limits={
+        Priority.INTERACTIVE: settings.COMPUTE_QUEUE_INTERACTIVE,
+        Priority.BATCH: settings.COMPUTE_QUEUE_BATCH,
+    },
+    budgets={
+        Priority.INTERACTIVE: settings.COMPUTE_BUDGET_INTERACTIVE,
+        Priority.BATCH: settings.COMPUTE_BUDGET_BATCH,
+    },
+)
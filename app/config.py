@@ -48,13 +48,28 @@ class Settings(BaseSettings):
     FASTAPI_PORT: int = 8000
     DEBUG: bool = True
 
+    # -------------------------------
+    # Graph backend
+    # -------------------------------
+    GRAPH_BACKEND: str = "neo4j"          # "neo4j", or "embedded" for in-process SQLite
+    EMBEDDED_DB_PATH: str = ":memory:"    # File path to keep the embedded graph across restarts
+
     # -------------------------------
     # Neo4j Aura
     # -------------------------------
-    NEO4J_URI: str
-    NEO4J_USER: str
-    NEO4J_PASSWORD: str
+    NEO4J_URI: str = "bolt://localhost:7687"
+    NEO4J_USER: str = "neo4j"
+    NEO4J_PASSWORD: str = ""
     DATABASE_NAME: str = "neo4j"
+    QUERY_FETCH_SIZE: int = 1000   # Records pulled per round-trip when streaming
+
+    # Connection pool (per driver). Use a neo4j:// or neo4j+s:// URI on a
+    # cluster so reads are routed to followers.
+    NEO4J_MAX_POOL_SIZE: int = 100
+    NEO4J_ACQUISITION_TIMEOUT: float = 30.0        # Seconds to wait for a free connection
+    NEO4J_MAX_CONNECTION_LIFETIME: int = 3600      # Seconds before a connection is recycled
+    NEO4J_MAX_RETRY_TIME: float = 15.0             # Retry budget for transient errors
+    SLOW_QUERY_MS: int = 500   # Queries at least this slow go to the slow-query log
 
     # -------------------------------
     # Upload & Processing
@@ -63,6 +78,35 @@ class Settings(BaseSettings):
     MAX_UPLOAD_SIZE: int = 104857600   # 100 MB
     NUM_WORKERS: int = 4
     BATCH_SIZE: int = 32
+    THREADPOOL_SIZE: int = 40   # Worker threads for blocking Neo4j / analytics calls
+
+    # -------------------------------
+    # Analytics
+    # -------------------------------
+    PROJECTION_TTL_SECONDS: int = 300   # Max age of the in-memory graph projection
+
+    # Projection snapshots: memory-mapped at startup, then caught up with new ingest
+    PROJECTION_SNAPSHOT_DIR: str = ""              # e.g. ./data/projection; empty disables snapshots
+    PROJECTION_SNAPSHOT_KEEP: int = 2              # Snapshots kept per backend
+    PROJECTION_SNAPSHOT_MIN_DELTA: int = 100000    # Edges caught up before a fresh snapshot is written
+
+    # Compute executor: interactive lookups ahead of batch analytics
+    COMPUTE_WORKERS: int = 4
+    COMPUTE_RESERVED_INTERACTIVE: int = 1      # Workers batch analytics may never occupy
+    COMPUTE_QUEUE_INTERACTIVE: int = 64        # Queued jobs before rejecting with 429
+    COMPUTE_QUEUE_BATCH: int = 4
+    COMPUTE_BUDGET_INTERACTIVE: float = 15.0   # Seconds before a request is abandoned
+    COMPUTE_BUDGET_BATCH: float = 120.0
+
+    # Case workspaces: seed entities expanded into an in-memory subgraph
+    CASE_MAX_NODES: int = 250000       # Larger expansions are refused
+    CASE_MAX_WORKSPACES: int = 200     # Least recently used cases are dropped beyond this
+
+    # -------------------------------
+    # Responses
+    # -------------------------------
+    COMPRESSION_MIN_BYTES: int = 1024   # Smaller responses are sent uncompressed
+    COMPRESSION_LEVEL: int = 6          # gzip level (brotli quality is one lower)
 
     # Pydantic v2 config
     model_config = SettingsConfigDict(
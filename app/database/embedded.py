@@ -0,0 +1,384 @@
+"""
+Embedded graph store on SQLite.
+
+Nodes and relationships live in two tables in one process: an in-memory
+database by default (``EMBEDDED_DB_PATH=:memory:``) or a file on disk.
+There is no server and nothing to install, so CI and small field
+deployments run without Neo4j, and the projection loads straight from the
+local tables instead of over the network.
+
+Relationships are merged like the Cypher ``MERGE`` they replace: the
+properties the Neo4j backend merges on form a ``merge_key``, and a repeat
+of the same relationship is ignored. The row id of a relationship is its
+ingest watermark.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+import json
+import sqlite3
+import threading
+import logging
+
+from config import settings
+from database.instrumentation import observe_query
+from database.store import GraphStore, SWEEP_SIGNALS
+
+logger = logging.getLogger(__name__)
+
+# Bumped with every change to SCHEMA; recorded in PRAGMA user_version
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    id INTEGER PRIMARY KEY,
+    label TEXT NOT NULL,
+    key TEXT NOT NULL,
+    props TEXT NOT NULL DEFAULT '{}',
+    UNIQUE (label, key)
+);
+CREATE TABLE IF NOT EXISTS edges (
+    id INTEGER PRIMARY KEY,
+    src INTEGER NOT NULL REFERENCES nodes (id),
+    dst INTEGER NOT NULL REFERENCES nodes (id),
+    type TEXT NOT NULL,
+    ts INTEGER,          -- epoch seconds, UTC
+    amount REAL,
+    duration NUMERIC,
+    ref TEXT,            -- call_id / transaction_id
+    kind TEXT,           -- call_type / transaction_type
+    merge_key TEXT NOT NULL,
+    UNIQUE (src, dst, type, merge_key)
+);
+CREATE INDEX IF NOT EXISTS edges_src ON edges (src, type);
+CREATE INDEX IF NOT EXISTS edges_dst ON edges (dst, type);
+CREATE INDEX IF NOT EXISTS edges_type_ts ON edges (type, ts);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+MERGE_NODE_SQL = """
+INSERT INTO nodes (label, key, props) VALUES (?, ?, ?)
+ON CONFLICT (label, key) DO UPDATE SET props = json_patch(nodes.props, excluded.props)
+RETURNING id
+"""
+
+MERGE_EDGE_SQL = """
+INSERT OR IGNORE INTO edges (src, dst, type, ts, amount, duration, ref, kind, merge_key)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+EDGES_SQL = """
+SELECT e.id, s.key, d.key, s.label, d.label, e.type, e.ts, e.amount, e.duration
+FROM edges e JOIN nodes s ON s.id = e.src JOIN nodes d ON d.id = e.dst
+WHERE e.type IN (SELECT value FROM json_each(?)) AND e.id <= ? AND e.id > ?
+ORDER BY e.id LIMIT ?
+"""
+
+RELATIONS_SQL = """
+SELECT e.id, s.key, d.key, e.type, e.amount, e.duration
+FROM edges e JOIN nodes s ON s.id = e.src JOIN nodes d ON d.id = e.dst
+WHERE e.type IN (SELECT value FROM json_each(?)) AND e.id > ?
+ORDER BY e.id LIMIT ?
+"""
+
+SNAPSHOT_SQL = """
+SELECT s.id, d.id, s.label, d.label, s.key, d.key, e.type, e.amount, e.duration, e.ts
+FROM edges e JOIN nodes s ON s.id = e.src JOIN nodes d ON d.id = e.dst
+WHERE (? IS NULL OR e.ts >= ?) AND (? IS NULL OR e.ts <= ?)
+LIMIT ?
+"""
+
+TIMELINE_SQL = """
+WITH anchors AS (
+    SELECT id FROM nodes WHERE key = ? AND label IN ('Phone', 'BankAccount')
+),
+incident AS (
+    SELECT e.*, e.dst AS other FROM anchors a JOIN edges e ON e.src = a.id
+    UNION ALL
+    SELECT e.*, e.src AS other FROM anchors a JOIN edges e ON e.dst = a.id
+)
+SELECT i.type, o.key, i.ts, i.duration, i.amount, i.ref
+FROM incident i JOIN nodes o ON o.id = i.other
+{where}
+ORDER BY i.ts DESC
+"""
+
+CONNECTION_COUNTS_SQL = """
+WITH anchors AS (
+    SELECT id, key FROM nodes
+    WHERE label IN ('Phone', 'BankAccount') AND key IN (SELECT value FROM json_each(?))
+),
+ends AS (
+    SELECT a.key, e.dst AS other FROM anchors a JOIN edges e ON e.src = a.id
+    UNION ALL
+    SELECT a.key, e.src AS other FROM anchors a JOIN edges e ON e.dst = a.id
+)
+SELECT key, COUNT(DISTINCT other), COUNT(*) FROM ends GROUP BY key
+"""
+
+SWEEP_SQL = """
+WITH ends AS (
+    SELECT src AS node, amount FROM edges WHERE type = :relation
+    UNION ALL
+    SELECT dst AS node, amount FROM edges WHERE type = :relation
+)
+SELECT n.key, COUNT(*) AS count, TOTAL(ends.amount) AS total
+FROM ends JOIN nodes n ON n.id = ends.node
+WHERE n.label = :label
+GROUP BY n.id
+HAVING {value} > :threshold
+ORDER BY {value} DESC
+LIMIT :top_n
+"""
+
+
+def epoch(value: Optional[datetime]) -> Optional[int]:
+    """Naive-UTC (or aware) datetime to epoch seconds"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def from_epoch(value: Optional[int]) -> Optional[datetime]:
+    return None if value is None else datetime.utcfromtimestamp(value)
+
+
+class EmbeddedStore(GraphStore):
+    """``GraphStore`` on a single SQLite connection shared by all threads.
+
+    SQLite serialises writers anyway, so one connection behind a lock is
+    as fast as a pool here and is the only option for ``:memory:``.
+    """
+
+    backend = "embedded"
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA synchronous = NORMAL")
+        self.schema_version = self._migrate()
+        logger.info(f"✓ Embedded graph store opened at {path} (schema version {self.schema_version})")
+
+    def _migrate(self) -> int:
+        with self._lock:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < SCHEMA_VERSION:
+                self._conn.executescript(SCHEMA)
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                version = SCHEMA_VERSION
+            return version
+
+    def _read(self, name: str, sql: str, params=()) -> List[tuple]:
+        with observe_query(name, sql, "read", params if isinstance(params, dict) else None) as observed:
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+            observed.rows = len(rows)
+            return rows
+
+    def _paged(self, name: str, sql: str, params: tuple, after: int = 0) -> Iterator[tuple]:
+        """Keyset-paginate a query whose first column is the edge id.
+
+        The lock is only held per page, so ingest can interleave with a
+        long projection load instead of waiting for it.
+        """
+        fetch_size = settings.QUERY_FETCH_SIZE
+        last = after
+        with observe_query(name, sql, "read") as observed:
+            while True:
+                with self._lock:
+                    page = self._conn.execute(sql, params + (last, fetch_size)).fetchall()
+                observed.rows += len(page)
+                for row in page:
+                    yield row[1:]
+                if len(page) < fetch_size:
+                    return
+                last = page[-1][0]
+
+    def _node(self, label: str, key: str, props: Optional[Dict[str, Any]] = None) -> int:
+        """Merge a node inside the caller's transaction; returns its row id"""
+        return self._conn.execute(MERGE_NODE_SQL, (label, key, json.dumps(props or {}))).fetchone()[0]
+
+    def _merge(self, name: str, build):
+        """``build(node)`` returns the edge rows to insert, merging nodes as it goes"""
+        with observe_query(name, MERGE_EDGE_SQL, "write") as observed, self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                edges = build(self._node)
+                self._conn.executemany(MERGE_EDGE_SQL, edges)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            observed.rows = len(edges)
+
+    # ------------------------------------------------------------------
+    # Lifecycle and versioning
+    # ------------------------------------------------------------------
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+        logger.info("✓ Embedded graph store closed")
+
+    def ping(self) -> bool:
+        return len(self._read("health", "SELECT 1")) > 0
+
+    def graph_version(self) -> int:
+        rows = self._read("graph_version", "SELECT value FROM meta WHERE key = 'graph'")
+        return rows[0][0] if rows else 0
+
+    def bump_graph_version(self) -> int:
+        sql = """
+        INSERT INTO meta (key, value) VALUES ('graph', 1)
+        ON CONFLICT (key) DO UPDATE SET value = value + 1
+        RETURNING value
+        """
+        with observe_query("graph_version.bump", sql, "write"), self._lock:
+            return self._conn.execute(sql).fetchone()[0]
+
+    def ingest_watermark(self) -> int:
+        return self._read("ingest_watermark", "SELECT COALESCE(MAX(id), 0) FROM edges")[0][0]
+
+    # ------------------------------------------------------------------
+    # Ingest
+    # ------------------------------------------------------------------
+
+    def merge_call(self, from_phone, to_phone, call_id, duration, timestamp, call_type):
+        ts = epoch(timestamp)
+        key = json.dumps([call_id, duration, ts, call_type])
+        self._merge("etl.calls", lambda node: [(
+            node('Phone', from_phone), node('Phone', to_phone), 'MADE',
+            ts, None, duration, call_id, call_type, key
+        )])
+
+    def merge_transaction(self, from_account, to_account, transaction_id, amount, timestamp, transaction_type):
+        ts = epoch(timestamp)
+        key = json.dumps([transaction_id, amount, ts, transaction_type])
+        self._merge("etl.transactions", lambda node: [(
+            node('BankAccount', from_account), node('BankAccount', to_account), 'SENT',
+            ts, amount, None, transaction_id, transaction_type, key
+        )])
+
+    def merge_device(self, device_id, ip, phone, device_type, imei, timestamp):
+        ts = epoch(timestamp)
+
+        def build(node):
+            device = node('Device', device_id, {'device_type': device_type, 'imei': imei})
+            edges = [(device, node('IP', ip), 'CONNECTS_VIA', ts, None, None, None, None, json.dumps([ts]))]
+            if phone:
+                edges.append((node('Phone', phone), device, 'RUNS_ON', None, None, None, None, None, '[]'))
+            return edges
+
+        self._merge("etl.devices", build)
+
+    def merge_sim(self, sim_number, phone, provider, activation_date):
+        def build(node):
+            sim = node('SIM', sim_number, {
+                'provider': provider,
+                'activation_date': activation_date.isoformat() if activation_date else None,
+            })
+            if not phone:
+                return []
+            return [(node('Phone', phone), sim, 'HAS_SIM', None, None, None, None, None, '[]')]
+
+        self._merge("etl.sims", build)
+
+    def merge_complaint(self, complaint_id, person_id, complaint_type, description, timestamp, severity):
+        def build(node):
+            complaint = node('Complaint', complaint_id, {
+                'complaint_type': complaint_type,
+                'description': description,
+                'timestamp': timestamp.isoformat(),
+                'severity': severity,
+            })
+            if not person_id:
+                return []
+            return [(node('Person', person_id), complaint, 'INVOLVED_IN', None, None, None, None, None, '[]')]
+
+        self._merge("etl.complaints", build)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def stream_edges(self, relations, after=None, upto=None):
+        upto = self.ingest_watermark() if upto is None else upto
+        name = "projection.edges" if after is None else "projection.delta"
+        return self._paged(name, EDGES_SQL, (json.dumps(list(relations)), upto), after=after or 0)
+
+    def stream_relations(self, relations, name=None):
+        return self._paged(name or "relations.edges", RELATIONS_SQL, (json.dumps(list(relations)),))
+
+    def snapshot_edges(self, limit, since, until):
+        lo, hi = epoch(since), epoch(until)
+        rows = self._read("graph_snapshot", SNAPSHOT_SQL, (lo, lo, hi, hi, limit))
+        return [
+            {
+                "source_id": source_id,
+                "target_id": target_id,
+                "source_label": source_label,
+                "target_label": target_label,
+                "source_entity": source_entity,
+                "target_entity": target_entity,
+                "relation": relation,
+                "amount": amount,
+                "duration": duration,
+                "timestamp": from_epoch(ts),
+            }
+            for source_id, target_id, source_label, target_label, source_entity, target_entity,
+                relation, amount, duration, ts in rows
+        ]
+
+    def timeline(self, entity_id, since, until):
+        # Untimestamped relationships (SIM, device, ownership) are kept under a bound
+        bounds = [(f"i.ts {op} ?", epoch(value)) for op, value in ((">=", since), ("<=", until)) if value is not None]
+        where = f"WHERE i.ts IS NULL OR ({' AND '.join(p for p, _ in bounds)})" if bounds else ""
+        rows = self._read("timeline", TIMELINE_SQL.format(where=where), (entity_id, *(v for _, v in bounds)))
+        return [
+            {
+                "relation": relation,
+                "to_entity": to_entity,
+                "timestamp": from_epoch(ts),
+                "duration": duration,
+                "amount": amount,
+                "call_id": ref if relation == 'MADE' else None,
+                "transaction_id": ref if relation == 'SENT' else None,
+            }
+            for relation, to_entity, ts, duration, amount, ref in rows
+        ]
+
+    def connection_counts(self, entity_ids):
+        rows = self._read("risk.connection_counts", CONNECTION_COUNTS_SQL, (json.dumps(list(entity_ids)),))
+        return [
+            {"entity_id": key, "connection_count": connections, "event_count": events}
+            for key, connections, events in rows
+        ]
+
+    def anomaly_sweep(self, signal, threshold, top_n):
+        label, relation, detail = SWEEP_SIGNALS[signal]
+        money = signal == 'money_movement'
+        sql = SWEEP_SQL.format(value="total" if money else "count")
+        rows = self._read(f"anomaly_sweep.{signal}", sql, {
+            'relation': relation, 'label': label, 'threshold': threshold, 'top_n': top_n
+        })
+        results = []
+        for key, count, total in rows:
+            value = total if money else count
+            details = {detail: value}
+            if money:
+                details['transaction_count'] = count
+            results.append({'entity_id': key, 'value': value, 'details': details})
+        return results
+
+    def count_breakdown(self):
+        nodes = dict(self._read("stats.nodes", "SELECT label, COUNT(*) FROM nodes GROUP BY label"))
+        relationships = dict(self._read("stats.relationships", "SELECT type, COUNT(*) FROM edges GROUP BY type"))
+        return nodes, relationships
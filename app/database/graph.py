@@ -91,13 +91,97 @@
 #         _neo4j = None
 
 
-from neo4j import GraphDatabase
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, AsyncIterator, Union
+from datetime import datetime
+from functools import lru_cache
+import asyncio
+import threading
 from config import settings
+from database.instrumentation import observe_query, summary_timing_ms, summarize_profile
+from database.migrations import migrate, LATEST_VERSION
+from database.store import GraphStore
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Session access modes (neo4j.READ_ACCESS / WRITE_ACCESS). The driver itself is
+# imported on connect: it loads pandas when installed, which startup never needs.
+READ_ACCESS, WRITE_ACCESS = "READ", "WRITE"
+
+# The graph version lives on a single meta node and is bumped after every
+# write batch, so caches of whole-graph results can tell when they are stale
+GRAPH_META_LABEL = "GraphMeta"
+
+GRAPH_VERSION_QUERY = """
+OPTIONAL MATCH (m:GraphMeta {key: 'graph'})
+RETURN coalesce(m.version, 0) AS version
+"""
+
+BUMP_GRAPH_VERSION_QUERY = """
+MERGE (m:GraphMeta {key: 'graph'})
+SET m.version = coalesce(m.version, 0) + 1, m.updated_at = datetime()
+RETURN m.version AS version
+"""
+
+
+def driver_config() -> Dict[str, Any]:
+    """Connection pool and retry settings shared by the sync and async drivers"""
+    return {
+        "max_connection_pool_size": settings.NEO4J_MAX_POOL_SIZE,
+        "connection_acquisition_timeout": settings.NEO4J_ACQUISITION_TIMEOUT,
+        "max_connection_lifetime": settings.NEO4J_MAX_CONNECTION_LIFETIME,
+        "max_transaction_retry_time": settings.NEO4J_MAX_RETRY_TIME,
+    }
+
+
+def pool_snapshot(driver) -> Dict[str, Any]:
+    """Per-server connection counts read from the driver's pool.
+
+    The driver has no public pool metrics, so this inspects its pool
+    defensively and reports nothing rather than failing.
+    """
+    pool = getattr(driver, "_pool", None)
+    servers = {}
+    try:
+        for address, connections in list(pool.connections.items()):
+            in_use = pool.in_use_connection_count(address)
+            servers[str(address)] = {
+                "open": len(connections),
+                "in_use": in_use,
+                "idle": len(connections) - in_use,
+            }
+    except Exception:
+        pass
+    return servers
+
+
+class QueryCounters:
+    """In-flight and completed query counts per access mode"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = {"read": 0, "write": 0}
+        self.completed = {"read": 0, "write": 0}
+        self.retries = {"read": 0, "write": 0}
+
+    def start(self, mode: str):
+        with self._lock:
+            self.in_flight[mode] += 1
+
+    def finish(self, mode: str, attempts: int):
+        with self._lock:
+            self.in_flight[mode] -= 1
+            self.completed[mode] += 1
+            self.retries[mode] += max(0, attempts - 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": dict(self.in_flight),
+                "completed": dict(self.completed),
+                "retries": dict(self.retries),
+            }
+
 class Neo4jConnection:
     """Neo4j Graph Database Connection Manager (Aura compatible)"""
 
@@ -107,14 +191,18 @@ class Neo4jConnection:
         self.password = password
         self.database = database
         self.driver = None
+        self.counters = QueryCounters()
 
     def connect(self):
         """Establish connection to Neo4j Aura"""
         try:
+            from neo4j import GraphDatabase
+
             # DO NOT pass encrypted / ssl / trust for Aura
             self.driver = GraphDatabase.driver(
                 self.uri,
                 auth=(self.user, self.password),
+                **driver_config(),
             )
 
             # Verify connection
@@ -132,17 +220,125 @@ class Neo4jConnection:
             self.driver.close()
             logger.info("✓ Neo4j connection closed")
 
-    def execute_query(self, query: str, params: Dict[str, Any] = None) -> List[Dict]:
+    def execute_query(self, query: str, params: Dict[str, Any] = None, name: Optional[str] = None) -> List[Dict]:
         """Execute a Cypher query"""
         if not self.driver:
             raise RuntimeError("Database connection not established")
 
-        with self.driver.session(database=self.database) as session:
+        with observe_query(name, query, "auto", params) as observed:
+            with self.driver.session(database=self.database) as session:
+                result = session.run(query, params or {})
+                records = [record.data() for record in result]
+                observed.rows = len(records)
+                observed.db_ms = summary_timing_ms(result.consume())
+                return records
+
+    def _execute_managed(self, mode: str, query: str, params: Dict[str, Any], name: Optional[str]) -> List[Dict]:
+        if not self.driver:
+            raise RuntimeError("Database connection not established")
+
+        attempts = 0
+
+        with observe_query(name, query, mode, params) as observed:
+
+            def work(tx):
+                nonlocal attempts
+                attempts += 1
+                result = tx.run(query, params or {})
+                records = [record.data() for record in result]
+                observed.rows = len(records)
+                observed.db_ms = summary_timing_ms(result.consume())
+                return records
+
+            access_mode = READ_ACCESS if mode == "read" else WRITE_ACCESS
+            self.counters.start(mode)
+            try:
+                with self.driver.session(database=self.database, default_access_mode=access_mode) as session:
+                    if mode == "read":
+                        return session.execute_read(work)
+                    return session.execute_write(work)
+            finally:
+                self.counters.finish(mode, attempts)
+
+    def execute_read(self, query: str, params: Dict[str, Any] = None, name: Optional[str] = None) -> List[Dict]:
+        """Run a read in a managed transaction, retried on transient errors.
+
+        On a cluster (``neo4j://`` / ``neo4j+s://`` URIs) reads are routed
+        to followers and read replicas. ``name`` labels the query in the
+        instrumentation; unnamed queries are keyed by a hash of their text.
+        """
+        return self._execute_managed("read", query, params, name)
+
+    def execute_write(self, query: str, params: Dict[str, Any] = None, name: Optional[str] = None) -> List[Dict]:
+        """Run a write in a managed transaction on the leader, retried on transient errors"""
+        return self._execute_managed("write", query, params, name)
+
+    def profile(self, query: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """PROFILE a read query and summarise its plan.
+
+        Runs in a read transaction, so a query that writes is rejected by
+        the server instead of being executed.
+        """
+        if not self.driver:
+            raise RuntimeError("Database connection not established")
+
+        def work(tx):
+            result = tx.run("PROFILE " + query, params or {})
+            return result.consume()
+
+        with self.driver.session(database=self.database, default_access_mode=READ_ACCESS) as session:
+            summary = session.execute_read(work)
+        return {**summarize_profile(summary.profile or {}), "db_ms": summary_timing_ms(summary)}
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Pool configuration, per-server connection usage and query counters"""
+        return {
+            "max_pool_size": settings.NEO4J_MAX_POOL_SIZE,
+            "servers": pool_snapshot(self.driver) if self.driver else {},
+            **self.counters.snapshot(),
+        }
+
+    def graph_version(self) -> int:
+        """Current graph version (0 before the first write batch)"""
+        return self.execute_read(GRAPH_VERSION_QUERY, name="graph_version")[0]["version"]
+
+    def bump_graph_version(self) -> int:
+        """Mark the graph as modified; call once after each write batch"""
+        return self.execute_write(BUMP_GRAPH_VERSION_QUERY, name="graph_version.bump")[0]["version"]
+
+    def stream_query(
+        self,
+        query: str,
+        params: Dict[str, Any] = None,
+        fetch_size: Optional[int] = None,
+        as_tuples: bool = False,
+        name: Optional[str] = None
+    ) -> Iterator[Union[Dict, tuple]]:
+        """Yield records lazily, pulling ``fetch_size`` at a time from the server.
+
+        With ``as_tuples`` each record is a tuple in RETURN order, which skips
+        building a dict per row. The session stays open until the generator
+        is exhausted or closed.
+        """
+        if not self.driver:
+            raise RuntimeError("Database connection not established")
+
+        fetch_size = fetch_size or settings.QUERY_FETCH_SIZE
+        # Auto-commit so records can be yielded as they arrive; still routed as a read
+        with observe_query(name, query, "read", params) as observed, \
+                self.driver.session(database=self.database, fetch_size=fetch_size,
+                                    default_access_mode=READ_ACCESS) as session:
             result = session.run(query, params or {})
-            return [record.data() for record in result]
+            # Records are tuples already, so as_tuples hands them out as they arrive.
+            # The recorded wall time includes the consumer's work between pulls.
+            for record in result:
+                observed.rows += 1
+                yield record if as_tuples else record.data()
+            observed.db_ms = summary_timing_ms(result.consume())
 
-    def create_indexes(self):
-        """Create database indexes for performance"""
+    def create_indexes(self) -> List[str]:
+        """Create database indexes for performance; returns the statements that failed"""
+        failures = []
         queries = [
             "CREATE INDEX person_id IF NOT EXISTS FOR (p:Person) ON (p.id)",
             "CREATE INDEX phone_id IF NOT EXISTS FOR (p:Phone) ON (p.phone_number)",
@@ -151,14 +347,581 @@ class Neo4jConnection:
             "CREATE INDEX ip_id IF NOT EXISTS FOR (i:IP) ON (i.ip_address)",
             "CREATE INDEX account_id IF NOT EXISTS FOR (b:BankAccount) ON (b.account_number)",
             "CREATE INDEX complaint_id IF NOT EXISTS FOR (c:Complaint) ON (c.complaint_id)",
+            # Range indexes for time-bounded queries
+            "CREATE INDEX made_timestamp IF NOT EXISTS FOR ()-[r:MADE]-() ON (r.timestamp)",
+            "CREATE INDEX sent_timestamp IF NOT EXISTS FOR ()-[r:SENT]-() ON (r.timestamp)",
+            "CREATE INDEX connects_via_timestamp IF NOT EXISTS FOR ()-[r:CONNECTS_VIA]-() ON (r.timestamp)",
+            "CREATE INDEX complaint_timestamp IF NOT EXISTS FOR (c:Complaint) ON (c.timestamp)",
+            "CREATE INDEX sim_activation IF NOT EXISTS FOR (s:SIM) ON (s.activation_date)",
+            "CREATE CONSTRAINT graph_meta_key IF NOT EXISTS FOR (m:GraphMeta) REQUIRE m.key IS UNIQUE",
         ]
 
         for query in queries:
             try:
-                self.execute_query(query)
+                self.execute_query(query, name="schema.create_index")
                 logger.info(f"✓ Index ensured")
             except Exception as e:
                 logger.warning(f"Index creation warning: {e}")
+                failures.append(query)
+
+        return failures
+
+    def create_ingest_indexes(self) -> List[str]:
+        """Range indexes on the ingest watermark for projection catch-up; returns the statements that failed"""
+        failures = []
+        relations = ('MADE', 'SENT', 'USES', 'OWNS', 'RUNS_ON', 'HAS_SIM', 'CONNECTS_VIA', 'INVOLVED_IN')
+
+        for relation in relations:
+            query = (f"CREATE INDEX {relation.lower()}_ingest_version IF NOT EXISTS "
+                     f"FOR ()-[r:{relation}]-() ON (r.ingest_version)")
+            try:
+                self.execute_query(query, name="schema.create_index")
+                logger.info(f"✓ Ingest index ensured: {relation}")
+            except Exception as e:
+                logger.warning(f"Index creation warning: {e}")
+                failures.append(query)
+
+        return failures
+
+    def migrate_timestamps(self) -> List[str]:
+        """Convert legacy string timestamps to native LocalDateTime values; returns failed targets"""
+        failures = []
+        # ISO strings may be date-only or carry an offset; normalise to naive UTC.
+        # =~ is null for values that are already temporal, so they are skipped
+        # without IS :: STRING, which needs Neo4j 5.9
+        to_local = """
+        localdatetime({{datetime: datetime({{epochMillis: datetime(
+            CASE WHEN size({0}) = 10 THEN {0} + 'T00:00:00' ELSE {0} END
+        ).epochMillis}})}})
+        """
+        targets = [
+            ("()-[x:MADE]->()", "x.timestamp"),
+            ("()-[x:SENT]->()", "x.timestamp"),
+            ("()-[x:CONNECTS_VIA]->()", "x.timestamp"),
+            ("(x:Complaint)", "x.timestamp"),
+            ("(x:SIM)", "x.activation_date"),
+        ]
+
+        for pattern, prop in targets:
+            query = f"""
+            MATCH {pattern}
+            WHERE {prop} =~ '[0-9]{{4}}-[0-9]{{2}}-[0-9]{{2}}.*'
+            CALL {{
+                WITH x
+                SET {prop} = {to_local.format(prop)}
+            }} IN TRANSACTIONS OF 10000 ROWS
+            """
+            try:
+                self.execute_query(query, name="migrate.timestamps")
+                logger.info(f"✓ Timestamps migrated: {pattern} {prop}")
+            except Exception as e:
+                logger.warning(f"Timestamp migration warning: {e}")
+                failures.append(f"{pattern} {prop}")
+
+        return failures
+
+
+class AsyncNeo4jConnection:
+    """Neo4j connection on the async driver, for queries issued from the event loop"""
+
+    def __init__(self, uri: str, user: str, password: str, database: str):
+        self.uri = uri
+        self.user = user
+        self.password = password
+        self.database = database
+        self.driver = None
+        self.counters = QueryCounters()
+
+    async def connect(self):
+        """Establish the async connection"""
+        try:
+            from neo4j import AsyncGraphDatabase
+
+            self.driver = AsyncGraphDatabase.driver(
+                self.uri,
+                auth=(self.user, self.password),
+                **driver_config(),
+            )
+            await self.driver.verify_connectivity()
+            logger.info("✓ Async Neo4j driver connected")
+        except Exception as e:
+            logger.error(f"✗ Failed to connect async Neo4j driver: {e}")
+            raise
+
+    async def close(self):
+        """Close connection"""
+        if self.driver:
+            await self.driver.close()
+            logger.info("✓ Async Neo4j connection closed")
+
+    async def execute_query(self, query: str, params: Dict[str, Any] = None, name: Optional[str] = None) -> List[Dict]:
+        """Execute a Cypher query without blocking the event loop"""
+        if not self.driver:
+            raise RuntimeError("Database connection not established")
+
+        with observe_query(name, query, "auto", params) as observed:
+            async with self.driver.session(database=self.database) as session:
+                result = await session.run(query, params or {})
+                records = [record.data() async for record in result]
+                observed.rows = len(records)
+                observed.db_ms = summary_timing_ms(await result.consume())
+                return records
+
+    async def _execute_managed(self, mode: str, query: str, params: Dict[str, Any], name: Optional[str]) -> List[Dict]:
+        if not self.driver:
+            raise RuntimeError("Database connection not established")
+
+        attempts = 0
+
+        with observe_query(name, query, mode, params) as observed:
+
+            async def work(tx):
+                nonlocal attempts
+                attempts += 1
+                result = await tx.run(query, params or {})
+                records = [record.data() async for record in result]
+                observed.rows = len(records)
+                observed.db_ms = summary_timing_ms(await result.consume())
+                return records
+
+            access_mode = READ_ACCESS if mode == "read" else WRITE_ACCESS
+            self.counters.start(mode)
+            try:
+                async with self.driver.session(database=self.database, default_access_mode=access_mode) as session:
+                    if mode == "read":
+                        return await session.execute_read(work)
+                    return await session.execute_write(work)
+            finally:
+                self.counters.finish(mode, attempts)
+
+    async def execute_read(self, query: str, params: Dict[str, Any] = None, name: Optional[str] = None) -> List[Dict]:
+        """Managed read transaction, routed to followers on a cluster"""
+        return await self._execute_managed("read", query, params, name)
+
+    async def execute_write(self, query: str, params: Dict[str, Any] = None, name: Optional[str] = None) -> List[Dict]:
+        """Managed write transaction on the leader"""
+        return await self._execute_managed("write", query, params, name)
+
+    async def profile(self, query: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Async counterpart of ``Neo4jConnection.profile``"""
+        if not self.driver:
+            raise RuntimeError("Database connection not established")
+
+        async def work(tx):
+            result = await tx.run("PROFILE " + query, params or {})
+            return await result.consume()
+
+        async with self.driver.session(database=self.database, default_access_mode=READ_ACCESS) as session:
+            summary = await session.execute_read(work)
+        return {**summarize_profile(summary.profile or {}), "db_ms": summary_timing_ms(summary)}
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Pool configuration, per-server connection usage and query counters"""
+        return {
+            "max_pool_size": settings.NEO4J_MAX_POOL_SIZE,
+            "servers": pool_snapshot(self.driver) if self.driver else {},
+            **self.counters.snapshot(),
+        }
+
+    async def graph_version(self) -> int:
+        """Current graph version (0 before the first write batch)"""
+        return (await self.execute_read(GRAPH_VERSION_QUERY, name="graph_version"))[0]["version"]
+
+    async def stream_query(
+        self,
+        query: str,
+        params: Dict[str, Any] = None,
+        fetch_size: Optional[int] = None,
+        as_tuples: bool = False,
+        name: Optional[str] = None
+    ) -> AsyncIterator[Union[Dict, tuple]]:
+        """Async counterpart of ``Neo4jConnection.stream_query``"""
+        if not self.driver:
+            raise RuntimeError("Database connection not established")
+
+        fetch_size = fetch_size or settings.QUERY_FETCH_SIZE
+        with observe_query(name, query, "read", params) as observed:
+            async with self.driver.session(database=self.database, fetch_size=fetch_size,
+                                           default_access_mode=READ_ACCESS) as session:
+                result = await session.run(query, params or {})
+                async for record in result:
+                    observed.rows += 1
+                    yield record if as_tuples else record.data()
+                observed.db_ms = summary_timing_ms(await result.consume())
+
+
+# ------------------------------------------------------------------
+# Graph store on Neo4j
+# ------------------------------------------------------------------
+
+# Entity key of a node, by label
+ENTITY_KEY = "coalesce({0}.phone_number, {0}.account_number, {0}.device_id, {0}.sim_number, {0}.id, {0}.ip_address, {0}.complaint_id, toString(id({0})))"
+
+PROJECTION_RETURNS = f"""
+RETURN {ENTITY_KEY.format('n')} as source,
+       {ENTITY_KEY.format('m')} as target,
+       labels(n)[0] as source_label,
+       labels(m)[0] as target_label,
+       type(r) as relation,
+       CASE WHEN r.timestamp IS NULL THEN NULL
+            ELSE datetime({{datetime: r.timestamp, timezone: 'UTC'}}).epochSeconds END as ts,
+       r.amount as amount,
+       r.duration as duration
+"""
+
+# Relationships written before ingest stamping count as watermark 0
+PROJECTION_EDGES_QUERY = f"""
+MATCH (n)-[r]->(m)
+WHERE type(r) IN $relations AND coalesce(r.ingest_version, 0) <= $upto
+{PROJECTION_RETURNS}
+"""
+
+# One typed branch per relationship, so each hits its ingest_version index
+PROJECTION_DELTA_BRANCH = f"""
+MATCH (n)-[r:{{relation}}]->(m)
+WHERE r.ingest_version > $after AND r.ingest_version <= $upto
+{PROJECTION_RETURNS}
+"""
+
+RELATIONS_QUERY = """
+MATCH (n1)-[r]->(n2)
+WHERE type(r) IN $relations
+RETURN coalesce(n1.phone_number, n1.account_number, toString(id(n1))) as from_node,
+       coalesce(n2.phone_number, n2.account_number, toString(id(n2))) as to_node,
+       type(r) as relation_type, r.amount as amount,
+       r.duration as duration
+"""
+
+SNAPSHOT_RETURNS = """
+RETURN id(n) as source_id,
+       id(m) as target_id,
+       labels(n)[0] as source_label,
+       labels(m)[0] as target_label,
+       coalesce(n.phone_number, n.account_number, n.device_id, n.sim_number, n.person_id, n.ip_address, n.complaint_id, toString(id(n))) as source_entity,
+       coalesce(m.phone_number, m.account_number, m.device_id, m.sim_number, m.person_id, m.ip_address, m.complaint_id, toString(id(m))) as target_entity,
+       type(r) as relation,
+       r.amount as amount,
+       r.duration as duration,
+       r.timestamp as timestamp
+LIMIT $limit
+"""
+
+# One typed branch per timestamped relationship so each is a range index seek
+SNAPSHOT_WINDOW = "WHERE r.timestamp >= $since AND r.timestamp <= $until RETURN n, r, m"
+
+SNAPSHOT_QUERY = """
+MATCH (n)-[r]->(m)
+WHERE type(r) IN ['MADE','SENT','USES','OWNS','RUNS_ON','HAS_SIM','CONNECTS_VIA','INVOLVED_IN']
+""" + SNAPSHOT_RETURNS
+
+SNAPSHOT_WINDOW_QUERY = f"""
+CALL {{
+    MATCH (n)-[r:MADE]->(m) {SNAPSHOT_WINDOW}
+    UNION ALL
+    MATCH (n)-[r:SENT]->(m) {SNAPSHOT_WINDOW}
+    UNION ALL
+    MATCH (n)-[r:CONNECTS_VIA]->(m) {SNAPSHOT_WINDOW}
+}}
+""" + SNAPSHOT_RETURNS
+
+TIMELINE_RETURNS = f"""
+    RETURN type(r) as relation,
+           {ENTITY_KEY.format('m')} as to_entity,
+           r.timestamp as timestamp,
+           {{duration}} as duration,
+           r.amount as amount,
+           {{call_id}} as call_id,
+           r.transaction_id as transaction_id"""
+
+# (label, key property, duration, call_id) per anchor an entity id can name
+TIMELINE_ANCHORS = (
+    ("Phone", "phone_number", "r.duration", "r.call_id"),
+    ("BankAccount", "account_number", "NULL", "NULL"),
+)
+
+
+@lru_cache(maxsize=None)
+def timeline_query(since: bool, until: bool) -> str:
+    """Timeline of a phone or account, with a predicate only for the bounds that are set.
+
+    Each bound is a plain range predicate the planner can seek on. With a
+    bound, the untimestamped relationships (SIM, device and ownership
+    links) come from a branch of their own, so a windowed timeline still
+    shows them.
+    """
+    bounds = [predicate for predicate, used in (
+        ("r.timestamp >= $since", since),
+        ("r.timestamp <= $until", until),
+    ) if used]
+    filters = ["\n    WHERE " + " AND ".join(bounds), "\n    WHERE r.timestamp IS NULL"] if bounds else [""]
+    branches = [
+        f"\n    MATCH (n:{label} {{{key}: $entity_id}})-[r]-(m){where}" + TIMELINE_RETURNS.format(duration=duration, call_id=call_id)
+        for label, key, duration, call_id in TIMELINE_ANCHORS
+        for where in filters
+    ]
+    return (
+        "CALL {" + "\n    UNION ALL".join(branches) + "\n}\n"
+        "RETURN relation, to_entity, timestamp, duration, amount, call_id, transaction_id\n"
+        "ORDER BY timestamp DESC"
+    )
+
+CONNECTION_COUNTS_QUERY = """
+UNWIND $entity_ids AS entity_id
+OPTIONAL MATCH (p:Phone {phone_number: entity_id})
+OPTIONAL MATCH (b:BankAccount {account_number: entity_id})
+WITH entity_id, [x IN [p, b] WHERE x IS NOT NULL] AS anchors
+WHERE size(anchors) > 0
+CALL {
+    WITH anchors
+    UNWIND anchors AS n
+    MATCH (n)-[r]-(m)
+    RETURN count(DISTINCT m) AS connection_count, count(r) AS event_count
+}
+RETURN entity_id, connection_count, event_count
+"""
+
+# Aggregated sweep queries, one pass over the label each. The degree signals
+# count a single relationship type to an anonymous node, which the planner
+# reads from each node's degree (GetDegree) instead of expanding the
+# relationships; money_movement has to read every SENT relationship for
+# its amount.
+ANOMALY_SWEEP_QUERIES = {
+    'sim_swap': """
+        MATCH (n:Phone)
+        WITH n, COUNT { (n)-[:HAS_SIM]-() } AS value
+        WHERE value > $threshold
+        RETURN n.phone_number AS entity_id, value, {swap_count: value} AS details
+        ORDER BY value DESC LIMIT $top_n
+    """,
+    'device_hop': """
+        MATCH (n:Phone)
+        WITH n, COUNT { (n)-[:RUNS_ON]-() } AS value
+        WHERE value > $threshold
+        RETURN n.phone_number AS entity_id, value, {device_change_count: value} AS details
+        ORDER BY value DESC LIMIT $top_n
+    """,
+    'call_burst': """
+        MATCH (n:Phone)
+        WITH n, COUNT { (n)-[:MADE]-() } AS value
+        WHERE value > $threshold
+        RETURN n.phone_number AS entity_id, value, {call_count: value} AS details
+        ORDER BY value DESC LIMIT $top_n
+    """,
+    'money_movement': """
+        MATCH (n:BankAccount)-[t:SENT]-()
+        WITH n, sum(t.amount) AS value, count(t) AS transaction_count
+        WHERE value > $threshold
+        RETURN n.account_number AS entity_id, value,
+               {total_amount: value, transaction_count: transaction_count} AS details
+        ORDER BY value DESC LIMIT $top_n
+    """,
+}
+
+COUNT_BREAKDOWN_QUERY = """
+CALL {
+    MATCH (n) RETURN 'label' AS kind, labels(n)[0] AS name, count(*) AS count
+    UNION ALL
+    MATCH ()-[r]->() RETURN 'type' AS kind, type(r) AS name, count(*) AS count
+}
+RETURN kind, name, count
+"""
+
+# Relationships are stamped with the graph version their write batch will
+# publish (bump_graph_version runs after the batch), which makes the graph
+# version the store's ingest watermark
+INGEST_VERSION = """
+OPTIONAL MATCH (meta:GraphMeta {key: 'graph'})
+WITH coalesce(meta.version, 0) + 1 AS ingest_version
+"""
+
+MERGE_CALL_QUERY = INGEST_VERSION + """
+MERGE (p1:Phone {phone_number: $from_phone})
+MERGE (p2:Phone {phone_number: $to_phone})
+MERGE (p1)-[c:MADE {
+    call_id: $call_id,
+    duration: $duration,
+    timestamp: $timestamp,
+    call_type: $call_type
+}]->(p2)
+ON CREATE SET c.ingest_version = ingest_version
+RETURN c
+"""
+
+MERGE_TRANSACTION_QUERY = INGEST_VERSION + """
+MERGE (b1:BankAccount {account_number: $from_acc})
+MERGE (b2:BankAccount {account_number: $to_acc})
+MERGE (b1)-[t:SENT {
+    transaction_id: $transaction_id,
+    amount: $amount,
+    timestamp: $timestamp,
+    transaction_type: $transaction_type
+}]->(b2)
+ON CREATE SET t.ingest_version = ingest_version
+RETURN t
+"""
+
+MERGE_DEVICE_QUERY = INGEST_VERSION + """
+MERGE (d:Device {device_id: $device_id})
+SET d.device_type = $device_type, d.imei = $imei
+MERGE (i:IP {ip_address: $ip})
+MERGE (d)-[c:CONNECTS_VIA {timestamp: $timestamp}]->(i)
+ON CREATE SET c.ingest_version = ingest_version
+"""
+
+MERGE_DEVICE_PHONE = """
+MERGE (p:Phone {phone_number: $phone})
+MERGE (p)-[r:RUNS_ON]->(d)
+ON CREATE SET r.ingest_version = ingest_version
+"""
+
+MERGE_SIM_QUERY = INGEST_VERSION + """
+MERGE (s:SIM {sim_number: $sim_number})
+SET s.provider = $provider, s.activation_date = $activation_date
+"""
+
+MERGE_SIM_PHONE = """
+MERGE (p:Phone {phone_number: $phone})
+MERGE (p)-[r:HAS_SIM]->(s)
+ON CREATE SET r.ingest_version = ingest_version
+"""
+
+MERGE_COMPLAINT_QUERY = INGEST_VERSION + """
+MERGE (c:Complaint {complaint_id: $complaint_id})
+SET c.complaint_type = $complaint_type,
+    c.description = $description,
+    c.timestamp = $timestamp,
+    c.severity = $severity
+"""
+
+MERGE_COMPLAINT_PERSON = """
+MERGE (p:Person {id: $person_id})
+MERGE (p)-[r:INVOLVED_IN]->(c)
+ON CREATE SET r.ingest_version = ingest_version
+"""
+
+
+class Neo4jStore(GraphStore):
+    """``GraphStore`` over a ``Neo4jConnection``; every operation is one Cypher query"""
+
+    backend = "neo4j"
+
+    def __init__(self, db: Neo4jConnection):
+        self.db = db
+
+    def close(self):
+        close_db()
+
+    def ping(self) -> bool:
+        return len(self.db.execute_read("RETURN 1 AS status", name="health")) > 0
+
+    def graph_version(self) -> int:
+        return self.db.graph_version()
+
+    def bump_graph_version(self) -> int:
+        return self.db.bump_graph_version()
+
+    def ingest_watermark(self) -> int:
+        return self.db.graph_version()
+
+    def merge_call(self, from_phone, to_phone, call_id, duration, timestamp, call_type):
+        self.db.execute_write(MERGE_CALL_QUERY, name="etl.calls", params={
+            'from_phone': from_phone,
+            'to_phone': to_phone,
+            'call_id': call_id,
+            'duration': duration,
+            'timestamp': timestamp,
+            'call_type': call_type
+        })
+
+    def merge_transaction(self, from_account, to_account, transaction_id, amount, timestamp, transaction_type):
+        self.db.execute_write(MERGE_TRANSACTION_QUERY, name="etl.transactions", params={
+            'from_acc': from_account,
+            'to_acc': to_account,
+            'transaction_id': transaction_id,
+            'amount': amount,
+            'timestamp': timestamp,
+            'transaction_type': transaction_type
+        })
+
+    def merge_device(self, device_id, ip, phone, device_type, imei, timestamp):
+        query = MERGE_DEVICE_QUERY + (MERGE_DEVICE_PHONE if phone else "")
+        self.db.execute_write(query, name="etl.devices", params={
+            'device_id': device_id,
+            'ip': ip,
+            'phone': phone,
+            'device_type': device_type,
+            'imei': imei,
+            'timestamp': timestamp
+        })
+
+    def merge_sim(self, sim_number, phone, provider, activation_date):
+        query = MERGE_SIM_QUERY + (MERGE_SIM_PHONE if phone else "")
+        self.db.execute_write(query, name="etl.sims", params={
+            'sim_number': sim_number,
+            'phone': phone,
+            'provider': provider,
+            'activation_date': activation_date
+        })
+
+    def merge_complaint(self, complaint_id, person_id, complaint_type, description, timestamp, severity):
+        query = MERGE_COMPLAINT_QUERY + (MERGE_COMPLAINT_PERSON if person_id else "")
+        self.db.execute_write(query, name="etl.complaints", params={
+            'complaint_id': complaint_id,
+            'person_id': person_id,
+            'complaint_type': complaint_type,
+            'description': description,
+            'timestamp': timestamp,
+            'severity': severity
+        })
+
+    def stream_edges(self, relations, after=None, upto=None):
+        upto = self.ingest_watermark() if upto is None else upto
+        if after is None:
+            return self.db.stream_query(PROJECTION_EDGES_QUERY, {'relations': list(relations), 'upto': upto},
+                                        as_tuples=True, name="projection.edges")
+        query = "UNION ALL".join(PROJECTION_DELTA_BRANCH.format(relation=relation) for relation in relations)
+        return self.db.stream_query(query, {'after': after, 'upto': upto}, as_tuples=True,
+                                    name="projection.delta")
+
+    def stream_relations(self, relations, name=None):
+        return self.db.stream_query(RELATIONS_QUERY, {'relations': list(relations)}, as_tuples=True,
+                                    name=name or "relations.edges")
+
+    def snapshot_edges(self, limit, since, until):
+        windowed = since is not None or until is not None
+        return self.db.execute_read(SNAPSHOT_WINDOW_QUERY if windowed else SNAPSHOT_QUERY, name="graph_snapshot", params={
+            "limit": limit,
+            "since": since or datetime.min,
+            "until": until or datetime.max
+        })
+
+    def timeline(self, entity_id, since, until):
+        params = {'entity_id': entity_id}
+        if since is not None:
+            params['since'] = since
+        if until is not None:
+            params['until'] = until
+        query = timeline_query(since is not None, until is not None)
+        return self.db.execute_read(query, name="timeline", params=params)
+
+    def connection_counts(self, entity_ids):
+        return self.db.execute_read(CONNECTION_COUNTS_QUERY, {'entity_ids': entity_ids}, name="risk.connection_counts")
+
+    def anomaly_sweep(self, signal, threshold, top_n):
+        return self.db.execute_read(ANOMALY_SWEEP_QUERIES[signal], name=f"anomaly_sweep.{signal}", params={
+            'threshold': threshold,
+            'top_n': top_n
+        })
+
+    def count_breakdown(self):
+        nodes, relationships = {}, {}
+        for row in self.db.execute_read(COUNT_BREAKDOWN_QUERY, name="stats.breakdown"):
+            if row["kind"] == "label":
+                if row["name"] != GRAPH_META_LABEL:
+                    nodes[row["name"]] = row["count"]
+            else:
+                relationships[row["name"]] = row["count"]
+        return nodes, relationships
 
 
 # ------------------------------------------------------------------
@@ -166,26 +929,84 @@ class Neo4jConnection:
 # ------------------------------------------------------------------
 
 _neo4j: Optional[Neo4jConnection] = None
+_neo4j_lock = threading.Lock()
+_schema_version: Optional[int] = None
+_failed_migration: Optional[int] = None
 
 
 def get_db() -> Neo4jConnection:
-    global _neo4j
+    global _neo4j, _schema_version, _failed_migration
 
-    if _neo4j is None:
-        _neo4j = Neo4jConnection(
-            uri=settings.NEO4J_URI,
-            user=settings.NEO4J_USER,
-            password=settings.NEO4J_PASSWORD,
-            database=settings.DATABASE_NAME,
-        )
-        _neo4j.connect()
-        _neo4j.create_indexes()
+    # Startup initialises in the background, so a request may race it here
+    with _neo4j_lock:
+        if _neo4j is None:
+            connection = Neo4jConnection(
+                uri=settings.NEO4J_URI,
+                user=settings.NEO4J_USER,
+                password=settings.NEO4J_PASSWORD,
+                database=settings.DATABASE_NAME,
+            )
+            connection.connect()
+            try:
+                # DDL only runs when the ledger is behind the code; a failed
+                # migration is logged and left for the next start
+                _schema_version, _failed_migration = migrate(connection)
+            except Exception:
+                connection.close()
+                raise
+            _neo4j = connection
 
     return _neo4j
 
 
 def close_db():
     global _neo4j
-    if _neo4j:
-        _neo4j.close()
-        _neo4j = None
+    with _neo4j_lock:
+        if _neo4j:
+            _neo4j.close()
+            _neo4j = None
+
+
+_async_neo4j: Optional[AsyncNeo4jConnection] = None
+_async_lock = asyncio.Lock()
+
+
+async def get_async_db() -> AsyncNeo4jConnection:
+    global _async_neo4j
+
+    # Indexes and migrations are the synchronous connection's job at startup
+    async with _async_lock:
+        if _async_neo4j is None:
+            connection = AsyncNeo4jConnection(
+                uri=settings.NEO4J_URI,
+                user=settings.NEO4J_USER,
+                password=settings.NEO4J_PASSWORD,
+                database=settings.DATABASE_NAME,
+            )
+            await connection.connect()
+            _async_neo4j = connection
+
+    return _async_neo4j
+
+
+async def close_async_db():
+    global _async_neo4j
+    if _async_neo4j:
+        await _async_neo4j.close()
+        _async_neo4j = None
+
+
+def readiness() -> Dict[str, Any]:
+    """Whether both drivers are connected and migrations have run; no queries issued.
+
+    A failed migration leaves the schema behind but does not block
+    readiness; it is reported in ``failed_migration``.
+    """
+    return {
+        "ready": _neo4j is not None and _async_neo4j is not None and _schema_version is not None,
+        "database": _neo4j is not None,
+        "async_database": _async_neo4j is not None,
+        "schema_version": _schema_version,
+        "expected_schema_version": LATEST_VERSION,
+        "failed_migration": _failed_migration,
+    }
@@ -0,0 +1,268 @@
+"""
+Per-query latency histograms, slow-query logging and PROFILE summaries.
+
+Every call through ``Neo4jConnection`` / ``AsyncNeo4jConnection`` is
+recorded under a query name: wall time, rows returned, the server's own
+timing from the result summary, and errors. Parameters never reach the
+logs; the slow-query log only shows their types and sizes.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from metrics import MetricFamily, register_collector
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("database.slow_queries")
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is +Inf
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Plan operators that read through an index, and the ones that scan instead
+INDEX_OPERATORS = ("IndexSeek", "IndexScan", "IndexContainsScan", "IndexEndsWithScan")
+SCAN_OPERATORS = ("AllNodesScan", "NodeByLabelScan", "RelationshipTypeScan", "AllRelationshipsScan")
+
+
+def default_query_name(query: str) -> str:
+    """Stable name for an unnamed query: leading clause plus a short hash"""
+    text = " ".join(query.split())
+    clause = text.split(" ", 1)[0].upper() if text else "QUERY"
+    return f"{clause.lower()}.{hashlib.sha1(text.encode()).hexdigest()[:8]}"
+
+
+def redact_params(params: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Describe parameters by type and size only, never by value"""
+    redacted = {}
+    for key, value in (params or {}).items():
+        if isinstance(value, (list, tuple, set, dict)):
+            redacted[key] = f"<{type(value).__name__}[{len(value)}]>"
+        else:
+            redacted[key] = f"<{type(value).__name__}>"
+    return redacted
+
+
+def summary_timing_ms(summary) -> Optional[float]:
+    """Server-side time from a result summary (planning + streaming)"""
+    available = getattr(summary, "result_available_after", None)
+    consumed = getattr(summary, "result_consumed_after", None)
+    if available is None and consumed is None:
+        return None
+    return float((available or 0) + (consumed or 0))
+
+
+class QueryMetrics:
+    """Running totals and latency histogram for one query name"""
+
+    def __init__(self, name: str, mode: str, query: str):
+        self.name = name
+        self.mode = mode
+        self.query = query
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.db_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.last_error: Optional[str] = None
+
+    def observe(self, elapsed_ms: float, rows: int, db_ms: Optional[float], error: Optional[BaseException]):
+        self.count += 1
+        self.rows += rows
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if db_ms is not None:
+            self.db_ms += db_ms
+        if error is not None:
+            self.errors += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def quantile(self, q: float) -> float:
+        """Bucket upper bound below which ``q`` of the calls completed"""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            seen += self.buckets[i]
+            if seen >= rank:
+                return float(bound)
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        bounds = [str(b) for b in LATENCY_BUCKETS_MS] + ["+Inf"]
+        return {
+            "name": self.name,
+            "mode": self.mode,
+            "count": self.count,
+            "errors": self.errors,
+            "rows": self.rows,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "db_ms": round(self.db_ms, 3),
+            "buckets": dict(zip(bounds, self.buckets)),
+            "last_error": self.last_error,
+        }
+
+
+class QueryRecorder:
+    """Thread-safe registry of ``QueryMetrics`` keyed by query name"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, QueryMetrics] = {}
+
+    def record(
+        self,
+        name: str,
+        query: str,
+        mode: str,
+        elapsed_ms: float,
+        rows: int = 0,
+        db_ms: Optional[float] = None,
+        params: Optional[Dict[str, Any]] = None,
+        error: Optional[BaseException] = None
+    ):
+        with self._lock:
+            metrics = self._metrics.get(name)
+            if metrics is None:
+                metrics = self._metrics[name] = QueryMetrics(name, mode, query)
+            metrics.query = query
+            metrics.observe(elapsed_ms, rows, db_ms, error)
+
+        if elapsed_ms >= settings.SLOW_QUERY_MS:
+            slow_query_logger.warning(
+                f"Slow query {name} ({mode}): {elapsed_ms:.0f} ms wall, "
+                f"{'n/a' if db_ms is None else f'{db_ms:.0f} ms'} db, {rows} rows, "
+                f"params={redact_params(params)}"
+                + (f", error={type(error).__name__}" if error is not None else "")
+            )
+
+    def get(self, name: str) -> Optional[QueryMetrics]:
+        with self._lock:
+            return self._metrics.get(name)
+
+    def all(self) -> List[QueryMetrics]:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """All query stats, slowest total time first"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.total_ms, reverse=True)
+            return [m.snapshot() for m in metrics]
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+
+
+query_recorder = QueryRecorder()
+
+
+@register_collector
+def query_metrics():
+    """Cypher query stats as Prometheus families, one series per query name"""
+    latency, errors, rows, db_time = [], [], [], []
+    for m in query_recorder.all():
+        labels = {"query": m.name, "mode": m.mode}
+        cumulative = 0
+        for bound, bucket in zip(LATENCY_BUCKETS_MS, m.buckets):
+            cumulative += bucket
+            latency.append(("_bucket", {**labels, "le": repr(bound / 1000)}, cumulative))
+        latency.append(("_bucket", {**labels, "le": "+Inf"}, m.count))
+        latency.append(("_sum", labels, m.total_ms / 1000))
+        latency.append(("_count", labels, m.count))
+        errors.append(("_total", labels, m.errors))
+        rows.append(("_total", labels, m.rows))
+        db_time.append(("_total", labels, m.db_ms / 1000))
+
+    yield MetricFamily("synapsters_neo4j_query_duration_seconds", "histogram",
+                       "Wall time of Cypher queries by name", latency)
+    yield MetricFamily("synapsters_neo4j_query_errors", "counter", "Failed Cypher queries by name", errors)
+    yield MetricFamily("synapsters_neo4j_query_rows", "counter", "Rows returned by Cypher queries by name", rows)
+    yield MetricFamily("synapsters_neo4j_query_db_seconds", "counter",
+                       "Server-reported time of Cypher queries by name", db_time)
+
+
+class observe_query:
+    """Time one query call and record it when the block exits.
+
+    Callers set ``rows`` and ``db_ms`` as they learn them. Exceptions are
+    recorded as errors and re-raised; a consumer closing a stream early is
+    not an error.
+    """
+
+    def __init__(self, name: Optional[str], query: str, mode: str, params: Optional[Dict[str, Any]] = None):
+        self.name = name or default_query_name(query)
+        self.query = query
+        self.mode = mode
+        self.params = params
+        self.rows = 0
+        self.db_ms: Optional[float] = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        query_recorder.record(
+            self.name, self.query, self.mode,
+            (time.perf_counter() - self.start) * 1000,
+            rows=self.rows,
+            db_ms=self.db_ms,
+            params=self.params,
+            error=exc if isinstance(exc, Exception) else None,
+        )
+        return False
+
+
+# ------------------------------------------------------------------
+# PROFILE summaries
+# ------------------------------------------------------------------
+
+def summarize_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Total db hits and rows, plus which operators used indexes or scanned"""
+    db_hits, operators, indexes, scans = 0, [], [], []
+
+    def walk(plan: Dict[str, Any]):
+        nonlocal db_hits
+        operator = plan.get("operatorType", "")
+        base = operator.split("@", 1)[0]  # "NodeIndexSeek@neo4j"
+        args = plan.get("args", {})
+        db_hits += plan.get("dbHits", 0)
+        operators.append({
+            "operator": base,
+            "rows": plan.get("rows", 0),
+            "db_hits": plan.get("dbHits", 0),
+            "details": args.get("Details"),
+        })
+        if any(base.endswith(op) for op in INDEX_OPERATORS):
+            indexes.append(args.get("Details") or base)
+        elif base in SCAN_OPERATORS:
+            scans.append(args.get("Details") or base)
+        for child in plan.get("children", []):
+            walk(child)
+
+    walk(profile)
+    return {
+        "db_hits": db_hits,
+        "rows": profile.get("rows", 0),
+        "index_used": bool(indexes),
+        "indexes": indexes,
+        "scans": scans,
+        "operators": operators,
+    }
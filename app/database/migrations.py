@@ -0,0 +1,113 @@
+"""
+Versioned schema migrations with a ledger in the database.
+
+The applied version is kept on the ``(:GraphMeta {key: 'schema'})`` node
+together with a history of what ran when. At startup a single read
+compares it with the latest migration here; index and constraint DDL only
+runs when that version is behind.
+
+Append new migrations to ``MIGRATIONS`` with the next version number;
+never edit or reorder ones that have shipped. Every step must be
+idempotent (``IF NOT EXISTS``), since two instances starting together
+can both see the same pending version.
+
+A failing migration does not stop startup: it is logged and recorded as
+``failed_version`` in the ledger, later migrations wait, and the next
+start retries it.
+"""
+
+import time
+from typing import Callable, List, NamedTuple, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable  # (Neo4jConnection) -> list of failed statements
+
+
+SCHEMA_VERSION_QUERY = """
+OPTIONAL MATCH (m:GraphMeta {key: 'schema'})
+RETURN coalesce(m.version, 0) AS version
+"""
+
+RECORD_MIGRATION_QUERY = """
+MERGE (m:GraphMeta {key: 'schema'})
+SET m.version = $version,
+    m.applied_at = datetime(),
+    m.failed_version = null,
+    m.history = coalesce(m.history, []) + [$entry]
+"""
+
+RECORD_FAILURE_QUERY = """
+MERGE (m:GraphMeta {key: 'schema'})
+SET m.failed_version = $version,
+    m.failed_at = datetime(),
+    m.history = coalesce(m.history, []) + [$entry]
+"""
+
+
+class MigrationResult(NamedTuple):
+    version: int  # schema version reached
+    failed: Optional[int] = None  # migration that failed and stopped the run
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "entity, timestamp and graph meta indexes", lambda db: db.create_indexes()),
+    Migration(2, "native temporal timestamps", lambda db: db.migrate_timestamps()),
+    Migration(3, "relationship ingest version indexes", lambda db: db.create_ingest_indexes()),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def schema_version(db) -> int:
+    """Version recorded in the ledger (0 on a fresh database)"""
+    return db.execute_read(SCHEMA_VERSION_QUERY, name="schema.version")[0]["version"]
+
+
+def migrate(db) -> MigrationResult:
+    """Apply pending migrations in order and record each one.
+
+    Stops at the first failure without raising, so the application still
+    starts on the schema it has.
+    """
+    current = schema_version(db)
+    if current >= LATEST_VERSION:
+        logger.info(f"✓ Schema up to date (version {current})")
+        return MigrationResult(current)
+
+    for migration in MIGRATIONS:
+        if migration.version <= current:
+            continue
+        start = time.perf_counter()
+        try:
+            failures = migration.apply(db)
+            error = f"{len(failures)} statement(s) failed: {failures}" if failures else None
+        except Exception as e:
+            error = str(e)
+        elapsed = time.perf_counter() - start
+
+        if error:
+            logger.error(f"Migration {migration.version} ({migration.name}) failed, "
+                         f"staying at schema version {current}: {error}")
+            try:
+                db.execute_write(RECORD_FAILURE_QUERY, name="schema.record_failure", params={
+                    "version": migration.version,
+                    "entry": f"{migration.version}: {migration.name} FAILED ({elapsed:.2f}s)",
+                })
+            except Exception as e:
+                logger.warning(f"Could not record the failed migration: {e}")
+            return MigrationResult(current, migration.version)
+
+        db.execute_write(RECORD_MIGRATION_QUERY, name="schema.record", params={
+            "version": migration.version,
+            "entry": f"{migration.version}: {migration.name} ({elapsed:.2f}s)",
+        })
+        current = migration.version
+        logger.info(f"✓ Migration {migration.version} applied: {migration.name} in {elapsed:.2f}s")
+
+    return MigrationResult(current)
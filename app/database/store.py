@@ -0,0 +1,199 @@
+"""
+Graph storage interface.
+
+The ETL pipeline and the analytics talk to a ``GraphStore`` instead of
+writing Cypher against a connection, so the graph can live in Neo4j or in
+the embedded SQLite engine (``GRAPH_BACKEND=embedded``), which needs no
+server at all: small field deployments and CI run in a single process.
+
+Timestamps cross this interface as naive UTC datetimes, except in the
+projection rows, which carry epoch seconds.
+
+Ingest is append-only, and every relationship carries an ingest
+watermark that only grows, so a projection built up to one watermark can
+be caught up by reading the relationships after it.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import threading
+import logging
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("neo4j", "embedded")
+
+# Sweep signals as (label, relationship, detail key): degree over the
+# relationship, or for money_movement the summed amounts
+SWEEP_SIGNALS = {
+    'sim_swap': ('Phone', 'HAS_SIM', 'swap_count'),
+    'device_hop': ('Phone', 'RUNS_ON', 'device_change_count'),
+    'call_burst': ('Phone', 'MADE', 'call_count'),
+    'money_movement': ('BankAccount', 'SENT', 'total_amount'),
+}
+
+
+class GraphStore(ABC):
+    """Ingest and query operations the services need from a graph backend"""
+
+    backend: str
+
+    @abstractmethod
+    def close(self):
+        """Release the backend's connections"""
+
+    @abstractmethod
+    def ping(self) -> bool:
+        """Whether the backend answers a trivial query"""
+
+    # ------------------------------------------------------------------
+    # Versioning
+    # ------------------------------------------------------------------
+
+    @abstractmethod
+    def graph_version(self) -> int:
+        """Current graph version (0 before the first write batch)"""
+
+    @abstractmethod
+    def bump_graph_version(self) -> int:
+        """Mark the graph as modified; call once after each write batch"""
+
+    @abstractmethod
+    def ingest_watermark(self) -> int:
+        """Watermark of the newest committed relationship (0 on an empty graph)"""
+
+    # ------------------------------------------------------------------
+    # Ingest (each call is idempotent, like a Cypher MERGE)
+    # ------------------------------------------------------------------
+
+    @abstractmethod
+    def merge_call(self, from_phone: str, to_phone: str, call_id: str, duration: int,
+                   timestamp: datetime, call_type: str):
+        """Phone -[MADE]-> Phone"""
+
+    @abstractmethod
+    def merge_transaction(self, from_account: str, to_account: str, transaction_id: str, amount: float,
+                          timestamp: datetime, transaction_type: str):
+        """BankAccount -[SENT]-> BankAccount"""
+
+    @abstractmethod
+    def merge_device(self, device_id: str, ip: str, phone: Optional[str], device_type: str,
+                     imei: str, timestamp: datetime):
+        """Device -[CONNECTS_VIA]-> IP, and Phone -[RUNS_ON]-> Device when a phone is given"""
+
+    @abstractmethod
+    def merge_sim(self, sim_number: str, phone: Optional[str], provider: str,
+                  activation_date: Optional[datetime]):
+        """SIM, and Phone -[HAS_SIM]-> SIM when a phone is given"""
+
+    @abstractmethod
+    def merge_complaint(self, complaint_id: str, person_id: Optional[str], complaint_type: str,
+                        description: str, timestamp: datetime, severity: str):
+        """Complaint, and Person -[INVOLVED_IN]-> Complaint when a person is given"""
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @abstractmethod
+    def stream_edges(self, relations: List[str], after: Optional[int] = None,
+                     upto: Optional[int] = None) -> Iterator[tuple]:
+        """Every relationship of the given types as
+        ``(source, target, source_label, target_label, relation, epoch_seconds, amount, duration)``.
+
+        ``after`` / ``upto`` bound the ingest watermark (exclusive /
+        inclusive), so reads taken at successive watermarks never overlap.
+        """
+
+    @abstractmethod
+    def stream_relations(self, relations: List[str], name: Optional[str] = None) -> Iterator[tuple]:
+        """``(from, to, relation, amount, duration)`` for the given relationship types"""
+
+    @abstractmethod
+    def snapshot_edges(self, limit: int, since: Optional[datetime], until: Optional[datetime]) -> List[Dict[str, Any]]:
+        """Up to ``limit`` relationships with both endpoints, for the graph snapshot.
+
+        With a time bound only the timestamped relationships (MADE, SENT,
+        CONNECTS_VIA) inside it are returned.
+        """
+
+    @abstractmethod
+    def timeline(self, entity_id: str, since: Optional[datetime], until: Optional[datetime]) -> List[Dict[str, Any]]:
+        """Relationships of a phone or account, newest first.
+
+        ``since`` / ``until`` bound the timestamped relationships; the
+        untimestamped ones (SIM, device and ownership links) are always
+        included.
+        """
+
+    @abstractmethod
+    def connection_counts(self, entity_ids: List[str]) -> List[Dict[str, Any]]:
+        """``entity_id``, ``connection_count`` (distinct neighbours) and ``event_count`` per known entity"""
+
+    @abstractmethod
+    def anomaly_sweep(self, signal: str, threshold: float, top_n: int) -> List[Dict[str, Any]]:
+        """Entities whose ``SWEEP_SIGNALS`` value exceeds ``threshold``, highest first"""
+
+    @abstractmethod
+    def count_breakdown(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Node counts per label and relationship counts per type"""
+
+
+# ------------------------------------------------------------------
+# Global store
+# ------------------------------------------------------------------
+
+_store: Optional[GraphStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> GraphStore:
+    """The configured backend, opened on first use"""
+    global _store
+
+    with _store_lock:
+        if _store is None:
+            if settings.GRAPH_BACKEND == "embedded":
+                from database.embedded import EmbeddedStore
+                _store = EmbeddedStore(settings.EMBEDDED_DB_PATH)
+            elif settings.GRAPH_BACKEND == "neo4j":
+                from database.graph import Neo4jStore, get_db
+                _store = Neo4jStore(get_db())
+            else:
+                raise ValueError(f"Unknown GRAPH_BACKEND {settings.GRAPH_BACKEND!r}; expected one of {BACKENDS}")
+            logger.info(f"✓ Graph store ready ({_store.backend})")
+
+    return _store
+
+
+def close_store():
+    global _store
+    with _store_lock:
+        if _store:
+            _store.close()
+            _store = None
+
+
+def is_embedded() -> bool:
+    return settings.GRAPH_BACKEND == "embedded"
+
+
+def readiness() -> Dict[str, Any]:
+    """Readiness of the configured backend; no queries issued"""
+    if not is_embedded():
+        from database.graph import readiness as neo4j_readiness
+        return neo4j_readiness()
+
+    from database.embedded import SCHEMA_VERSION
+    store = _store
+    version = store.schema_version if store is not None else None
+    return {
+        "ready": store is not None and version >= SCHEMA_VERSION,
+        "database": store is not None,
+        "async_database": store is not None,  # the embedded engine has no separate async path
+        "schema_version": version,
+        "expected_schema_version": SCHEMA_VERSION,
+    }
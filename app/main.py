@@ -1,12 +1,21 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
+import anyio
+import asyncio
 import logging
+import time
 # from app.config import settings
 from config import settings
 # from app.database.graph import get_db, close_db
-from database.graph import get_db, close_db
-from routes import data, intelligence, system
+from database.graph import close_db, get_async_db, close_async_db
+from database.store import get_store, close_store, is_embedded
+from compute import ComputeRejected, compute_executor
+from responses import CompressionMiddleware
+import metrics
+from routes import cases, data, intelligence, system
 # from app.routes import data, intelligence, system
 
 # Configure logging
@@ -16,22 +25,46 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def initialize_database(started: float):
+    """Open the graph store (on Neo4j: connect both drivers and bring the schema
+    up to date), retrying until it works.
+
+    Runs in the background so the process answers liveness probes at once;
+    the readiness probe reports when this has finished.
+    """
+    delay = 1.0
+    while True:
+        try:
+            await run_in_threadpool(get_store)
+            if not is_embedded():
+                await get_async_db()
+            logger.info(f"✓ Database initialized ({time.perf_counter() - started:.2f}s after startup)")
+            return
+        except Exception as e:
+            logger.error(f"✗ Failed to initialize database: {e}; retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
 # Lifespan events
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("🚀 Starting Ranchi Synapsters Intelligence Engine...")
-    try:
-        db = get_db()
-        logger.info("✓ Database initialized")
-    except Exception as e:
-        logger.error(f"✗ Failed to initialize database: {e}")
+    # Blocking engine calls run in this pool instead of on the event loop
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+    # CPU-heavy engine calls run here, bounded and prioritised
+    compute_executor.start()
+    startup = asyncio.create_task(initialize_database(time.perf_counter()))
     
     yield
     
     # Shutdown
     logger.info("🛑 Shutting down...")
+    startup.cancel()
+    compute_executor.shutdown()
+    close_store()
     close_db()
+    await close_async_db()
     logger.info("✓ Shutdown complete")
 
 # Create FastAPI app
@@ -51,10 +84,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Response compression (gzip, or br when brotli is installed)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_BYTES,
+    level=settings.COMPRESSION_LEVEL,
+)
+
+# Request metrics (outermost, so latency includes compression)
+app.add_middleware(metrics.MetricsMiddleware)
+
+# Admission control: refused or expired compute jobs get 429 / 503 / 504
+@app.exception_handler(ComputeRejected)
+async def compute_rejected_handler(request: Request, exc: ComputeRejected):
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)}, headers=exc.headers)
+
 # Include routers
 app.include_router(system.router)
 app.include_router(data.router)
 app.include_router(intelligence.router)
+app.include_router(cases.router)
+
+@app.get("/metrics", tags=["Root"], summary="Prometheus metrics")
+async def prometheus_metrics():
+    """Metrics in the Prometheus text exposition format"""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
 
 @app.get("/", tags=["Root"])
 async def root():
@@ -66,14 +120,28 @@ async def root():
         "status": "operational",
         "endpoints": {
             "health": "/api/v1/system/health",
+            "liveness": "/api/v1/system/live",
+            "readiness": "/api/v1/system/ready",
+            "metrics": "/metrics",
             "graph_stats": "/api/v1/system/graph/stats",
+            "pool_stats": "/api/v1/system/pool",
+            "compute_stats": "/api/v1/system/compute",
+            "query_stats": "/api/v1/system/queries",
             "graph_snapshot": "/api/v1/intelligence/graph",
+            "graph_lod": "/api/v1/intelligence/graph/lod",
+            "ego_network": "/api/v1/intelligence/ego/{entity_id}",
             "upload_data": "/api/v1/data/upload",
             "fraud_rings": "/api/v1/intelligence/clusters",
             "kingpins": "/api/v1/intelligence/kingpins",
             "timeline": "/api/v1/intelligence/timeline/{entity_id}",
             "risk": "/api/v1/intelligence/risk/{entity_id}",
-            "anomalies": "/api/v1/intelligence/anomalies/{entity_id}"
+            "risk_batch": "/api/v1/intelligence/risk/batch",
+            "anomalies": "/api/v1/intelligence/anomalies/{entity_id}",
+            "anomaly_sweep": "/api/v1/intelligence/anomalies",
+            "velocity": "/api/v1/intelligence/velocity",
+            "money_trail": "/api/v1/intelligence/money-trail/{account_number}",
+            "cycles": "/api/v1/intelligence/cycles",
+            "cases": "/api/v1/cases"
         }
     }
 
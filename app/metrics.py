@@ -0,0 +1,283 @@
+"""
+Prometheus metrics in the text exposition format.
+
+Counters, gauges and histograms are updated on the hot paths (requests,
+ETL, analytics); collectors registered with ``register_collector`` add
+samples computed at scrape time (graph size, cache ratios, Cypher query
+stats). ``render()`` produces the ``/metrics`` body.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4"  # Response appends the charset
+
+# Seconds; covers fast lookups through minute-long analytics runs
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Sample = Tuple[str, Dict[str, str], float]  # (name suffix, labels, value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            return [("", dict(zip(self.labelnames, key)), value) for key, value in self._values.items()]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[Sample]:
+        return [("_total", labels, value) for _, labels, value in super().samples()]
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # bucket counts..., sum, count
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str):
+        """Observe the duration of the ``with`` block, including when it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            out = []
+            for key, series in self._series.items():
+                labels = dict(zip(self.labelnames, key))
+                for bound, count in zip(self.buckets, series):
+                    out.append(("_bucket", {**labels, "le": _format_value(float(bound))}, count))
+                out.append(("_bucket", {**labels, "le": "+Inf"}, series[-1]))
+                out.append(("_sum", labels, series[-2]))
+                out.append(("_count", labels, series[-1]))
+            return out
+
+
+class MetricFamily:
+    """Samples produced by a collector at scrape time"""
+
+    def __init__(self, name: str, kind: str, documentation: str, samples: Iterable[Sample]):
+        self.name = name
+        self.kind = kind
+        self.documentation = documentation
+        self._samples = list(samples)
+
+    def samples(self) -> List[Sample]:
+        return self._samples
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[Metric] = []
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[MetricFamily]]):
+        self._collectors.append(collector)
+        return collector
+
+    def render(self) -> str:
+        families = list(self._metrics)
+        for collector in self._collectors:
+            families.extend(collector())
+
+        lines = []
+        for family in families:
+            lines.append(f"# HELP {family.name} {_escape(family.documentation)}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for suffix, labels, value in family.samples():
+                lines.append(f"{family.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+register_collector = REGISTRY.register_collector
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+# ------------------------------------------------------------------
+# Application metrics
+# ------------------------------------------------------------------
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "synapsters_http_requests", "HTTP requests by route and status", ("method", "route", "status")))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "synapsters_http_request_duration_seconds", "HTTP request latency by route", ("method", "route")))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "synapsters_http_requests_in_flight", "HTTP requests currently being served"))
+
+ETL_ROWS = REGISTRY.register(Counter(
+    "synapsters_etl_rows", "Rows ingested by file type", ("file_type",)))
+ETL_ERRORS = REGISTRY.register(Counter(
+    "synapsters_etl_errors", "Rows rejected during ingestion by file type", ("file_type",)))
+ETL_DURATION = REGISTRY.register(Histogram(
+    "synapsters_etl_duration_seconds", "Time to ingest one uploaded file", ("file_type",),
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)))
+ETL_THROUGHPUT = REGISTRY.register(Gauge(
+    "synapsters_etl_rows_per_second", "Throughput of the most recent ingestion by file type", ("file_type",)))
+
+ANALYTICS_DURATION = REGISTRY.register(Histogram(
+    "synapsters_analytics_duration_seconds", "Compute time of graph analytics", ("algorithm",)))
+
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "synapsters_cache_requests", "Cache lookups by cache and result", ("cache", "result")))
+
+
+def cache_lookup(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+@register_collector
+def cache_hit_ratios() -> Iterable[MetricFamily]:
+    totals: Dict[str, Dict[str, float]] = {}
+    for _, labels, value in CACHE_REQUESTS.samples():
+        totals.setdefault(labels["cache"], {}).setdefault(labels["result"], value)
+    yield MetricFamily(
+        "synapsters_cache_hit_ratio", "gauge", "Share of cache lookups that hit since startup",
+        [("", {"cache": cache}, counts.get("hit", 0) / sum(counts.values()))
+         for cache, counts in totals.items()],
+    )
+
+
+# ------------------------------------------------------------------
+# Request middleware
+# ------------------------------------------------------------------
+
+class MetricsMiddleware:
+    """Per-route latency, status counts and in-flight requests.
+
+    Requests are labelled by route template (``/timeline/{entity_id}``),
+    not by raw path, so entity ids do not become label values.
+    """
+
+    def __init__(self, app: ASGIApp, exclude: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.exclude = set(exclude)
+        self._templates: Dict[object, str] = {}
+
+    def _route(self, scope: Scope) -> str:
+        # The router records the matched route; its path_format includes router prefixes
+        template = getattr(scope.get("route"), "path_format", None)
+        if template:
+            return template
+
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        template = self._templates.get(endpoint)
+        if template is None:
+            template = "unmatched"
+            for route in getattr(scope.get("app"), "routes", []):
+                if getattr(route, "endpoint", None) is endpoint:
+                    template = route.path
+                    break
+            self._templates[endpoint] = template
+        return template
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec()
+            # The router records the matched route in the shared scope
+            route, method = self._route(scope), scope["method"]
+            HTTP_LATENCY.observe(elapsed, method=method, route=route)
+            HTTP_REQUESTS.inc(method=method, route=route, status=status)
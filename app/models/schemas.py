@@ -62,6 +62,12 @@ class ComplaintCreate(BaseModel):
     timestamp: str
     severity: str = "medium"
 
+class RiskBatchRequest(BaseModel):
+    entity_ids: List[str] = Field(
+        ..., min_length=1, max_length=10000,
+        description="Phone numbers (E.164) or account numbers to score"
+    )
+
 # ==================== Upload Models ====================
 
 class ETLUpload(BaseModel):
@@ -79,6 +85,8 @@ class FraudRing(BaseModel):
     risk_score: float
     ring_type: str  # "sim_mule", "call_center", "money_laundering"
     confidence: float
+    cycle_count: int = 0  # round-tripping SENT cycles among members
+    cycles_truncated: bool = False  # cycle search hit its expansion budget; cycle_count is a lower bound
 
 class Kingpin(BaseModel):
     entity_id: str
@@ -120,6 +128,19 @@ class RiskAssessment(BaseModel):
     recommendations: List[str]
     last_updated: str
 
+class RiskBatchResult(BaseModel):
+    entity_id: str
+    status: str  # "scored", "not_found", "duplicate" or "not_in_case"
+    assessment: Optional[RiskAssessment] = None  # only when scored
+
+class RiskBatchError(BaseModel):
+    status_code: int
+    detail: str
+
+class RiskBatchResponse(BaseModel):
+    results: List[RiskBatchResult]  # one per requested id, in request order
+    error: Optional[RiskBatchError] = None  # set when scoring stopped part-way
+
 class GraphNode(BaseModel):
     id: str
     label: str
@@ -138,6 +159,130 @@ class GraphEdge(BaseModel):
 class GraphSnapshot(BaseModel):
     nodes: List[GraphNode]
     edges: List[GraphEdge]
+    community_id: Optional[str] = None  # level-of-detail view being shown
+    parent_id: Optional[str] = None  # view to zoom back out to
+
+class EgoNetwork(GraphSnapshot):
+    center: str
+    hops: int
+    skipped_hubs: List[str] = []  # reached but not expanded
+    truncated: bool = False  # fan-out or node cap dropped neighbours
+
+class MoneyTrailHop(BaseModel):
+    from_account: str
+    to_account: str
+    amount: float
+    timestamp: str
+
+class MoneyTrailPath(BaseModel):
+    accounts: List[str]
+    hops: List[MoneyTrailHop]
+    hop_count: int
+    traced_amount: float  # bottleneck amount carried along the whole path
+    start_time: str
+    end_time: str
+    cash_out: bool  # ends at an account with no onward transfer
+
+class MoneyTrail(BaseModel):
+    source_account: str
+    paths: List[MoneyTrailPath]
+    explored_transfers: int
+    truncated: bool  # expansion budget exhausted before the search completed
+
+class MoneyCycle(BaseModel):
+    accounts: List[str]  # starts and ends at the same account
+    hops: List[MoneyTrailHop]
+    length: int
+    cycled_amount: float  # bottleneck amount that made it all the way round
+    total_amount: float
+    duration_seconds: int
+    start_time: str
+    end_time: str
+
+class SimilarEntity(BaseModel):
+    entity_id: str
+    label: str
+    similarity: float  # cosine of the standardised behaviour vectors
+
+class SimilarEntities(BaseModel):
+    entity_id: str
+    label: str
+    features: Dict[str, float]  # behaviour profile of the queried entity
+    similar: List[SimilarEntity]
+
+class SharedInfraLink(BaseModel):
+    phone_a: str
+    phone_b: str
+    weight: float
+    shared_devices: int
+    shared_ips: int
+
+class SharedInfraCluster(BaseModel):
+    cluster_id: str
+    member_count: int
+    members: List[str]  # capped; member_count is exact
+    devices: List[str]  # devices used by two or more members
+    ips: List[str]  # IPs reached by two or more members
+    weight: float  # summed link weight
+    links: List[SharedInfraLink]  # strongest first, capped
+
+class SharedInfrastructure(BaseModel):
+    clusters: List[SharedInfraCluster]
+    phone_count: int  # phones sharing infrastructure with another phone
+    link_count: int
+    skipped_hubs: Dict[str, int]  # device / IP -> phones, above max_hub_phones
+
+class RingWindow(BaseModel):
+    window_start: str
+    window_end: str
+    edge_count: int
+    ring_count: int
+
+class RingEvent(BaseModel):
+    window_start: str
+    event_type: str  # "birth", "growth", "shrink", "merge", "split", "death"
+    ring_id: str
+    member_count: int
+    previous_member_count: Optional[int] = None
+    related: List[str] = []  # rings merged in, or split off
+    overlap: Optional[float] = None  # Jaccard similarity to the predecessor
+
+class RingLineage(BaseModel):
+    ring_id: str
+    born: str
+    last_seen: str
+    ended: Optional[str] = None  # window in which it died or merged away
+    split_from: Optional[str] = None
+    merged_into: Optional[str] = None
+    peak_member_count: int
+    member_count: int  # in the last window it was seen
+    members: List[str]  # last seen members, capped
+
+class RingEvolution(BaseModel):
+    windows: List[RingWindow]
+    rings: List[RingLineage]
+    events: List[RingEvent]
+
+class CaseCreate(BaseModel):
+    seeds: List[str] = Field(
+        ..., min_length=1, max_length=10000,
+        description="Seized phone numbers, accounts or other entity ids"
+    )
+    name: Optional[str] = None
+    hops: int = Field(2, ge=0, le=4, description="Breadth-first hops to expand from the seeds")
+    max_hub_degree: int = Field(500, ge=1, description="Nodes above this degree join the case but are not expanded")
+
+class CaseSummary(BaseModel):
+    case_id: str
+    name: Optional[str] = None
+    seeds: List[str]
+    hops: int
+    max_hub_degree: int
+    node_count: int
+    edge_count: int
+    missing_seeds: List[str] = []  # seeds not present in the graph
+    created_at: str
+    built_at: str  # when the case subgraph was last materialised
 
 class GraphStats(BaseModel):
     total_nodes: int
@@ -145,8 +290,68 @@ class GraphStats(BaseModel):
     node_breakdown: Dict[str, int]
     relationship_breakdown: Dict[str, int]
     density: float
+    graph_version: Optional[int] = None  # stats are cached until the graph changes
 
 class HealthCheck(BaseModel):
     status: str
     neo4j_connected: bool
     message: str
+
+class Readiness(BaseModel):
+    ready: bool
+    database: bool
+    async_database: bool
+    schema_version: Optional[int] = None
+    expected_schema_version: int
+    failed_migration: Optional[int] = None  # migration that failed at startup; retried on the next start
+
+class ConnectionPoolStats(BaseModel):
+    max_pool_size: int
+    servers: Dict[str, Dict[str, int]]  # address -> open / in_use / idle connections
+    in_flight: Dict[str, int]  # read / write queries currently running
+    completed: Dict[str, int]
+    retries: Dict[str, int]  # managed-transaction retries on transient errors
+
+class PoolStats(BaseModel):
+    sync_driver: Optional[ConnectionPoolStats] = None
+    async_driver: Optional[ConnectionPoolStats] = None
+
+class ComputeStats(BaseModel):
+    workers: int
+    batch_workers: int  # workers batch analytics may occupy
+    queued: Dict[str, int]  # priority -> jobs waiting
+    running: Dict[str, int]
+
+class QueryStat(BaseModel):
+    name: str
+    mode: str  # "read", "write" or "auto" (auto-commit)
+    count: int
+    errors: int
+    rows: int
+    mean_ms: float
+    max_ms: float
+    p50_ms: float  # upper bound of the histogram bucket
+    p95_ms: float
+    p99_ms: float
+    db_ms: float  # total server-reported time (planning + streaming)
+    buckets: Dict[str, int]  # bucket upper bound (ms) -> calls
+    last_error: Optional[str] = None
+
+class QueryProfileRequest(BaseModel):
+    params: Dict[str, Any] = Field(default_factory=dict, description="Parameters to profile the query with")
+
+class QueryPlanOperator(BaseModel):
+    operator: str
+    rows: int
+    db_hits: int
+    details: Optional[str] = None
+
+class QueryProfile(BaseModel):
+    name: str
+    db_hits: int
+    rows: int
+    db_ms: Optional[float] = None
+    index_used: bool
+    indexes: List[str]  # index seeks / scans in the plan
+    scans: List[str]  # label or full scans in the plan
+    operators: List[QueryPlanOperator]
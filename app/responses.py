@@ -0,0 +1,227 @@
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from fastapi.responses import Response
+from pydantic_core import to_jsonable_python
+from typing import Any, Dict, List, Tuple
+import json
+import logging
+import struct
+import numpy as np
+# from app.models.schemas import RiskLevel
+from models.schemas import RiskLevel
+
+logger = logging.getLogger(__name__)
+
+# Optional fast paths: fall back to the standard library when not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _default(value: Any) -> Any:
+    """Encode what orjson does not know natively (Pydantic models, Neo4j temporals),
+    and NumPy values on the standard-library path"""
+    if hasattr(value, "iso_format"):
+        return value.iso_format()
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    return to_jsonable_python(value)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response for large payloads.
+
+    Routes return it directly with plain dicts (or already-built models), which
+    skips FastAPI's response_model re-validation and ``jsonable_encoder`` pass;
+    the body is encoded with orjson when it is installed.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(to_jsonable_python(content, fallback=_default))
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+
+# ------------------------------------------------------------------
+# Columnar graph encoding
+# ------------------------------------------------------------------
+
+GRAPH_COLUMNAR_MEDIA_TYPE = "application/vnd.synapsters.graph-columnar"
+GRAPH_COLUMNAR_MAGIC = b"RSG1"
+RISK_LEVELS = [level.value for level in RiskLevel]
+NO_RISK = 255
+
+
+def _strings(values: List[str]) -> np.ndarray:
+    """NUL-joined UTF-8: one TextDecoder call and a split on the client"""
+    return np.frombuffer("\0".join(values).encode("utf-8"), dtype=np.uint8)
+
+
+def encode_graph_columnar(snapshot: Dict[str, Any]) -> bytes:
+    """Encode a plain-dict graph snapshot as typed-array columns.
+
+    Layout (little-endian): ``RSG1`` magic, uint32 header length, a JSON
+    header (counts, label/relation/risk dictionaries and the byte offset,
+    dtype and length of every column), then the columns, each padded to
+    8 bytes so the client can view them as typed arrays without copying.
+    Node ids and entity ids are NUL-joined UTF-8; edge endpoints are int32
+    positions into the node columns; missing numbers are NaN.
+    """
+    nodes, edges = snapshot["nodes"], snapshot["edges"]
+    position = {node["id"]: i for i, node in enumerate(nodes)}
+    labels = sorted({node["label"] for node in nodes})
+    relations = sorted({edge["relation"] for edge in edges})
+    label_code = {label: i for i, label in enumerate(labels)}
+    relation_code = {relation: i for i, relation in enumerate(relations)}
+    risk_code = {level: i for i, level in enumerate(RISK_LEVELS)}
+
+    def metadata(key: str) -> List[Any]:
+        return [edge["metadata"].get(key) for edge in edges]
+
+    def numbers(values: List[Any], dtype) -> np.ndarray:
+        return np.array([np.nan if v is None else v for v in values], dtype=dtype)
+
+    # pandas is slow to import and only needed here
+    import pandas as pd
+
+    times = pd.to_datetime(pd.Series(metadata("timestamp"), dtype=object), errors="coerce", utc=True, format="ISO8601")
+    time_ms = ((times - pd.Timestamp(0, tz="UTC")).dt.total_seconds() * 1000).to_numpy(dtype=np.float64)
+
+    columns: List[Tuple[str, np.ndarray]] = [
+        ("node_id", _strings([node["id"] for node in nodes])),
+        ("node_entity", _strings([node["entity_id"] for node in nodes])),
+        ("node_label", np.array([label_code[node["label"]] for node in nodes], dtype=np.uint8)),
+        ("node_risk", np.array([risk_code.get(node.get("risk_level"), NO_RISK) for node in nodes], dtype=np.uint8)),
+        ("node_degree", np.array([node.get("degree", 0) for node in nodes], dtype=np.int32)),
+        ("edge_source", np.array([position[edge["source"]] for edge in edges], dtype=np.int32)),
+        ("edge_target", np.array([position[edge["target"]] for edge in edges], dtype=np.int32)),
+        ("edge_relation", np.array([relation_code[edge["relation"]] for edge in edges], dtype=np.uint8)),
+        ("edge_weight", numbers([edge["weight"] for edge in edges], np.float32)),
+        ("edge_amount", numbers(metadata("amount"), np.float32)),
+        ("edge_duration", numbers(metadata("duration"), np.float32)),
+        ("edge_time_ms", time_ms),
+    ]
+
+    layout, offset = [], 0
+    for name, column in columns:
+        layout.append({
+            "name": name,
+            "dtype": "utf8" if name in ("node_id", "node_entity") else column.dtype.name,
+            "offset": offset,
+            "length": column.nbytes,
+        })
+        offset += -(-column.nbytes // 8) * 8
+
+    header = json.dumps({
+        "version": 1,
+        "node_count": len(nodes),
+        "edge_count": len(edges),
+        "labels": labels,
+        "relations": relations,
+        "risk_levels": RISK_LEVELS,
+        "columns": layout,
+    }).encode("utf-8")
+    # Columns start on an 8-byte boundary after magic, length and header
+    header += b" " * (-(8 + len(header)) % 8)
+
+    body = bytearray(offset)
+    for (_, column), spec in zip(columns, layout):
+        body[spec["offset"]:spec["offset"] + spec["length"]] = column.astype(column.dtype.newbyteorder("<"), copy=False).tobytes()
+
+    return GRAPH_COLUMNAR_MAGIC + struct.pack("<I", len(header)) + header + bytes(body)
+
+
+class GraphColumnarResponse(Response):
+    """Graph snapshot in the columnar binary encoding"""
+
+    media_type = GRAPH_COLUMNAR_MEDIA_TYPE
+
+    def render(self, content: Dict[str, Any]) -> bytes:
+        return encode_graph_columnar(content)
+
+
+def wants_columnar(accept: str) -> bool:
+    """True when the Accept header asks for the columnar graph encoding"""
+    return GRAPH_COLUMNAR_MEDIA_TYPE in (accept or "")
+
+
+class CompressionMiddleware:
+    """Compress responses above ``minimum_size``: brotli when the client
+    accepts it and the ``brotli`` package is installed, gzip otherwise.
+
+    Brotli compresses whole bodies only, so streamed responses go out
+    uncompressed to brotli clients; gzip compresses them chunk by chunk.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, level: int = 6):
+        self.app = app
+        self.minimum_size = minimum_size
+        # Brotli quality 4-5 is about gzip-6 speed with a better ratio
+        self.brotli_quality = min(11, max(0, level - 1))
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and brotli is not None:
+            accepted = Headers(scope=scope).get("Accept-Encoding", "")
+            if "br" in [part.split(";")[0].strip() for part in accepted.split(",")]:
+                await BrotliResponder(self.app, self.minimum_size, self.brotli_quality)(scope, receive, send)
+                return
+        await self.gzip(scope, receive, send)
+
+
+class BrotliResponder:
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.quality = quality
+        self.start: Message = {}
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        async def send_with_brotli(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Held back until the body shows whether to compress
+                self.start = message
+                self.passthrough = "content-encoding" in Headers(raw=message["headers"])
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            if self.passthrough:
+                if self.start:
+                    await send(self.start)
+                    self.start = {}
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # Streamed or small: send as is
+                self.passthrough = True
+                await send(self.start)
+                self.start = {}
+                await send(message)
+                return
+
+            compressed = brotli.compress(body, quality=self.quality)
+            headers = MutableHeaders(raw=self.start["headers"])
+            headers["Content-Encoding"] = "br"
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(self.start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_with_brotli)
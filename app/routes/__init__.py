@@ -1 +1,25 @@
 # Initialize routes package
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from database.store import GraphStore, get_store, is_embedded, readiness
+
+# Seconds a client is told to wait while startup is still connecting
+STORE_RETRY_AFTER = 5
+
+
+def require_ready():
+    """503 with Retry-After until startup has connected to Neo4j and migrated.
+
+    Opening the connection holds the store lock for the whole connect and
+    migration, so a handler must not wait on it from the event loop.
+    """
+    if not is_embedded() and not readiness()["ready"]:
+        raise HTTPException(status_code=503, detail="Graph store is starting up",
+                            headers={"Retry-After": str(STORE_RETRY_AFTER)})
+
+
+async def ready_store() -> GraphStore:
+    """The graph store for a request handler, resolved off the event loop"""
+    require_ready()
+    return await run_in_threadpool(get_store)
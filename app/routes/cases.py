@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Path, HTTPException
+from typing import List
+import logging
+
+from compute import ComputeRejected, Priority, compute_executor
+from routes import ready_store
+from services.cases import CaseTooLarge, case_store
+from services.intelligence import IntelligenceEngine
+from models.schemas import CaseCreate, CaseSummary
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/v1/cases",
+    tags=["Case Workspaces"],
+)
+
+# -------------------------------------------------------------------
+# Case workspaces
+# -------------------------------------------------------------------
+@router.post("", response_model=CaseSummary, status_code=201, summary="Open a case workspace")
+async def create_case(request: CaseCreate):
+    """Expand the seed entities by ``hops`` and hold the result as a subgraph.
+
+    Pass the returned ``case_id`` to any intelligence endpoint to run it over
+    this case only.
+    """
+    store = await ready_store()
+    try:
+        engine = IntelligenceEngine(store)
+        return await compute_executor.run(
+            Priority.INTERACTIVE,
+            engine.open_case,
+            request.seeds,
+            hops=request.hops,
+            max_hub_degree=request.max_hub_degree,
+            name=request.name
+        )
+    except CaseTooLarge as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ComputeRejected:
+        raise
+    except Exception as e:
+        logger.error(f"Case creation failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("", response_model=List[CaseSummary], summary="List open case workspaces")
+async def list_cases():
+    return [case.summary() for case in case_store.all()]
+
+
+@router.get("/{case_id}", response_model=CaseSummary, summary="Case workspace details")
+async def get_case(case_id: str = Path(..., description="Case workspace id")):
+    case = case_store.get(case_id)
+    if case is None:
+        raise HTTPException(status_code=404, detail=f"Unknown case: {case_id}")
+    return case.summary()
+
+
+@router.delete("/{case_id}", status_code=204, summary="Close a case workspace")
+async def delete_case(case_id: str = Path(..., description="Case workspace id")):
+    if not case_store.remove(case_id):
+        raise HTTPException(status_code=404, detail=f"Unknown case: {case_id}")
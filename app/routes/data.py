@@ -1,10 +1,13 @@
 from fastapi import APIRouter, UploadFile, File, Query, HTTPException
+from starlette.concurrency import run_in_threadpool
 from typing import List
 import os
-# from app.database.graph import get_db
-from database.graph import get_db
+import time
+from routes import ready_store
 # from app.services.etl import ETLPipeline
 from services.etl import ETLPipeline
+from services.projection import invalidate_projection
+from metrics import ETL_DURATION, ETL_ERRORS, ETL_ROWS, ETL_THROUGHPUT
 # from app.config import settings
 from config import settings
 # from app.models.schemas import (
@@ -31,6 +34,7 @@ async def upload_data(
     - sims: SIM card data
     - complaints: Complaint/incident reports
     """
+    store = await ready_store()
     try:
         # Validate file type
         if file_type not in ['calls', 'transactions', 'devices', 'sims', 'complaints']:
@@ -44,20 +48,27 @@ async def upload_data(
             contents = await file.read()
             f.write(contents)
         
-        # Process with ETL pipeline
-        db = get_db()
-        pipeline = ETLPipeline(db)
+        # Process with ETL pipeline (in the threadpool: ingestion blocks on the store)
+        pipeline = ETLPipeline(store)
+        ingest = {
+            'calls': pipeline.ingest_call_records,
+            'transactions': pipeline.ingest_transactions,
+            'devices': pipeline.ingest_devices,
+            'sims': pipeline.ingest_sims,
+            'complaints': pipeline.ingest_complaints,
+        }[file_type]
+        start = time.perf_counter()
+        with ETL_DURATION.time(file_type=file_type):
+            result = await run_in_threadpool(ingest, filepath)
+        elapsed = time.perf_counter() - start
         
-        if file_type == 'calls':
-            result = pipeline.ingest_call_records(filepath)
-        elif file_type == 'transactions':
-            result = pipeline.ingest_transactions(filepath)
-        elif file_type == 'devices':
-            result = pipeline.ingest_devices(filepath)
-        elif file_type == 'sims':
-            result = pipeline.ingest_sims(filepath)
-        elif file_type == 'complaints':
-            result = pipeline.ingest_complaints(filepath)
+        ETL_ROWS.inc(result["inserted"], file_type=file_type)
+        ETL_ERRORS.inc(result["errors"], file_type=file_type)
+        ETL_THROUGHPUT.set(result["inserted"] / elapsed if elapsed > 0 else 0.0, file_type=file_type)
+        
+        # Readers caching whole-graph results (stats, projection) see the change
+        await run_in_threadpool(store.bump_graph_version)
+        invalidate_projection()
         
         return {
             "status": "success",
@@ -1,17 +1,34 @@
 
-from fastapi import APIRouter, Path, Query, HTTPException
+from fastapi import APIRouter, Header, Path, Query, HTTPException
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
+from datetime import datetime
 import logging
 
-from database.graph import get_db
-from services.intelligence import IntelligenceEngine
+from compute import ComputeRejected, Priority, compute_executor
+from routes import ready_store
+from responses import FastJSONResponse, GraphColumnarResponse, GRAPH_COLUMNAR_MEDIA_TYPE, wants_columnar
+from services.cases import CaseWorkspace, NotInCase, case_store
+from services.intelligence import IntelligenceEngine, ANOMALY_SIGNALS
+from services.ring_evolution import TooManyWindows
+from services.velocity import VELOCITY_WINDOWS
+from services.projection import RELATIONS
 from models.schemas import (
     FraudRing,
     Kingpin,
     EntityTimeline,
     AnomalyDetection,
     RiskAssessment,
+    RiskBatchRequest,
+    RiskBatchResponse,
+    RiskBatchError,
     GraphSnapshot,
+    EgoNetwork,
+    MoneyTrail,
+    MoneyCycle,
+    RingEvolution,
+    SimilarEntities,
+    SharedInfrastructure,
 )
 
 logger = logging.getLogger(__name__)
@@ -21,22 +38,104 @@ router = APIRouter(
     tags=["Cybercrime Intelligence"],
 )
 
+
+def _case(case_id: Optional[str]) -> Optional[CaseWorkspace]:
+    """Case workspace named by ``case_id`` (None for the whole graph)"""
+    if case_id is None:
+        return None
+    case = case_store.get(case_id)
+    if case is None:
+        raise HTTPException(status_code=404, detail=f"Unknown case: {case_id}")
+    return case
+
 # -------------------------------------------------------------------
 # Graph snapshot
 # -------------------------------------------------------------------
-@router.get("/graph", response_model=GraphSnapshot, summary="Graph snapshot")
+@router.get(
+    "/graph",
+    response_model=GraphSnapshot,
+    summary="Graph snapshot",
+    responses={200: {"content": {GRAPH_COLUMNAR_MEDIA_TYPE: {}}}},
+)
 async def get_graph_snapshot(
-    limit: int = Query(400, ge=50, le=1000, description="Max relationships to include")
+    limit: int = Query(400, ge=50, le=1000, description="Max relationships to include"),
+    since: Optional[datetime] = Query(None, description="Only events at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only events at or before this time"),
+    accept: Optional[str] = Header(None, description=f"Send {GRAPH_COLUMNAR_MEDIA_TYPE} for the columnar binary encoding"),
+    case_id: Optional[str] = Query(None, description="Run over this case workspace only"),
 ):
+    case = _case(case_id)
+    store = await ready_store()
     try:
-        db = get_db()
-        engine = IntelligenceEngine(db)
-        return engine.get_graph_snapshot(limit=limit)
+        engine = IntelligenceEngine(store, case)
+        snapshot = await compute_executor.run(Priority.INTERACTIVE, engine.get_graph_snapshot, limit=limit, since=since, until=until)
+        # The representation depends on Accept, so caches must key on it
+        if wants_columnar(accept):
+            return GraphColumnarResponse(snapshot, headers={"Vary": "Accept"})
+        return FastJSONResponse(snapshot, headers={"Vary": "Accept"})
+    except ComputeRejected:
+        raise
     except Exception as e:
         logger.error(f"Graph snapshot failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/graph/lod", response_model=GraphSnapshot, summary="Level-of-detail graph snapshot")
+async def get_graph_lod(
+    community_id: Optional[str] = Query(None, description="Community to expand (omit for the top level)"),
+    case_id: Optional[str] = Query(None, description="Run over this case workspace only"),
+):
+    case = _case(case_id)
+    store = await ready_store()
+    try:
+        engine = IntelligenceEngine(store, case)
+        return FastJSONResponse(await compute_executor.run(Priority.INTERACTIVE, engine.get_graph_lod, community_id))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown community: {community_id}")
+    except ComputeRejected:
+        raise
+    except Exception as e:
+        logger.error(f"LOD snapshot failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/ego/{entity_id}", response_model=EgoNetwork, summary="k-hop ego network")
+async def get_ego_network(
+    entity_id: str = Path(..., description="Entity at the centre"),
+    hops: int = Query(2, ge=1, le=4, description="Breadth-first hops"),
+    relations: Optional[List[str]] = Query(None, description="Relationship types to follow (default: all)"),
+    fan_out: int = Query(25, ge=1, le=500, description="Max new neighbours per expanded node"),
+    max_hub_degree: int = Query(500, ge=1, description="Nodes above this degree are shown but not expanded"),
+    case_id: Optional[str] = Query(None, description="Run over this case workspace only"),
+):
+    if relations:
+        invalid = [r for r in relations if r not in RELATIONS]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Invalid relations: {invalid}")
+
+    case = _case(case_id)
+    store = await ready_store()
+    try:
+        engine = IntelligenceEngine(store, case)
+        ego = await compute_executor.run(
+            Priority.INTERACTIVE,
+            engine.get_ego_network,
+            entity_id,
+            hops=hops,
+            relations=relations,
+            fan_out=fan_out,
+            max_hub_degree=max_hub_degree
+        )
+    except ComputeRejected:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if ego is None:
+        raise HTTPException(status_code=404, detail=f"Unknown entity: {entity_id}")
+    return FastJSONResponse(ego)
+
+
 # -------------------------------------------------------------------
 # Fraud rings
 # -------------------------------------------------------------------
@@ -44,44 +143,155 @@ async def get_graph_snapshot(
 async def get_fraud_rings(
     ring_type: Optional[str] = Query(
         None, description="Filter by: sim_mule, call_center, money_laundering"
-    )
+    ),
+    since: Optional[datetime] = Query(None, description="Only calls and transfers at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only calls and transfers at or before this time"),
+    case_id: Optional[str] = Query(None, description="Run over this case workspace only"),
 ):
+    case = _case(case_id)
+    store = await ready_store()
     try:
-        db = get_db()
-        engine = IntelligenceEngine(db)
-        return engine.detect_fraud_rings(ring_type) or []
+        engine = IntelligenceEngine(store, case)
+        rings = await compute_executor.run(Priority.BATCH, engine.detect_fraud_rings, ring_type, since=since, until=until)
+        return FastJSONResponse(rings or [])
+    except ComputeRejected:
+        raise
     except Exception as e:
         logger.error(f"Cluster detection failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/clusters/evolution", response_model=RingEvolution, summary="Fraud ring evolution over time")
+async def get_ring_evolution(
+    since: Optional[datetime] = Query(None, description="Start of the first window (default: earliest call or transfer)"),
+    until: Optional[datetime] = Query(None, description="Last window starts at or before this time (default: latest)"),
+    window_days: float = Query(30.0, gt=0, description="Length of each window in days"),
+    step_days: Optional[float] = Query(None, gt=0, description="Days between window starts (default: window_days)"),
+    min_size: int = Query(3, ge=2, description="Smallest community reported as a ring"),
+    min_jaccard: float = Query(0.3, gt=0, le=1, description="Member overlap for a ring to continue into the next window"),
+    case_id: Optional[str] = Query(None, description="Run over this case workspace only"),
+):
+    case = _case(case_id)
+    store = await ready_store()
+    try:
+        engine = IntelligenceEngine(store, case)
+        return FastJSONResponse(await compute_executor.run(
+            Priority.BATCH,
+            engine.track_ring_evolution,
+            since=since,
+            until=until,
+            window_days=window_days,
+            step_days=step_days,
+            min_size=min_size,
+            min_jaccard=min_jaccard
+        ))
+    except TooManyWindows as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ComputeRejected:
+        raise
+    except Exception as e:
+        logger.error(f"Ring evolution failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# -------------------------------------------------------------------
+# Shared infrastructure
+# -------------------------------------------------------------------
+@router.get("/shared-infrastructure", response_model=SharedInfrastructure, summary="Phones sharing devices and IPs")
+async def get_shared_infrastructure(
+    max_hub_phones: int = Query(50, ge=2, description="Skip devices and IPs used by more phones than this (carrier NAT, public Wi-Fi)"),
+    min_weight: float = Query(0.0, ge=0, description="Weakest phone-to-phone link kept"),
+    min_size: int = Query(2, ge=2, description="Smallest cluster reported"),
+    top_n: int = Query(100, ge=1, le=1000, description="Return the N heaviest clusters"),
+    case_id: Optional[str] = Query(None, description="Run over this case workspace only"),
+):
+    case = _case(case_id)
+    store = await ready_store()
+    try:
+        engine = IntelligenceEngine(store, case)
+        return FastJSONResponse(await compute_executor.run(
+            Priority.BATCH,
+            engine.detect_shared_infrastructure,
+            max_hub_phones=max_hub_phones,
+            min_weight=min_weight,
+            min_size=min_size,
+            top_n=top_n
+        ))
+    except ComputeRejected:
+        raise
+    except Exception as e:
+        logger.error(f"Shared infrastructure detection failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # -------------------------------------------------------------------
 # Kingpins
 # -------------------------------------------------------------------
 @router.get("/kingpins", response_model=List[Kingpin], summary="Identify network kingpins")
 async def get_kingpins(
-    top_k: int = Query(10, ge=1, le=100, description="Return top K kingpins")
+    top_k: int = Query(10, ge=1, le=100, description="Return top K kingpins"),
+    since: Optional[datetime] = Query(None, description="Only timestamped relationships at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only timestamped relationships at or before this time"),
+    case_id: Optional[str] = Query(None, description="Run over this case workspace only"),
 ):
+    case = _case(case_id)
+    store = await ready_store()
     try:
-        db = get_db()
-        engine = IntelligenceEngine(db)
-        return engine.detect_kingpins(top_k)
+        engine = IntelligenceEngine(store, case)
+        return await compute_executor.run(Priority.BATCH, engine.detect_kingpins, top_k, since=since, until=until)
+    except ComputeRejected:
+        raise
     except Exception as e:
         logger.error(f"Kingpin detection failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# -------------------------------------------------------------------
+# Behavioural similarity
+# -------------------------------------------------------------------
+@router.get("/similar/{entity_id}", response_model=SimilarEntities, summary="Behaviourally similar entities")
+async def get_similar_entities(
+    entity_id: str = Path(..., description="Phone number (E.164) or account number"),
+    top_k: int = Query(10, ge=1, le=100, description="Return top K matches"),
+    case_id: Optional[str] = Query(None, description="Run over this case workspace only"),
+):
+    case = _case(case_id)
+    store = await ready_store()
+    try:
+        engine = IntelligenceEngine(store, case)
+        similar = await compute_executor.run(Priority.INTERACTIVE, engine.find_similar_entities, entity_id, top_k=top_k)
+    except NotInCase as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ComputeRejected:
+        raise
+    except Exception as e:
+        logger.error(f"Similarity search failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if similar is None:
+        raise HTTPException(status_code=404, detail=f"No behaviour profile for {entity_id}")
+    return FastJSONResponse(similar)
+
+
 # -------------------------------------------------------------------
 # Timeline
 # -------------------------------------------------------------------
 @router.get("/timeline/{entity_id}", response_model=EntityTimeline, summary="Get entity timeline")
 async def get_timeline(
-    entity_id: str = Path(..., description="Phone number (E.164) or account number")
+    entity_id: str = Path(..., description="Phone number (E.164) or account number"),
+    since: Optional[datetime] = Query(None, description="Only events at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only events at or before this time"),
+    case_id: Optional[str] = Query(None, description="Run over this case workspace only"),
 ):
+    case = _case(case_id)
+    store = await ready_store()
     try:
-        db = get_db()
-        engine = IntelligenceEngine(db)
-        return engine.get_timeline(entity_id)
+        engine = IntelligenceEngine(store, case)
+        return FastJSONResponse(await compute_executor.run(Priority.INTERACTIVE, engine.get_timeline, entity_id, since=since, until=until))
+    except NotInCase as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ComputeRejected:
+        raise
     except Exception as e:
         logger.error(f"Timeline retrieval failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -92,28 +302,228 @@ async def get_timeline(
 # -------------------------------------------------------------------
 @router.get("/risk/{entity_id}", response_model=RiskAssessment, summary="Risk assessment")
 async def assess_risk(
-    entity_id: str = Path(..., description="Phone number (E.164) or account number")
+    entity_id: str = Path(..., description="Phone number (E.164) or account number"),
+    case_id: Optional[str] = Query(None, description="Run over this case workspace only"),
 ):
+    case = _case(case_id)
+    store = await ready_store()
     try:
-        db = get_db()
-        engine = IntelligenceEngine(db)
-        return engine.assess_risk(entity_id)
+        engine = IntelligenceEngine(store, case)
+        return await compute_executor.run(Priority.INTERACTIVE, engine.assess_risk, entity_id)
+    except NotInCase as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ComputeRejected:
+        raise
     except Exception as e:
         logger.error(f"Risk assessment failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/risk/batch", response_model=RiskBatchResponse, summary="Bulk risk assessment")
+async def assess_risk_batch(
+    request: RiskBatchRequest,
+    case_id: Optional[str] = Query(None, description="Run over this case workspace only"),
+):
+    case = _case(case_id)
+    store = await ready_store()
+    try:
+        engine = IntelligenceEngine(store, case)
+        chunks = engine.iter_risk_batch(request.entity_ids)
+        # The first chunk is scored before answering, so a failing store or a
+        # full queue is still a proper error status
+        first = await compute_executor.run(Priority.BATCH, next, chunks, None)
+    except ComputeRejected:
+        raise
+    except Exception as e:
+        logger.error(f"Bulk risk assessment failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def stream():
+        # One JSON object streamed as each chunk of ids is scored; each later
+        # chunk is its own batch job, and a failure ends the stream with an
+        # explicit error instead of a truncated array
+        yield '{"results":['
+        chunk, error, count = first, None, 0
+        while chunk is not None:
+            for result in chunk:
+                yield ("," if count else "") + result.model_dump_json()
+                count += 1
+            try:
+                chunk = await compute_executor.run(Priority.BATCH, next, chunks, None)
+            except ComputeRejected as e:
+                error = RiskBatchError(status_code=e.status_code, detail=str(e))
+                break
+            except Exception as e:
+                logger.error(f"Bulk risk assessment failed after {count} results: {e}")
+                error = RiskBatchError(status_code=500, detail=str(e))
+                break
+        yield '],"error":' + (error.model_dump_json() if error else 'null') + '}'
+
+    return StreamingResponse(stream(), media_type="application/json")
+
+
 # -------------------------------------------------------------------
 # Anomalies
 # -------------------------------------------------------------------
+@router.get("/anomalies", response_model=List[AnomalyDetection], summary="Graph-wide anomaly sweep")
+async def sweep_anomalies(
+    anomaly_type: Optional[str] = Query(
+        None, description="Filter by: sim_swap, device_hop, call_burst, money_movement"
+    ),
+    top_n: int = Query(100, ge=1, le=10000, description="Return top N anomalies"),
+    case_id: Optional[str] = Query(None, description="Run over this case workspace only"),
+):
+    if anomaly_type and anomaly_type not in ANOMALY_SIGNALS:
+        raise HTTPException(status_code=400, detail=f"Invalid anomaly_type: {anomaly_type}")
+    case = _case(case_id)
+    store = await ready_store()
+    try:
+        engine = IntelligenceEngine(store, case)
+        return await compute_executor.run(Priority.BATCH, engine.sweep_anomalies, anomaly_type, top_n)
+    except ComputeRejected:
+        raise
+    except Exception as e:
+        logger.error(f"Anomaly sweep failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/anomalies/{entity_id}", response_model=List[AnomalyDetection], summary="Detect anomalies")
 async def get_anomalies(
-    entity_id: str = Path(..., description="Phone number (E.164) or account number")
+    entity_id: str = Path(..., description="Phone number (E.164) or account number"),
+    since: Optional[datetime] = Query(None, description="Only events at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only events at or before this time"),
+    case_id: Optional[str] = Query(None, description="Run over this case workspace only"),
 ):
+    case = _case(case_id)
+    store = await ready_store()
     try:
-        db = get_db()
-        engine = IntelligenceEngine(db)
-        return engine.detect_anomalies(entity_id)
+        engine = IntelligenceEngine(store, case)
+        return await compute_executor.run(Priority.INTERACTIVE, engine.detect_anomalies, entity_id, since=since, until=until)
+    except NotInCase as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ComputeRejected:
+        raise
     except Exception as e:
         logger.error(f"Anomaly detection failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+# -------------------------------------------------------------------
+# Velocity
+# -------------------------------------------------------------------
+def _check_windows(windows: List[str]):
+    invalid = [w for w in windows if w not in VELOCITY_WINDOWS]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid windows: {invalid}")
+
+
+@router.get("/velocity", response_model=List[AnomalyDetection], summary="Sliding-window velocity anomalies")
+async def get_velocity_anomalies(
+    windows: List[str] = Query(["1m", "1h", "1d"], description="Windows: 1m, 1h, 1d"),
+    z_threshold: float = Query(3.0, gt=0, description="Flag windows this many std-devs above baseline"),
+    top_n: int = Query(100, ge=1, le=10000, description="Return top N windows"),
+    case_id: Optional[str] = Query(None, description="Run over this case workspace only"),
+):
+    _check_windows(windows)
+    case = _case(case_id)
+    store = await ready_store()
+    try:
+        engine = IntelligenceEngine(store, case)
+        return await compute_executor.run(
+            Priority.BATCH,
+            engine.detect_velocity_anomalies,
+            windows=windows, z_threshold=z_threshold, top_n=top_n
+        )
+    except ComputeRejected:
+        raise
+    except Exception as e:
+        logger.error(f"Velocity detection failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/velocity/{entity_id}", response_model=List[AnomalyDetection], summary="Entity velocity anomalies")
+async def get_entity_velocity_anomalies(
+    entity_id: str = Path(..., description="Phone number (E.164) or account number"),
+    windows: List[str] = Query(["1m", "1h", "1d"], description="Windows: 1m, 1h, 1d"),
+    z_threshold: float = Query(3.0, gt=0, description="Flag windows this many std-devs above baseline"),
+    case_id: Optional[str] = Query(None, description="Run over this case workspace only"),
+):
+    _check_windows(windows)
+    case = _case(case_id)
+    store = await ready_store()
+    try:
+        engine = IntelligenceEngine(store, case)
+        return await compute_executor.run(
+            Priority.INTERACTIVE,
+            engine.detect_velocity_anomalies,
+            entity_ids=[entity_id], windows=windows, z_threshold=z_threshold
+        )
+    except ComputeRejected:
+        raise
+    except Exception as e:
+        logger.error(f"Velocity detection failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# -------------------------------------------------------------------
+# Money trail
+# -------------------------------------------------------------------
+@router.get("/money-trail/{account_number}", response_model=MoneyTrail, summary="Trace money flow")
+async def get_money_trail(
+    account_number: str = Path(..., description="Source bank account number"),
+    max_hops: int = Query(6, ge=1, le=10, description="Maximum transfer hops"),
+    top_k: int = Query(20, ge=1, le=200, description="Return top K paths"),
+    min_fraction: float = Query(0.1, ge=0, le=1, description="Each hop must carry this share of the previous one"),
+    max_gap_hours: Optional[float] = Query(72.0, gt=0, description="Maximum delay between consecutive hops"),
+    since: Optional[datetime] = Query(None, description="Only follow transfers at or after this time"),
+    case_id: Optional[str] = Query(None, description="Run over this case workspace only"),
+):
+    case = _case(case_id)
+    store = await ready_store()
+    try:
+        engine = IntelligenceEngine(store, case)
+        return await compute_executor.run(
+            Priority.INTERACTIVE,
+            engine.trace_money_trail,
+            account_number.strip().upper(),
+            max_hops=max_hops,
+            top_k=top_k,
+            min_fraction=min_fraction,
+            max_gap_hours=max_gap_hours,
+            since=since,
+        )
+    except ComputeRejected:
+        raise
+    except Exception as e:
+        logger.error(f"Money trail tracing failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# -------------------------------------------------------------------
+# Round-tripping cycles
+# -------------------------------------------------------------------
+@router.get("/cycles", response_model=List[MoneyCycle], summary="Detect round-tripping cycles")
+async def get_money_cycles(
+    max_length: int = Query(5, ge=2, le=8, description="Maximum accounts in a cycle"),
+    window_hours: float = Query(72.0, gt=0, description="Cycle must close within this many hours"),
+    min_amount: float = Query(0.0, ge=0, description="Ignore transfers below this amount"),
+    top_k: int = Query(100, ge=1, le=1000, description="Return top K cycles"),
+    case_id: Optional[str] = Query(None, description="Run over this case workspace only"),
+):
+    case = _case(case_id)
+    store = await ready_store()
+    try:
+        engine = IntelligenceEngine(store, case)
+        return await compute_executor.run(
+            Priority.BATCH,
+            engine.detect_money_cycles,
+            max_length=max_length,
+            window_hours=window_hours,
+            min_amount=min_amount,
+            top_k=top_k,
+        )
+    except ComputeRejected:
+        raise
+    except Exception as e:
+        logger.error(f"Cycle detection failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -95,10 +95,20 @@
 
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from typing import List
 import logging
 
-from database.graph import get_db
-from models.schemas import GraphStats, HealthCheck
+from compute import compute_executor
+from database.graph import get_db, get_async_db
+from database.store import get_store, is_embedded, readiness
+from database.instrumentation import query_recorder
+from routes import ready_store, require_ready
+from services.graph_stats import graph_stats_cache
+from models.schemas import (
+    ComputeStats, GraphStats, HealthCheck, PoolStats, QueryStat, QueryProfileRequest, QueryProfile, Readiness
+)
 
 logger = logging.getLogger(__name__)
 
@@ -113,10 +123,13 @@ router = APIRouter(
 @router.get("/health", response_model=HealthCheck, summary="Health check")
 async def health_check():
     try:
-        db = get_db()
-
-        result = db.execute_query("RETURN 1 AS status")
-        neo4j_connected = len(result) > 0
+        if is_embedded():
+            # No server to reach: the flag reports the embedded store instead
+            neo4j_connected = await run_in_threadpool(lambda: get_store().ping())
+        else:
+            db = await get_async_db()
+            result = await db.execute_read("RETURN 1 AS status", name="health")
+            neo4j_connected = len(result) > 0
 
         return HealthCheck(
             status="operational" if neo4j_connected else "degraded",
@@ -135,73 +148,93 @@ async def health_check():
         )
 
 
+# ------------------------------------------------------------------
+# Liveness / Readiness (no database round trip)
+# ------------------------------------------------------------------
+@router.get("/live", summary="Liveness probe")
+async def liveness():
+    """The process is up and serving; says nothing about the database"""
+    return {"status": "alive"}
+
+
+@router.get("/ready", response_model=Readiness, summary="Readiness probe",
+            responses={503: {"model": Readiness}})
+async def ready():
+    """200 once both drivers are connected and migrations have run, 503 until then"""
+    state = readiness()
+    if not state["ready"]:
+        return JSONResponse(status_code=503, content=state)
+    return state
+
+
 # ------------------------------------------------------------------
 # Graph Statistics
 # ------------------------------------------------------------------
 @router.get("/graph/stats", response_model=GraphStats, summary="Graph statistics")
 async def get_graph_stats():
+    """Per-label and per-type counts from the count store, cached per graph version"""
     try:
-        db = get_db()
-
-        # ----------------------------------
-        # Node breakdown
-        # ----------------------------------
-        node_results = db.execute_query(
-            """
-            MATCH (n)
-            WITH labels(n)[0] AS node_type, count(*) AS count
-            RETURN node_type, count
-            ORDER BY count DESC
-            """
-        )
+        if is_embedded():
+            return await run_in_threadpool(graph_stats_cache.get_from_store, await ready_store())
+        db = await get_async_db()
+        return await graph_stats_cache.get(db)
 
-        node_breakdown = {}
-        total_nodes = 0
-
-        for row in node_results:
-            node_type = row.get("node_type", "Unknown")
-            count = row.get("count", 0)
-            node_breakdown[node_type] = count
-            total_nodes += count
-
-        # ----------------------------------
-        # Relationship breakdown
-        # ----------------------------------
-        rel_results = db.execute_query(
-            """
-            MATCH ()-[r]->()
-            WITH type(r) AS rel_type, count(*) AS count
-            RETURN rel_type, count
-            ORDER BY count DESC
-            """
-        )
+    except Exception as e:
+        logger.error(f"Graph stats retrieval failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        relationship_breakdown = {}
-        total_relationships = 0
-
-        for row in rel_results:
-            rel_type = row.get("rel_type", "Unknown")
-            count = row.get("count", 0)
-            relationship_breakdown[rel_type] = count
-            total_relationships += count
-
-        # ----------------------------------
-        # Graph density
-        # ----------------------------------
-        if total_nodes > 1:
-            max_edges = total_nodes * (total_nodes - 1)
-            density = total_relationships / max_edges if max_edges > 0 else 0
-        else:
-            density = 0.0
-
-        return GraphStats(
-            total_nodes=total_nodes,
-            total_relationships=total_relationships,
-            node_breakdown=node_breakdown,
-            relationship_breakdown=relationship_breakdown,
-            density=min(1.0, density),
+
+# ------------------------------------------------------------------
+# Connection Pools
+# ------------------------------------------------------------------
+@router.get("/pool", response_model=PoolStats, summary="Neo4j connection pool utilization")
+async def get_pool_stats():
+    if is_embedded():
+        return PoolStats()
+    require_ready()
+    try:
+        db = await run_in_threadpool(get_db)
+        async_db = await get_async_db()
+
+        return PoolStats(
+            sync_driver=db.pool_stats(),
+            async_driver=async_db.pool_stats(),
         )
 
     except Exception as e:
-        logger.error(f"Graph stats retrieval failed: {e}")
+        logger.error(f"Pool stats retrieval failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/compute", response_model=ComputeStats, summary="Compute executor queues")
+async def get_compute_stats():
+    return compute_executor.stats()
+
+
+# ------------------------------------------------------------------
+# Query Instrumentation
+# ------------------------------------------------------------------
+@router.get("/queries", response_model=List[QueryStat], summary="Per-query latency and error stats")
+async def get_query_stats():
+    return query_recorder.snapshot()
+
+
+@router.post("/queries/{name}/profile", response_model=QueryProfile, summary="PROFILE a recorded query")
+async def profile_query(name: str, request: QueryProfileRequest):
+    """Run the latest text of a recorded read query under PROFILE with the given parameters"""
+    metrics = query_recorder.get(name)
+    if metrics is None:
+        raise HTTPException(status_code=404, detail=f"No recorded query named {name}")
+    if metrics.mode != "read":
+        raise HTTPException(status_code=400, detail=f"Only read queries can be profiled; {name} is {metrics.mode}")
+    if is_embedded():
+        raise HTTPException(status_code=400, detail="PROFILE needs the Neo4j backend")
+
+    try:
+        db = await get_async_db()
+        profile = await db.profile(metrics.query, request.params)
+        return QueryProfile(name=name, **profile)
+
+    except Exception as e:
+        logger.error(f"Query profile failed for {name}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,228 @@
+import numpy as np
+from typing import List, Optional, Tuple
+import logging
+import threading
+from metrics import ANALYTICS_DURATION, cache_lookup
+from services.projection import GraphProjection, LABELS, NO_TIME
+
+logger = logging.getLogger(__name__)
+
+# Entities that get a behavioural profile
+PROFILED_LABELS = ('Phone', 'BankAccount')
+
+# Call duration bands in seconds: short pings, conversations, long sessions
+DURATION_BINS = (30, 120, 600)
+
+# Activity in six four-hour bands of the day (UTC)
+HOUR_BANDS = 6
+
+FEATURES = (
+    'calls_log', 'calls_under_30s', 'calls_30s_2m', 'calls_2m_10m', 'calls_over_10m',
+    'fan_out_log', 'fan_in_log',
+    'transactions_log', 'amount_log_mean', 'amount_log_std',
+    *(f'active_{band * 24 // HOUR_BANDS:02d}h' for band in range(HOUR_BANDS)),
+    'devices_log', 'sims_log',
+)
+
+
+def behavior_features(projection: GraphProjection, nodes: np.ndarray) -> np.ndarray:
+    """Raw feature matrix (one row per node, columns as ``FEATURES``).
+
+    One linear pass over the edge arrays picks out the edges of ``nodes``
+    (no adjacency has to be built first, which matters right after a
+    catch-up), and every feature is a ``bincount`` over them.
+    """
+    p = projection
+    n = len(nodes)
+    local = np.full(p.node_count, -1, dtype=np.int64)
+    local[nodes] = np.arange(n)
+
+    edges = np.flatnonzero((local[p.src] >= 0) | (local[p.dst] >= 0))
+
+    # One row per (profiled endpoint, edge); ``out`` marks the source side
+    ends = np.concatenate([p.src[edges], p.dst[edges]])
+    keep = local[ends] >= 0
+    owner = local[ends[keep]]
+    edge = np.tile(edges, 2)[keep]
+    out = np.repeat([True, False], len(edges))[keep]
+    other = np.concatenate([p.dst[edges], p.src[edges]])[keep]
+    rel = p.rel[edge]
+
+    def count(mask: np.ndarray, weights: Optional[np.ndarray] = None) -> np.ndarray:
+        return np.bincount(owner[mask], weights=None if weights is None else weights[mask], minlength=n)
+
+    def share(parts: List[np.ndarray], total: np.ndarray) -> List[np.ndarray]:
+        return [part / np.maximum(total, 1) for part in parts]
+
+    calls = rel == p.relation_code('MADE')
+    sent = rel == p.relation_code('SENT')
+    talk = calls | sent
+
+    # Call-duration distribution
+    duration = p.duration[edge]
+    band = np.digitize(np.nan_to_num(duration), DURATION_BINS)
+    timed_calls = calls & ~np.isnan(duration)
+    call_total = count(calls)
+    call_bands = share([count(timed_calls & (band == b)) for b in range(len(DURATION_BINS) + 1)],
+                       count(timed_calls))
+
+    # Fan-out / fan-in: distinct counterparties
+    def distinct(mask: np.ndarray) -> np.ndarray:
+        pairs = np.unique(owner[mask] * p.node_count + other[mask])
+        return np.bincount(pairs // p.node_count, minlength=n)
+
+    # Transaction sizes on a log scale
+    amount = p.amount[edge]
+    priced = sent & ~np.isnan(amount) & (amount > 0)
+    log_amount = np.log10(np.where(priced, amount, 1.0))
+    priced_total = np.maximum(count(priced), 1)
+    mean = count(priced, log_amount) / priced_total
+    spread = np.sqrt(np.maximum(count(priced, log_amount ** 2) / priced_total - mean ** 2, 0))
+
+    # Activity hours
+    ts = p.ts[edge]
+    timed = talk & (ts != NO_TIME)
+    hour_band = (ts % 86400) * HOUR_BANDS // 86400
+    hours = share([count(timed & (hour_band == b)) for b in range(HOUR_BANDS)], count(timed))
+
+    # Device and SIM churn of phones
+    devices = count(out & (rel == p.relation_code('RUNS_ON')))
+    sims = count(out & (rel == p.relation_code('HAS_SIM')))
+
+    columns = [
+        np.log1p(call_total), *call_bands,
+        np.log1p(distinct(out & talk)), np.log1p(distinct(~out & talk)),
+        np.log1p(count(sent)), mean, spread,
+        *hours,
+        np.log1p(devices), np.log1p(sims),
+    ]
+    return np.column_stack(columns).astype(np.float32)
+
+
+class BehaviorIndex:
+    """Cosine nearest-neighbour index over behavioural feature vectors.
+
+    Features are standardised with the column statistics of the first
+    build. The unit vectors live in one growable float32 matrix, stored
+    feature-major so each feature is contiguous across entities; a query is
+    a single vector-matrix product plus a partial sort, a few milliseconds
+    per million entities. When the projection is caught up with new ingest,
+    only the entities the new edges touch are re-profiled and upserted.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.lineage: Optional[int] = None
+        self.edge_count = 0
+        self.size = 0
+        self.nodes = np.zeros(0, dtype=np.int64)       # projection node per row
+        self.row_of = np.zeros(0, dtype=np.int64)      # row per projection node, -1 if unprofiled
+        self.vectors = np.zeros((len(FEATURES), 0), dtype=np.float32)  # feature x row
+        self.norms = np.zeros(0, dtype=np.float32)
+        self.center = np.zeros(len(FEATURES), dtype=np.float32)
+        self.scale = np.ones(len(FEATURES), dtype=np.float32)
+
+    @staticmethod
+    def _profiled(projection: GraphProjection, nodes: np.ndarray) -> np.ndarray:
+        codes = [LABELS.index(label) for label in PROFILED_LABELS]
+        return nodes[np.isin(projection.node_labels[nodes], codes)]
+
+    def _upsert(self, nodes: np.ndarray, raw: np.ndarray, node_count: int):
+        if len(self.row_of) < node_count:
+            self.row_of = np.concatenate([self.row_of, np.full(node_count - len(self.row_of), -1, dtype=np.int64)])
+        rows = self.row_of[nodes]
+        new = rows < 0
+        needed = self.size + int(new.sum())
+        if needed > len(self.norms):
+            capacity = max(needed, 2 * len(self.norms))
+            grow = capacity - len(self.norms)
+            self.vectors = np.concatenate([self.vectors, np.zeros((len(FEATURES), grow), dtype=np.float32)], axis=1)
+            self.norms = np.concatenate([self.norms, np.zeros(grow, dtype=np.float32)])
+            self.nodes = np.concatenate([self.nodes, np.full(grow, -1, dtype=np.int64)])
+        rows[new] = np.arange(self.size, needed)
+        self.row_of[nodes[new]] = rows[new]
+        self.nodes[rows] = nodes
+        self.size = needed
+
+        # Stored unit-length, so cosine similarity is a plain dot product
+        vectors = (raw - self.center) / self.scale
+        norms = np.maximum(np.linalg.norm(vectors, axis=1), 1e-6)
+        self.vectors[:, rows] = (vectors / norms[:, None]).T
+        self.norms[rows] = norms
+
+    def refresh(self, projection: GraphProjection):
+        """Bring the index up to date with ``projection``"""
+        with self._lock:
+            # Node ids are stable within a lineage, so an index that is already
+            # ahead of an older projection still answers for it
+            current = self.lineage == projection.lineage
+            cache_lookup("behavior_index", current and self.edge_count >= projection.edge_count)
+            if current and self.edge_count >= projection.edge_count:
+                return
+
+            if current:
+                with ANALYTICS_DURATION.time(algorithm="behavior_index_update"):
+                    fresh = slice(self.edge_count, projection.edge_count)
+                    touched = np.unique(np.concatenate([projection.src[fresh], projection.dst[fresh]]))
+                    nodes = self._profiled(projection, touched)
+                    self._upsert(nodes, behavior_features(projection, nodes), projection.node_count)
+                logger.info(f"✓ Behaviour index updated for {len(nodes)} entities")
+            else:
+                with ANALYTICS_DURATION.time(algorithm="behavior_index_build"):
+                    nodes = self._profiled(projection, np.arange(projection.node_count))
+                    raw = behavior_features(projection, nodes)
+                    self.center = raw.mean(axis=0) if len(raw) else np.zeros(len(FEATURES), dtype=np.float32)
+                    self.scale = np.maximum(raw.std(axis=0), 1e-3) if len(raw) else np.ones(len(FEATURES), dtype=np.float32)
+                    self.size = 0
+                    self.row_of = np.zeros(0, dtype=np.int64)
+                    self.vectors = np.zeros((len(FEATURES), 0), dtype=np.float32)
+                    self.norms = np.zeros(0, dtype=np.float32)
+                    self.nodes = np.zeros(0, dtype=np.int64)
+                    self._upsert(nodes, raw, projection.node_count)
+                logger.info(f"✓ Behaviour index built for {len(nodes)} entities")
+
+            self.lineage = projection.lineage
+            self.edge_count = projection.edge_count
+
+    def features(self, node: int) -> Optional[np.ndarray]:
+        """Raw features of a profiled node"""
+        with self._lock:
+            if node >= len(self.row_of) or self.row_of[node] < 0:
+                return None
+            row = self.row_of[node]
+            return self.vectors[:, row] * self.norms[row] * self.scale + self.center
+
+    def nearest(
+        self,
+        node: int,
+        k: int,
+        allowed: Optional[np.ndarray] = None
+    ) -> Optional[List[Tuple[int, float]]]:
+        """The ``k`` profiled nodes most similar to ``node`` as ``(node, cosine)``,
+        optionally only among the ``allowed`` projection nodes; None if unprofiled"""
+        with self._lock:
+            if node >= len(self.row_of) or self.row_of[node] < 0:
+                return None
+            row = self.row_of[node]
+            query = self.vectors[:, row]
+            if allowed is None:
+                nodes = self.nodes[:self.size]
+                scores = query @ self.vectors[:, :self.size]
+                scores[row] = -np.inf
+                k = min(k, self.size - 1)
+            else:
+                # Only the allowed rows are scored
+                rows = self.row_of[allowed[allowed < len(self.row_of)]]
+                rows = rows[(rows >= 0) & (rows != row)]
+                nodes = self.nodes[rows]
+                scores = query @ self.vectors[:, rows]
+                k = min(k, len(rows))
+
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(nodes[r]), float(scores[r])) for r in top]
+
+
+behavior_index = BehaviorIndex()
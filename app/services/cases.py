@@ -0,0 +1,159 @@
+import numpy as np
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional
+import logging
+from compute import check_deadline
+from config import settings
+# from app.models.schemas import CaseSummary
+from models.schemas import CaseSummary
+from services.projection import GraphProjection, csr_rows
+
+logger = logging.getLogger(__name__)
+
+
+class CaseTooLarge(ValueError):
+    """The expansion would exceed ``CASE_MAX_NODES``"""
+
+
+class NotInCase(LookupError):
+    """An entity was looked up in a case it is not part of"""
+
+
+def expand_case(
+    projection: GraphProjection,
+    seeds: np.ndarray,
+    hops: int,
+    max_hub_degree: int,
+    max_nodes: int
+) -> np.ndarray:
+    """Nodes within ``hops`` of the seeds, by breadth-first expansion over all relationships.
+
+    Nodes above ``max_hub_degree`` (carrier NAT IPs, call-centre numbers)
+    join the case but are not expanded, or one shared IP would pull in half
+    the country. Seeds are always expanded. Each hop only reads the
+    adjacency rows of its frontier.
+    """
+    offsets, neighbors, _ = projection.incident_adjacency()
+    degree = projection.degree()
+
+    member = np.zeros(projection.node_count, dtype=bool)
+    member[seeds] = True
+    count = len(seeds)
+    frontier = seeds
+    for hop in range(hops):
+        check_deadline()
+        expandable = frontier if hop == 0 else frontier[degree[frontier] <= max_hub_degree]
+        reached = np.unique(csr_rows(offsets, neighbors, expandable))
+        fresh = reached[~member[reached]]
+        count += len(fresh)
+        if count > max_nodes:
+            raise CaseTooLarge(
+                f"Case expands to more than {max_nodes} entities at hop {hop + 1}; "
+                f"use fewer hops or a lower max_hub_degree"
+            )
+        member[fresh] = True
+        frontier = fresh
+        if len(frontier) == 0:
+            break
+
+    return np.flatnonzero(member)
+
+
+class CaseWorkspace:
+    """Seed entities and their k-hop neighbourhood, held as a projection subgraph.
+
+    The subgraph is cut from the shared projection and cut again whenever
+    that projection is rebuilt, so new evidence ingested since the case was
+    opened is picked up without re-creating it.
+    """
+
+    def __init__(self, seeds: List[str], hops: int, max_hub_degree: int, name: Optional[str] = None):
+        self.case_id = f"case_{uuid.uuid4().hex[:12]}"
+        self.name = name
+        self.seeds = list(dict.fromkeys(seeds))
+        self.hops = hops
+        self.max_hub_degree = max_hub_degree
+        self.created_at = datetime.now().isoformat()
+        self.missing_seeds: List[str] = []
+        self._base: Optional[GraphProjection] = None
+        self._projection: Optional[GraphProjection] = None
+        self._lock = threading.Lock()
+
+    def projection(self, base: GraphProjection) -> GraphProjection:
+        """The case subgraph of ``base``, materialised once per base projection"""
+        with self._lock:
+            if self._base is not base:
+                self._projection = self._materialize(base)
+                self._base = base
+            return self._projection
+
+    def _materialize(self, base: GraphProjection) -> GraphProjection:
+        found = [base.index[s] for s in self.seeds if s in base.index]
+        self.missing_seeds = [s for s in self.seeds if s not in base.index]
+
+        nodes = expand_case(
+            base,
+            np.asarray(found, dtype=np.int64),
+            self.hops,
+            self.max_hub_degree,
+            settings.CASE_MAX_NODES
+        )
+        projection = base.subgraph(nodes)
+        logger.info(
+            f"✓ Case {self.case_id} materialised: {projection.node_count} nodes, "
+            f"{projection.edge_count} edges from {len(found)} seeds"
+        )
+        return projection
+
+    def summary(self) -> CaseSummary:
+        projection = self._projection
+        return CaseSummary(
+            case_id=self.case_id,
+            name=self.name,
+            seeds=self.seeds,
+            hops=self.hops,
+            max_hub_degree=self.max_hub_degree,
+            node_count=projection.node_count if projection else 0,
+            edge_count=projection.edge_count if projection else 0,
+            missing_seeds=self.missing_seeds,
+            created_at=self.created_at,
+            built_at=datetime.fromtimestamp(projection.built_at).isoformat() if projection else self.created_at
+        )
+
+
+class CaseStore:
+    """Open case workspaces, least recently used dropped first"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._cases: "OrderedDict[str, CaseWorkspace]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, case: CaseWorkspace) -> CaseWorkspace:
+        with self._lock:
+            self._cases[case.case_id] = case
+            while len(self._cases) > self.limit:
+                dropped, _ = self._cases.popitem(last=False)
+                logger.info(f"Case {dropped} dropped (workspace limit {self.limit})")
+        return case
+
+    def get(self, case_id: str) -> Optional[CaseWorkspace]:
+        with self._lock:
+            case = self._cases.get(case_id)
+            if case is not None:
+                self._cases.move_to_end(case_id)
+            return case
+
+    def remove(self, case_id: str) -> bool:
+        with self._lock:
+            return self._cases.pop(case_id, None) is not None
+
+    def all(self) -> List[CaseWorkspace]:
+        with self._lock:
+            return list(self._cases.values())
+
+
+case_store = CaseStore(settings.CASE_MAX_WORKSPACES)
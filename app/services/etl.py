@@ -1,13 +1,19 @@
-import pandas as pd
-from typing import Dict, List, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from datetime import datetime
 import logging
 import re
-# from app.database.graph import Neo4jConnection
-from database.graph import Neo4jConnection
+from database.store import GraphStore
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+def read_upload(filepath: str) -> 'pd.DataFrame':
+    """Load an uploaded CSV"""
+    import pandas as pd  # heavy; imported on first upload to keep startup fast
+    return pd.read_csv(filepath)
+
 class DataNormalizer:
     """Normalize and deduplicate entity data"""
     
@@ -37,18 +43,47 @@ class DataNormalizer:
     def normalize_ip(ip: str) -> str:
         """Validate and normalize IP address"""
         return str(ip).strip()
+    
+    @staticmethod
+    def parse_timestamps(df: 'pd.DataFrame', column: str) -> None:
+        """Parse a timestamp column in place, once per file (naive UTC)"""
+        import pandas as pd
+        
+        if column not in df.columns:
+            df[column] = pd.NaT
+        df[column] = pd.to_datetime(
+            df[column], errors='coerce', utc=True, format='ISO8601'
+        ).dt.tz_convert(None)
+    
+    @staticmethod
+    def normalize_timestamp(value) -> Optional[datetime]:
+        """Convert a parsed timestamp cell to a native datetime (None if missing or malformed)"""
+        import pandas as pd
+        
+        if pd.isna(value):
+            return None
+        return value.to_pydatetime()
+    
+    @classmethod
+    def event_timestamp(cls, value) -> datetime:
+        """Timestamp of an event row; a row without a usable one is rejected, not dated"""
+        timestamp = cls.normalize_timestamp(value)
+        if timestamp is None:
+            raise ValueError("missing or malformed timestamp")
+        return timestamp
 
 class ETLPipeline:
     """ETL Pipeline for ingesting cybercrime data"""
     
-    def __init__(self, db: Neo4jConnection):
-        self.db = db
+    def __init__(self, store: GraphStore):
+        self.store = store
         self.normalizer = DataNormalizer()
     
     def ingest_call_records(self, filepath: str) -> Dict:
         """Ingest CDR (Call Detail Records) data"""
         try:
-            df = pd.read_csv(filepath)
+            df = read_upload(filepath)
+            self.normalizer.parse_timestamps(df, 'timestamp')
             stats = {"inserted": 0, "updated": 0, "errors": 0}
             
             for _, row in df.iterrows():
@@ -56,26 +91,14 @@ class ETLPipeline:
                     from_phone = self.normalizer.normalize_phone(row['from_phone'])
                     to_phone = self.normalizer.normalize_phone(row['to_phone'])
                     
-                    query = """
-                    MERGE (p1:Phone {phone_number: $from_phone})
-                    MERGE (p2:Phone {phone_number: $to_phone})
-                    MERGE (p1)-[c:MADE {
-                        call_id: $call_id,
-                        duration: $duration,
-                        timestamp: $timestamp,
-                        call_type: $call_type
-                    }]->(p2)
-                    RETURN c
-                    """
-                    
-                    result = self.db.execute_query(query, {
-                        'from_phone': from_phone,
-                        'to_phone': to_phone,
-                        'call_id': str(row.get('call_id', 'call_' + str(row.name))),
-                        'duration': int(row.get('duration_seconds', 0)),
-                        'timestamp': str(row.get('timestamp', datetime.now().isoformat())),
-                        'call_type': str(row.get('call_type', 'outgoing'))
-                    })
+                    self.store.merge_call(
+                        from_phone,
+                        to_phone,
+                        call_id=str(row.get('call_id', 'call_' + str(row.name))),
+                        duration=int(row.get('duration_seconds', 0)),
+                        timestamp=self.normalizer.event_timestamp(row['timestamp']),
+                        call_type=str(row.get('call_type', 'outgoing'))
+                    )
                     
                     stats["inserted"] += 1
                 except Exception as e:
@@ -92,7 +115,8 @@ class ETLPipeline:
     def ingest_transactions(self, filepath: str) -> Dict:
         """Ingest bank transaction data"""
         try:
-            df = pd.read_csv(filepath)
+            df = read_upload(filepath)
+            self.normalizer.parse_timestamps(df, 'timestamp')
             stats = {"inserted": 0, "updated": 0, "errors": 0}
             
             for _, row in df.iterrows():
@@ -100,26 +124,14 @@ class ETLPipeline:
                     from_acc = self.normalizer.normalize_account(row['from_account'])
                     to_acc = self.normalizer.normalize_account(row['to_account'])
                     
-                    query = """
-                    MERGE (b1:BankAccount {account_number: $from_acc})
-                    MERGE (b2:BankAccount {account_number: $to_acc})
-                    MERGE (b1)-[t:SENT {
-                        transaction_id: $transaction_id,
-                        amount: $amount,
-                        timestamp: $timestamp,
-                        transaction_type: $transaction_type
-                    }]->(b2)
-                    RETURN t
-                    """
-                    
-                    self.db.execute_query(query, {
-                        'from_acc': from_acc,
-                        'to_acc': to_acc,
-                        'transaction_id': str(row.get('transaction_id', 'txn_' + str(row.name))),
-                        'amount': float(row.get('amount', 0)),
-                        'timestamp': str(row.get('timestamp', datetime.now().isoformat())),
-                        'transaction_type': str(row.get('transaction_type', 'transfer'))
-                    })
+                    self.store.merge_transaction(
+                        from_acc,
+                        to_acc,
+                        transaction_id=str(row.get('transaction_id', 'txn_' + str(row.name))),
+                        amount=float(row.get('amount', 0)),
+                        timestamp=self.normalizer.event_timestamp(row['timestamp']),
+                        transaction_type=str(row.get('transaction_type', 'transfer'))
+                    )
                     
                     stats["inserted"] += 1
                 except Exception as e:
@@ -136,7 +148,8 @@ class ETLPipeline:
     def ingest_devices(self, filepath: str) -> Dict:
         """Ingest device and IP mapping data"""
         try:
-            df = pd.read_csv(filepath)
+            df = read_upload(filepath)
+            self.normalizer.parse_timestamps(df, 'timestamp')
             stats = {"inserted": 0, "updated": 0, "errors": 0}
             
             for _, row in df.iterrows():
@@ -145,27 +158,14 @@ class ETLPipeline:
                     ip = self.normalizer.normalize_ip(row['ip_address'])
                     phone = self.normalizer.normalize_phone(row.get('phone_number', ''))
                     
-                    query = """
-                    MERGE (d:Device {device_id: $device_id})
-                    SET d.device_type = $device_type, d.imei = $imei
-                    MERGE (i:IP {ip_address: $ip})
-                    MERGE (d)-[:CONNECTS_VIA {timestamp: $timestamp}]->(i)
-                    """
-                    
-                    if phone:
-                        query += """
-                        MERGE (p:Phone {phone_number: $phone})
-                        MERGE (p)-[:RUNS_ON]->(d)
-                        """
-                    
-                    self.db.execute_query(query, {
-                        'device_id': device_id,
-                        'ip': ip,
-                        'phone': phone,
-                        'device_type': str(row.get('device_type', 'unknown')),
-                        'imei': str(row.get('imei', 'unknown')),
-                        'timestamp': str(row.get('timestamp', datetime.now().isoformat()))
-                    })
+                    self.store.merge_device(
+                        device_id,
+                        ip,
+                        phone,
+                        device_type=str(row.get('device_type', 'unknown')),
+                        imei=str(row.get('imei', 'unknown')),
+                        timestamp=self.normalizer.event_timestamp(row['timestamp'])
+                    )
                     
                     stats["inserted"] += 1
                 except Exception as e:
@@ -182,7 +182,8 @@ class ETLPipeline:
     def ingest_sims(self, filepath: str) -> Dict:
         """Ingest SIM card data"""
         try:
-            df = pd.read_csv(filepath)
+            df = read_upload(filepath)
+            self.normalizer.parse_timestamps(df, 'activation_date')
             stats = {"inserted": 0, "updated": 0, "errors": 0}
             
             for _, row in df.iterrows():
@@ -190,23 +191,12 @@ class ETLPipeline:
                     sim_number = str(row['sim_number']).strip()
                     phone = self.normalizer.normalize_phone(row.get('phone_number', ''))
                     
-                    query = """
-                    MERGE (s:SIM {sim_number: $sim_number})
-                    SET s.provider = $provider, s.activation_date = $activation_date
-                    """
-                    
-                    if phone:
-                        query += """
-                        MERGE (p:Phone {phone_number: $phone})
-                        MERGE (p)-[:HAS_SIM]->(s)
-                        """
-                    
-                    self.db.execute_query(query, {
-                        'sim_number': sim_number,
-                        'phone': phone,
-                        'provider': str(row.get('provider', 'unknown')),
-                        'activation_date': str(row.get('activation_date', datetime.now().isoformat()))
-                    })
+                    self.store.merge_sim(
+                        sim_number,
+                        phone,
+                        provider=str(row.get('provider', 'unknown')),
+                        activation_date=self.normalizer.normalize_timestamp(row['activation_date'])
+                    )
                     
                     stats["inserted"] += 1
                 except Exception as e:
@@ -223,35 +213,22 @@ class ETLPipeline:
     def ingest_complaints(self, filepath: str) -> Dict:
         """Ingest complaint/incident reports"""
         try:
-            df = pd.read_csv(filepath)
+            df = read_upload(filepath)
+            self.normalizer.parse_timestamps(df, 'timestamp')
             stats = {"inserted": 0, "updated": 0, "errors": 0}
             
             for _, row in df.iterrows():
                 try:
                     person_id = str(row.get('person_id', 'unknown'))
                     
-                    query = """
-                    MERGE (c:Complaint {complaint_id: $complaint_id})
-                    SET c.complaint_type = $complaint_type,
-                        c.description = $description,
-                        c.timestamp = $timestamp,
-                        c.severity = $severity
-                    """
-                    
-                    if person_id != 'unknown':
-                        query += """
-                        MERGE (p:Person {id: $person_id})
-                        MERGE (p)-[:INVOLVED_IN]->(c)
-                        """
-                    
-                    self.db.execute_query(query, {
-                        'complaint_id': str(row.get('complaint_id', 'complaint_' + str(row.name))),
-                        'person_id': person_id,
-                        'complaint_type': str(row.get('complaint_type', 'fraud')),
-                        'description': str(row.get('description', '')),
-                        'timestamp': str(row.get('timestamp', datetime.now().isoformat())),
-                        'severity': str(row.get('severity', 'medium'))
-                    })
+                    self.store.merge_complaint(
+                        str(row.get('complaint_id', 'complaint_' + str(row.name))),
+                        person_id if person_id != 'unknown' else None,
+                        complaint_type=str(row.get('complaint_type', 'fraud')),
+                        description=str(row.get('description', '')),
+                        timestamp=self.normalizer.event_timestamp(row['timestamp']),
+                        severity=str(row.get('severity', 'medium'))
+                    )
                     
                     stats["inserted"] += 1
                 except Exception as e:
@@ -0,0 +1,256 @@
+import numpy as np
+from typing import Dict, List, Optional
+import logging
+import threading
+# from app.models.schemas import GraphSnapshot, GraphNode, GraphEdge, RiskLevel
+from metrics import ANALYTICS_DURATION, cache_lookup
+from models.schemas import GraphSnapshot, GraphNode, GraphEdge, RiskLevel
+from services.projection import GraphProjection, RELATIONS
+from services.communities import label_propagation
+
+logger = logging.getLogger(__name__)
+
+ROOT = "root"
+
+# Child holding the smallest communities once there are more than max_nodes
+REST = "rest"
+
+# Degree heuristics, as in the sampled snapshot, but on full-graph degrees
+HIGH_RISK_DEGREE = 15
+MEDIUM_RISK_DEGREE = 8
+
+def degree_risk(degree: int) -> RiskLevel:
+    if degree > HIGH_RISK_DEGREE:
+        return RiskLevel.HIGH
+    if degree > MEDIUM_RISK_DEGREE:
+        return RiskLevel.MEDIUM
+    return RiskLevel.LOW
+
+def collapse_edges(projection: GraphProjection, shown: np.ndarray, edge_ids: np.ndarray) -> List[GraphEdge]:
+    """Edges of ``edge_ids`` between shown nodes, parallel edges collapsed per (source, target, relation)"""
+    p = projection
+    local = np.full(p.node_count, -1, dtype=np.int64)
+    local[shown] = np.arange(len(shown))
+    a, b = local[p.src[edge_ids]], local[p.dst[edge_ids]]
+    inside = (a >= 0) & (b >= 0)
+    edge_ids = edge_ids[inside]
+    size = len(shown)
+    key = (a[inside] * size + b[inside]) * len(RELATIONS) + p.rel[edge_ids]
+    triples, inverse, counts = np.unique(key, return_inverse=True, return_counts=True)
+    amounts = np.bincount(inverse, weights=np.nan_to_num(p.amount[edge_ids]), minlength=len(triples))
+
+    edges = []
+    for triple, count, amount in zip(triples, counts, amounts):
+        pair, relation = divmod(int(triple), len(RELATIONS))
+        source, target = divmod(pair, size)
+        edges.append(GraphEdge(
+            source=p.node_ids[shown[source]],
+            target=p.node_ids[shown[target]],
+            relation=RELATIONS[relation],
+            weight=float(amount) if amount else float(count),
+            metadata={"edge_count": int(count), "amount": float(amount)}
+        ))
+    return edges
+
+class GraphLOD:
+    """Level-of-detail views of the whole graph.
+
+    The top level collapses label-propagation communities into supernodes
+    joined by aggregated edges. Zooming into a community splits it the same
+    way until it is small enough to show its members. When there are more
+    communities than ``max_nodes``, the smallest are folded into one ``rest``
+    supernode that splits into them on zoom. Degrees and risk always
+    come from the full projection, and every view is built once and cached,
+    so payloads stay bounded by ``max_nodes`` however large the graph grows.
+    """
+
+    def __init__(self, projection: GraphProjection, max_nodes: int = 200):
+        self.projection = projection
+        self.max_nodes = max_nodes
+        self.degree = projection.degree()
+        self._members: Dict[str, np.ndarray] = {ROOT: np.arange(projection.node_count)}
+        self._children: Dict[str, List[str]] = {}
+        self._folded: Dict[str, List[np.ndarray]] = {}  # REST child -> the communities it holds
+        self._views: Dict[str, GraphSnapshot] = {}
+        self._lock = threading.RLock()
+
+        self.view(ROOT)
+
+    @staticmethod
+    def parent_of(community_id: str) -> Optional[str]:
+        if community_id == ROOT:
+            return None
+        return community_id.rsplit('.', 1)[0] if '.' in community_id else ROOT
+
+    def _resolve(self, community_id: str) -> np.ndarray:
+        """Members of a community, splitting its ancestors on the way down"""
+        if community_id not in self._members:
+            parent = self.parent_of(community_id)
+            if parent is None:
+                raise KeyError(community_id)
+            self._resolve(parent)
+            self._split(parent)
+            if community_id not in self._members:
+                raise KeyError(community_id)
+        return self._members[community_id]
+
+    def _split(self, community_id: str) -> List[str]:
+        """Sub-communities of a community too large to show member by member"""
+        if community_id in self._children:
+            return self._children[community_id]
+
+        p = self.projection
+        members = self._members[community_id]
+        groups: List[np.ndarray] = []
+
+        if len(members) <= self.max_nodes:
+            pass
+        elif community_id in self._folded:
+            # Already split: the communities folded in by the parent
+            groups = self._folded[community_id]
+        else:
+            local = np.full(p.node_count, -1, dtype=np.int64)
+            local[members] = np.arange(len(members))
+            inside = (local[p.src] >= 0) & (local[p.dst] >= 0)
+            with ANALYTICS_DURATION.time(algorithm="label_propagation"):
+                labels = label_propagation(len(members), local[p.src[inside]], local[p.dst[inside]])
+
+            if labels.max() > 0:
+                # Largest communities first; their position becomes the id
+                sizes = np.bincount(labels)
+                order = np.argsort(labels, kind='stable')
+                bounds = np.concatenate([[0], np.cumsum(sizes)])
+                groups = [
+                    members[order[bounds[label]:bounds[label + 1]]]
+                    for label in np.argsort(-sizes, kind='stable')
+                ]
+
+        prefix = "" if community_id == ROOT else f"{community_id}."
+        children: List[str] = []
+        if len(groups) > self.max_nodes:
+            # Fold the smallest communities into one supernode, split again on zoom
+            keep = max(self.max_nodes - 1, 1)
+            rest = f"{prefix}{REST}"
+            self._folded[rest] = groups[keep:]
+            self._members[rest] = np.concatenate(groups[keep:])
+            groups = groups[:keep]
+        else:
+            rest = None
+        for rank, group in enumerate(groups):
+            child = f"{prefix}{rank}"
+            self._members[child] = group
+            children.append(child)
+        if rest is not None:
+            children.append(rest)
+
+        self._children[community_id] = children
+        return children
+
+    def view(self, community_id: str = ROOT) -> GraphSnapshot:
+        """Snapshot of one zoom level: child supernodes, or members of a leaf community"""
+        with self._lock:
+            cached = self._views.get(community_id)
+            cache_lookup("lod_view", cached is not None)
+            if cached is None:
+                self._resolve(community_id)
+                children = self._split(community_id)
+                if children:
+                    cached = self._supernode_view(community_id, children)
+                else:
+                    cached = self._member_view(community_id)
+                self._views[community_id] = cached
+            return cached
+
+    def _supernode_view(self, community_id: str, children: List[str]) -> GraphSnapshot:
+        p = self.projection
+        assign = np.full(p.node_count, -1, dtype=np.int64)
+        nodes = []
+
+        for k, child in enumerate(children):
+            members = self._members[child]
+            assign[members] = k
+            degrees = self.degree[members]
+            high = int((degrees > HIGH_RISK_DEGREE).sum())
+            if high >= 0.2 * len(members):
+                risk = RiskLevel.HIGH
+            elif high > 0:
+                risk = RiskLevel.MEDIUM
+            else:
+                risk = RiskLevel.LOW
+
+            top = members[np.argsort(-degrees, kind='stable')[:5]]
+            labels, counts = np.unique(p.node_labels[members], return_counts=True)
+            nodes.append(GraphNode(
+                id=f"community:{child}",
+                label="Community",
+                entity_id=child,
+                risk_level=risk,
+                degree=int(degrees.sum()),
+                metadata={
+                    "member_count": len(members),
+                    "high_risk_members": high,
+                    "top_members": [p.node_ids[n] for n in top],
+                    "label_breakdown": {p.label_of_code(l): int(c) for l, c in zip(labels, counts)},
+                    "expandable": len(members) > 1,
+                    "community_count": len(self._folded.get(child, [members])),
+                }
+            ))
+
+        # Aggregate every full-graph edge between two shown supernodes
+        a, b = assign[p.src], assign[p.dst]
+        cross = (a >= 0) & (b >= 0) & (a != b)
+        key = a[cross] * len(children) + b[cross]
+        pairs, inverse, counts = np.unique(key, return_inverse=True, return_counts=True)
+        amounts = np.bincount(inverse, weights=np.nan_to_num(p.amount[cross]), minlength=len(pairs))
+
+        edges = [
+            GraphEdge(
+                source=f"community:{children[pair // len(children)]}",
+                target=f"community:{children[pair % len(children)]}",
+                relation="AGGREGATED",
+                weight=float(count),
+                metadata={"edge_count": int(count), "amount": float(amount)}
+            )
+            for pair, count, amount in zip(pairs, counts, amounts)
+        ]
+
+        logger.info(f"✓ LOD view {community_id}: {len(nodes)} supernodes, {len(edges)} edges")
+        return GraphSnapshot(
+            nodes=nodes,
+            edges=edges,
+            community_id=community_id,
+            parent_id=self.parent_of(community_id)
+        )
+
+    def _member_view(self, community_id: str) -> GraphSnapshot:
+        p = self.projection
+        members = self._members[community_id]
+        # Leaves that label propagation could not split show their best-connected members
+        shown = members[np.argsort(-self.degree[members], kind='stable')[:self.max_nodes]]
+
+        nodes = [
+            GraphNode(
+                id=p.node_ids[n],
+                label=p.label_of(n),
+                entity_id=p.node_ids[n],
+                risk_level=degree_risk(int(self.degree[n])),
+                degree=int(self.degree[n]),
+                metadata={"entity": p.node_ids[n]}
+            )
+            for n in shown
+        ]
+
+        edges = collapse_edges(p, shown, np.arange(p.edge_count))
+
+        logger.info(f"✓ LOD view {community_id}: {len(nodes)} members, {len(edges)} edges")
+        return GraphSnapshot(
+            nodes=nodes,
+            edges=edges,
+            community_id=community_id,
+            parent_id=self.parent_of(community_id)
+        )
+
+
+def get_lod(projection: GraphProjection) -> GraphLOD:
+    """Level-of-detail index for a projection, built once and cached with it"""
+    return projection.derived('lod', lambda: GraphLOD(projection))
@@ -0,0 +1,133 @@
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+# from app.database.graph import AsyncNeo4jConnection, GRAPH_META_LABEL
+from database.graph import AsyncNeo4jConnection, GRAPH_META_LABEL
+from database.store import GraphStore
+from metrics import cache_lookup
+from models.schemas import GraphStats
+
+logger = logging.getLogger(__name__)
+
+TOKENS_QUERY = """
+RETURN COLLECT { CALL db.labels() YIELD label RETURN label } AS labels,
+       COLLECT { CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType } AS types
+"""
+
+
+def _quote(token: str) -> str:
+    """Backtick-quote a label or relationship type for use in a pattern"""
+    return "`" + token.replace("`", "``") + "`"
+
+
+def count_store_query(labels: List[str], types: List[str]) -> Tuple[str, Dict[str, Any]]:
+    """One UNION ALL query whose every branch the planner answers from the count store.
+
+    Counts by a single label or type, and the unfiltered totals, never touch
+    nodes or relationships, so the cost does not grow with the graph.
+    """
+    branches = [
+        "MATCH (n) RETURN 'nodes' AS kind, '' AS name, count(n) AS count",
+        "MATCH ()-[r]->() RETURN 'relationships' AS kind, '' AS name, count(r) AS count",
+    ]
+    params: Dict[str, Any] = {}
+    for i, label in enumerate(labels):
+        params[f"label{i}"] = label
+        branches.append(f"MATCH (n:{_quote(label)}) RETURN 'label' AS kind, $label{i} AS name, count(n) AS count")
+    for i, rel_type in enumerate(types):
+        params[f"type{i}"] = rel_type
+        branches.append(f"MATCH ()-[r:{_quote(rel_type)}]->() RETURN 'type' AS kind, $type{i} AS name, count(r) AS count")
+    return "\nUNION ALL\n".join(branches), params
+
+
+class GraphStatsCache:
+    """Graph statistics from the count store, cached per graph version.
+
+    A request costs one lookup of the version node; the count-store query
+    only runs again after a write batch has bumped the version.
+    """
+
+    def __init__(self):
+        self._version: Optional[int] = None
+        self._stats: Optional[GraphStats] = None
+
+    def invalidate(self):
+        self._version = None
+        self._stats = None
+
+    async def get(self, db: AsyncNeo4jConnection) -> GraphStats:
+        version = await db.graph_version()
+        hit = self._stats is not None and self._version == version
+        cache_lookup("graph_stats", hit)
+        if hit:
+            return self._stats
+
+        stats = await self._compute(db, version)
+        self._version, self._stats = version, stats
+        return stats
+
+    def get_from_store(self, store: GraphStore) -> GraphStats:
+        """Blocking counterpart of ``get`` for backends without an async driver"""
+        version = store.graph_version()
+        hit = self._stats is not None and self._version == version
+        cache_lookup("graph_stats", hit)
+        if hit:
+            return self._stats
+
+        node_breakdown, relationship_breakdown = store.count_breakdown()
+        stats = build_stats(
+            version,
+            sum(node_breakdown.values()),
+            sum(relationship_breakdown.values()),
+            node_breakdown,
+            relationship_breakdown
+        )
+        self._version, self._stats = version, stats
+        return stats
+
+    async def _compute(self, db: AsyncNeo4jConnection, version: int) -> GraphStats:
+        tokens = (await db.execute_read(TOKENS_QUERY, name="stats.tokens"))[0]
+        query, params = count_store_query(tokens["labels"], tokens["types"])
+        rows = await db.execute_read(query, params, name="stats.count_store")
+
+        totals = {"nodes": 0, "relationships": 0}
+        node_breakdown: Dict[str, int] = {}
+        relationship_breakdown: Dict[str, int] = {}
+        for row in rows:
+            if row["kind"] == "label":
+                node_breakdown[row["name"]] = row["count"]
+            elif row["kind"] == "type":
+                relationship_breakdown[row["name"]] = row["count"]
+            else:
+                totals[row["kind"]] = row["count"]
+
+        # Version and schema-ledger nodes are bookkeeping, not part of the graph
+        total_nodes = totals["nodes"] - node_breakdown.pop(GRAPH_META_LABEL, 0)
+        return build_stats(version, total_nodes, totals["relationships"], node_breakdown, relationship_breakdown)
+
+
+def build_stats(
+    version: int,
+    total_nodes: int,
+    total_relationships: int,
+    node_breakdown: Dict[str, int],
+    relationship_breakdown: Dict[str, int]
+) -> GraphStats:
+    """Density and sorted breakdowns around the totals"""
+    if total_nodes > 1:
+        max_edges = total_nodes * (total_nodes - 1)
+        density = total_relationships / max_edges if max_edges > 0 else 0
+    else:
+        density = 0.0
+
+    logger.info(f"✓ Graph stats refreshed at version {version}: {total_nodes} nodes, {total_relationships} relationships")
+    return GraphStats(
+        total_nodes=total_nodes,
+        total_relationships=total_relationships,
+        node_breakdown=dict(sorted(node_breakdown.items(), key=lambda kv: -kv[1])),
+        relationship_breakdown=dict(sorted(relationship_breakdown.items(), key=lambda kv: -kv[1])),
+        density=min(1.0, density),
+        graph_version=version,
+    )
+
+
+graph_stats_cache = GraphStatsCache()
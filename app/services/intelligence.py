@@ -1,47 +1,152 @@
-import networkx as nx
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Dict, Iterator, List, Tuple, Any, Optional
 from collections import defaultdict
 import logging
-from datetime import datetime
-# from app.database.graph import Neo4jConnection
-from database.graph import Neo4jConnection
+import numpy as np
+from datetime import datetime, timezone
+from compute import check_deadline
+from database.store import GraphStore, SWEEP_SIGNALS
+from metrics import ANALYTICS_DURATION
 # from app.models.schemas import (
 from models.schemas import (
     FraudRing, Kingpin, EntityTimeline, TimelineEvent,
-    AnomalyDetection, RiskAssessment, RiskLevel,
-    GraphSnapshot, GraphNode, GraphEdge
+    AnomalyDetection, RiskAssessment, RiskLevel, MoneyTrail, MoneyCycle,
+    GraphSnapshot, EgoNetwork, CaseSummary, RingEvolution, SimilarEntities, SimilarEntity,
+    SharedInfrastructure, RiskBatchResult
 )
+from services.cases import CaseWorkspace, NotInCase, case_store
+from services.projection import GraphProjection, get_projection, LABELS, NO_TIME, RELATIONS
+from services.velocity import VelocityDetector
+from services.money_flow import MoneyFlowTracer, CycleDetector
+from services.ring_evolution import RingEvolutionTracker
+from services.shared_infra import SharedInfrastructureDetector
+from services.behavior import FEATURES, behavior_index
+from services.graph_lod import get_lod, ROOT
+from services.ego_network import EgoNetworkExplorer
+from services.centrality import betweenness, pagerank, simple_digraph
 
 logger = logging.getLogger(__name__)
 
+def to_iso(value: Any) -> Optional[str]:
+    """Render a native Neo4j/Python temporal value as an ISO-8601 string"""
+    if value is None:
+        return None
+    if hasattr(value, 'iso_format'):
+        return value.iso_format()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+# Lifetime thresholds shared by per-entity checks and the graph-wide sweep:
+# anomaly_type -> (threshold, confidence scale, risk level)
+ANOMALY_SIGNALS = {
+    'sim_swap': (2, 5, RiskLevel.HIGH),
+    'device_hop': (3, 6, RiskLevel.HIGH),
+    'call_burst': (100, 500, RiskLevel.MEDIUM),
+    'money_movement': (500000, 1000000, RiskLevel.HIGH),
+}
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Align query bounds with stored timestamps (LocalDateTime in UTC)"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def epoch_bounds(since: Optional[datetime], until: Optional[datetime]) -> Tuple[Optional[int], Optional[int]]:
+    """Query bounds as epoch seconds, the unit of the projection's timestamps"""
+    def to_epoch(value: Optional[datetime]) -> Optional[int]:
+        if value is None:
+            return None
+        return int(naive_utc(value).replace(tzinfo=timezone.utc).timestamp())
+    return to_epoch(since), to_epoch(until)
+
+def projection_rows(projection: GraphProjection, relations: List[str], edges: Optional[np.ndarray] = None):
+    """(from, to, relation, amount, duration) tuples for the given relationships,
+    in the shape the graph store streams; ``edges`` narrows them to a subset"""
+    mask = projection.edge_mask(relations)
+    edges = np.flatnonzero(mask) if edges is None else edges[mask[edges]]
+    amount = projection.amount[edges]
+    duration = projection.duration[edges]
+    for u, v, r, a, d in zip(
+        projection.node_ids[projection.src[edges]],
+        projection.node_ids[projection.dst[edges]],
+        projection.rel[edges].tolist(),
+        np.where(np.isnan(amount), None, amount).tolist(),
+        np.where(np.isnan(duration), None, duration).tolist(),
+    ):
+        yield u, v, RELATIONS[r], a, d
+
 class IntelligenceEngine:
-    """Cybercrime Network Intelligence Engine"""
+    """Cybercrime Network Intelligence Engine
+
+    With a ``case`` every analytic runs over that case's subgraph only;
+    per-entity lookups refuse entities outside it.
+    """
     
-    def __init__(self, db: Neo4jConnection):
-        self.db = db
-
-    def get_graph_snapshot(self, limit: int = 400) -> GraphSnapshot:
-        """Return a trimmed graph snapshot for visualization"""
-        query = """
-        MATCH (n)-[r]->(m)
-        WHERE type(r) IN ['MADE','SENT','USES','OWNS','RUNS_ON','HAS_SIM','CONNECTS_VIA','INVOLVED_IN']
-        RETURN id(n) as source_id,
-               id(m) as target_id,
-               labels(n)[0] as source_label,
-               labels(m)[0] as target_label,
-               coalesce(n.phone_number, n.account_number, n.device_id, n.sim_number, n.person_id, n.ip_address, n.complaint_id, toString(id(n))) as source_entity,
-               coalesce(m.phone_number, m.account_number, m.device_id, m.sim_number, m.person_id, m.ip_address, m.complaint_id, toString(id(m))) as target_entity,
-               type(r) as relation,
-               r.amount as amount,
-               r.duration as duration,
-               r.timestamp as timestamp
-        LIMIT $limit
+    def __init__(self, store: GraphStore, case: Optional[CaseWorkspace] = None):
+        self.store = store
+        self.case = case
+
+    def _projection(self) -> GraphProjection:
+        """The shared projection, or the case's subgraph of it"""
+        projection = get_projection(self.store)
+        return self.case.projection(projection) if self.case else projection
+
+    def _require_member(self, entity_id: str):
+        if self.case and entity_id not in self._projection().index:
+            raise NotInCase(f"{entity_id} is not part of case {self.case.case_id}")
+
+    def _relation_rows(
+        self,
+        relations: List[str],
+        name: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ):
+        """(from, to, relation, amount, duration) rows for the analytics.
+
+        Streamed from the store for the whole graph; a case or a time window
+        is cut from the projection instead, so repeated window queries never
+        go back to the database.
+        """
+        if since is None and until is None:
+            if not self.case:
+                return self.store.stream_relations(relations, name=name)
+            return projection_rows(self._projection(), relations)
+        p = self._projection()
+        return projection_rows(p, relations, p.time_window(*epoch_bounds(since, until)))
+
+    def open_case(
+        self,
+        seeds: List[str],
+        hops: int = 2,
+        max_hub_degree: int = 500,
+        name: Optional[str] = None
+    ) -> CaseSummary:
+        """Expand seed entities into a case workspace and register it"""
+        case = CaseWorkspace(seeds, hops, max_hub_degree, name=name)
+        case.projection(get_projection(self.store))
+        case_store.add(case)
+        return case.summary()
+
+    def get_graph_snapshot(
+        self,
+        limit: int = 400,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Return a trimmed graph snapshot for visualization.
+
+        Built as plain dicts in the ``GraphSnapshot`` shape: snapshots run to
+        thousands of elements and are serialised straight to JSON, so the
+        per-element model construction and validation are skipped.
         """
+        if self.case:
+            return self._case_snapshot(limit, since, until)
 
-        records = self.db.execute_query(query, {"limit": limit})
+        records = self.store.snapshot_edges(limit, naive_utc(since), naive_utc(until))
 
-        nodes: Dict[str, GraphNode] = {}
-        edges: List[GraphEdge] = []
+        nodes: Dict[str, Dict[str, Any]] = {}
+        edges: List[Dict[str, Any]] = []
         degree: Dict[str, int] = defaultdict(int)
 
         for record in records:
@@ -54,22 +159,22 @@ class IntelligenceEngine:
             relation = record.get("relation", "RELATED")
             amount = record.get("amount")
             duration = record.get("duration")
-            timestamp = record.get("timestamp")
+            timestamp = to_iso(record.get("timestamp"))
 
             if source_id not in nodes:
-                nodes[source_id] = GraphNode(
-                    id=source_id,
-                    label=source_label,
-                    entity_id=source_entity,
-                    metadata={"entity": source_entity}
-                )
+                nodes[source_id] = {
+                    "id": source_id,
+                    "label": source_label,
+                    "entity_id": source_entity,
+                    "metadata": {"entity": source_entity}
+                }
             if target_id not in nodes:
-                nodes[target_id] = GraphNode(
-                    id=target_id,
-                    label=target_label,
-                    entity_id=target_entity,
-                    metadata={"entity": target_entity}
-                )
+                nodes[target_id] = {
+                    "id": target_id,
+                    "label": target_label,
+                    "entity_id": target_entity,
+                    "metadata": {"entity": target_entity}
+                }
 
             degree[source_id] += 1
             degree[target_id] += 1
@@ -80,78 +185,156 @@ class IntelligenceEngine:
             elif duration:
                 weight = float(duration)
 
-            edges.append(GraphEdge(
-                source=source_id,
-                target=target_id,
-                relation=relation,
-                weight=weight,
-                metadata={"amount": amount, "duration": duration, "timestamp": timestamp}
-            ))
+            edges.append({
+                "source": source_id,
+                "target": target_id,
+                "relation": relation,
+                "weight": weight,
+                "metadata": {"amount": amount, "duration": duration, "timestamp": timestamp}
+            })
 
         # Assign risk levels based on degree heuristics
         for node_id, node in nodes.items():
             deg = degree.get(node_id, 0)
-            node.degree = deg
+            node["degree"] = deg
             if deg > 15:
-                node.risk_level = RiskLevel.HIGH
+                node["risk_level"] = RiskLevel.HIGH.value
             elif deg > 8:
-                node.risk_level = RiskLevel.MEDIUM
+                node["risk_level"] = RiskLevel.MEDIUM.value
             else:
-                node.risk_level = RiskLevel.LOW
+                node["risk_level"] = RiskLevel.LOW.value
 
         logger.info(f"✓ Graph snapshot built with {len(nodes)} nodes and {len(edges)} edges")
-        return GraphSnapshot(nodes=list(nodes.values()), edges=edges)
+        return {"nodes": list(nodes.values()), "edges": edges}
+
+    def _case_snapshot(
+        self,
+        limit: int,
+        since: Optional[datetime],
+        until: Optional[datetime]
+    ) -> Dict[str, Any]:
+        """``get_graph_snapshot`` over the case subgraph, in the same shape"""
+        p = self._projection()
+        if since is None and until is None:
+            edges = np.arange(p.edge_count)
+        else:
+            edges = np.sort(p.time_window(*epoch_bounds(since, until)))
+        edges = edges[:limit]
+
+        shown, ends = np.unique(np.concatenate([p.src[edges], p.dst[edges]]), return_inverse=True)
+        degree = np.bincount(ends, minlength=len(shown))
+        nodes = []
+        for n, deg in zip(shown.tolist(), degree.tolist()):
+            entity = p.node_ids[n]
+            nodes.append({
+                "id": entity,
+                "label": p.label_of(n),
+                "entity_id": entity,
+                "metadata": {"entity": entity},
+                "degree": deg,
+                "risk_level": (RiskLevel.HIGH if deg > 15 else RiskLevel.MEDIUM if deg > 8 else RiskLevel.LOW).value
+            })
+
+        rows = []
+        for j in edges.tolist():
+            amount = None if np.isnan(p.amount[j]) else float(p.amount[j])
+            duration = None if np.isnan(p.duration[j]) else float(p.duration[j])
+            ts = int(p.ts[j])
+            rows.append({
+                "source": p.node_ids[p.src[j]],
+                "target": p.node_ids[p.dst[j]],
+                "relation": RELATIONS[p.rel[j]],
+                "weight": float(amount or duration or 1.0),
+                "metadata": {
+                    "amount": amount,
+                    "duration": duration,
+                    "timestamp": None if ts == NO_TIME else datetime.utcfromtimestamp(ts).isoformat()
+                }
+            })
+
+        logger.info(f"✓ Case {self.case.case_id} snapshot built with {len(nodes)} nodes and {len(rows)} edges")
+        return {"nodes": nodes, "edges": rows}
     
-    def detect_fraud_rings(self, ring_type: Optional[str] = None) -> List[FraudRing]:
-        """Detect fraud rings using Louvain clustering on call/transaction networks"""
+    def get_graph_lod(self, community_id: Optional[str] = None) -> GraphSnapshot:
+        """Level-of-detail snapshot: communities as supernodes, expandable on zoom"""
+        return get_lod(self._projection()).view(community_id or ROOT)
+    
+    def get_ego_network(
+        self,
+        entity_id: str,
+        hops: int = 2,
+        relations: Optional[List[str]] = None,
+        fan_out: int = 25,
+        max_hub_degree: int = 500
+    ) -> Optional[EgoNetwork]:
+        """k-hop neighbourhood of an entity with bounded expansion"""
         try:
-            # Get network data from Neo4j
-            query = """
-            MATCH (n1)-[r]->(n2)
-            WHERE type(r) IN ['MADE', 'SENT']
-            RETURN coalesce(n1.phone_number, n1.account_number, toString(id(n1))) as from_node,
-                   coalesce(n2.phone_number, n2.account_number, toString(id(n2))) as to_node, 
-                   type(r) as relation_type, r.amount as amount, 
-                   r.duration as duration, r.timestamp as timestamp
-            """
-            
-            records = self.db.execute_query(query)
+            return EgoNetworkExplorer(self._projection()).expand(
+                entity_id,
+                hops=hops,
+                relations=relations,
+                fan_out=fan_out,
+                max_hub_degree=max_hub_degree
+            )
+        except Exception as e:
+            logger.error(f"Ego network failed: {e}")
+            raise
+    
+    def detect_fraud_rings(
+        self,
+        ring_type: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[FraudRing]:
+        """Detect fraud rings using Louvain clustering on call/transaction networks,
+        optionally over the calls and transfers inside a time window"""
+        import networkx as nx  # heavy; imported on first use to keep startup fast
+        try:
+            # Streamed as tuples straight into the graph
+            records = self._relation_rows(['MADE', 'SENT'], "fraud_rings.edges", since, until)
             
             # Build NetworkX graph
             G = nx.DiGraph()
             total_money = defaultdict(float)
             call_counts = defaultdict(int)
             
-            for record in records:
-                from_node = record.get('from_node', '')
-                to_node = record.get('to_node', '')
-                relation = record.get('relation_type', '')
-                
+            for from_node, to_node, relation, amount, duration in records:
                 if not from_node or not to_node:
                     continue
                 
                 G.add_edge(from_node, to_node, weight=1)
                 
                 if relation == 'SENT':
-                    amount = record.get('amount', 0)
                     if amount:
                         total_money[f"{from_node}-{to_node}"] += float(amount)
                 elif relation == 'MADE':
-                    duration = record.get('duration', 0)
                     if duration:
                         call_counts[f"{from_node}-{to_node}"] += int(duration)
             
             # Detect communities
             if G.number_of_nodes() > 0:
                 undirected_G = G.to_undirected()
-                communities = list(nx.community.greedy_modularity_communities(undirected_G))
+                with ANALYTICS_DURATION.time(algorithm="community_detection"):
+                    communities = list(nx.community.greedy_modularity_communities(undirected_G))
             else:
                 communities = []
             
+            # Round-tripping cycles are a direct laundering signal
+            lo, hi = epoch_bounds(since, until)
+            cycles, cycles_truncated = self._ring_cycles(lo, hi) if communities else ([], False)
+            community_of = {member: i for i, community in enumerate(communities) for member in community}
+            cycle_counts = defaultdict(int)
+            for accounts in cycles:
+                owners = {community_of.get(a) for a in accounts}
+                if len(owners) == 1 and None not in owners:
+                    cycle_counts[owners.pop()] += 1
+            
             fraud_rings = []
             for i, community in enumerate(communities):
+                check_deadline()
                 if len(community) > 1:
                     subgraph = G.subgraph(community)
+                    cycle_count = cycle_counts[i]
                     
                     # Calculate ring characteristics
                     total_calls = sum(call_counts[f"{u}-{v}"] for u, v in subgraph.edges())
@@ -162,13 +345,16 @@ class IntelligenceEngine:
                     risk_score = min(100, (node_count * 10) + (total_calls / 10) + (total_moved / 1000))
                     
                     # Determine ring type
-                    if total_moved > 100000:
+                    if total_moved > 100000 or cycle_count > 0:
                         ring_type_detected = "money_laundering"
                     elif total_calls > 500:
                         ring_type_detected = "call_center"
                     else:
                         ring_type_detected = "sim_mule"
                     
+                    if ring_type and ring_type_detected != ring_type:
+                        continue
+                    
                     fraud_rings.append(FraudRing(
                         ring_id=f"ring_{i}",
                         member_count=len(community),
@@ -177,7 +363,9 @@ class IntelligenceEngine:
                         total_money_moved=total_moved,
                         risk_score=risk_score,
                         ring_type=ring_type_detected,
-                        confidence=min(0.99, len(community) / 100)
+                        confidence=min(0.99, len(community) / 100),
+                        cycle_count=cycle_count,
+                        cycles_truncated=cycles_truncated
                     ))
             
             logger.info(f"✓ Detected {len(fraud_rings)} fraud rings")
@@ -186,70 +374,128 @@ class IntelligenceEngine:
         except Exception as e:
             logger.error(f"Fraud ring detection failed: {e}")
             raise
+
+    def _ring_cycles(self, since: Optional[int], until: Optional[int]) -> Tuple[List[frozenset], bool]:
+        """Account sets of every round-tripping cycle in the period, and whether
+        the search ran out of budget; memoised on the projection"""
+        p = self._projection()
+
+        def build():
+            found, truncated = CycleDetector(p).search(top_k=None, since=since, until=until)
+            return [frozenset(p.node_ids[n] for n in nodes) for _, _, nodes, _ in found], truncated
+
+        return p.derived(f"ring_cycles:{since}:{until}", build)
     
-    def detect_kingpins(self, top_k: int = 10) -> List[Kingpin]:
-        """Identify kingpins using PageRank and centrality measures"""
+    def track_ring_evolution(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        window_days: float = 30.0,
+        step_days: Optional[float] = None,
+        min_size: int = 3,
+        min_jaccard: float = 0.3
+    ) -> RingEvolution:
+        """Fraud rings in a series of time windows over calls and transfers, with
+        their births, growth, merges, splits and deaths"""
         try:
-            query = """
-            MATCH (n1)-[r]->(n2)
-            WHERE type(r) IN ['MADE', 'SENT', 'USES', 'OWNS', 'RUNS_ON']
-            RETURN coalesce(n1.phone_number, n1.account_number, toString(id(n1))) as from_node,
-                   coalesce(n2.phone_number, n2.account_number, toString(id(n2))) as to_node,
-                   type(r) as relation
-            """
-            
-            records = self.db.execute_query(query)
-            
-            # Build NetworkX graph
-            G = nx.DiGraph()
-            for record in records:
-                from_node = record.get('from_node')
-                to_node = record.get('to_node')
-                if from_node and to_node:
-                    G.add_edge(from_node, to_node)
+            tracker = RingEvolutionTracker(self._projection())
+            lo, hi = epoch_bounds(since, until)
+            with ANALYTICS_DURATION.time(algorithm="ring_evolution"):
+                return tracker.track(
+                    lo, hi,
+                    window=int(window_days * 86400),
+                    step=int((step_days or window_days) * 86400),
+                    min_size=min_size,
+                    min_jaccard=min_jaccard
+                )
+
+        except Exception as e:
+            logger.error(f"Ring evolution tracking failed: {e}")
+            raise
+
+    def detect_shared_infrastructure(
+        self,
+        max_hub_phones: int = 50,
+        min_weight: float = 0.0,
+        min_size: int = 2,
+        top_n: int = 100
+    ) -> SharedInfrastructure:
+        """Clusters of phones sharing handsets or IP addresses (SIM farms)"""
+        try:
+            detector = SharedInfrastructureDetector(self._projection())
+            with ANALYTICS_DURATION.time(algorithm="shared_infrastructure"):
+                return detector.detect(
+                    max_hub_phones=max_hub_phones,
+                    min_weight=min_weight,
+                    min_size=min_size,
+                    top_n=top_n
+                )
+
+        except Exception as e:
+            logger.error(f"Shared infrastructure detection failed: {e}")
+            raise
+
+    def detect_kingpins(
+        self,
+        top_k: int = 10,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[Kingpin]:
+        """Identify kingpins using PageRank and centrality measures.
+
+        Computed on the projection's edge arrays; parallel relationships
+        count once, as in a simple directed graph. Inside a time window
+        only timestamped relationships count, so ownership and device
+        links drop out and calls and transfers remain.
+        """
+        try:
+            p = self._projection()
+            mask = p.edge_mask(['MADE', 'SENT', 'USES', 'OWNS', 'RUNS_ON'])
+            if since is None and until is None:
+                edges = np.flatnonzero(mask)
+            else:
+                edges = p.time_window(*epoch_bounds(since, until))
+                edges = edges[mask[edges]]
             
-            if G.number_of_nodes() == 0:
+            # Compact ids over the entities these relationships touch
+            nodes, ends = np.unique(np.concatenate([p.src[edges], p.dst[edges]]), return_inverse=True)
+            n = len(nodes)
+            if n == 0:
                 return []
+            src, dst = simple_digraph(ends[:len(edges)], ends[len(edges):], n)
             
             # Calculate centrality measures
-            pagerank = nx.pagerank(G)
-            betweenness = nx.betweenness_centrality(G)
-            in_degree = dict(G.in_degree())
-            out_degree = dict(G.out_degree())
+            with ANALYTICS_DURATION.time(algorithm="pagerank"):
+                pagerank_scores = pagerank(n, src, dst)
+            # Betweenness is the expensive part; skip it if the caller has given up
+            check_deadline()
+            with ANALYTICS_DURATION.time(algorithm="betweenness"):
+                betweenness_scores = betweenness(n, src, dst)
+            in_degree = np.bincount(dst, minlength=n)
+            out_degree = np.bincount(src, minlength=n)
             
             # Identify kingpins
-            kingpins_data = []
-            for node in G.nodes():
-                influence = (
-                    pagerank.get(node, 0) * 0.4 +
-                    betweenness.get(node, 0) * 0.3 +
-                    (in_degree.get(node, 0) / max(in_degree.values()) if max(in_degree.values()) > 0 else 0) * 0.15 +
-                    (out_degree.get(node, 0) / max(out_degree.values()) if max(out_degree.values()) > 0 else 0) * 0.15
-                )
-                
-                kingpins_data.append({
-                    'entity_id': node,
-                    'influence': influence,
-                    'pagerank': pagerank.get(node, 0),
-                    'betweenness': betweenness.get(node, 0),
-                    'connections': in_degree.get(node, 0) + out_degree.get(node, 0)
-                })
-            
-            # Sort and get top K
-            kingpins_data.sort(key=lambda x: x['influence'], reverse=True)
-            kingpins_data = kingpins_data[:top_k]
+            influence = (
+                pagerank_scores * 0.4 +
+                betweenness_scores * 0.3 +
+                in_degree / max(in_degree.max(), 1) * 0.15 +
+                out_degree / max(out_degree.max(), 1) * 0.15
+            )
+            top = np.argsort(-influence, kind='stable')[:top_k]
             
             kingpins = []
-            for data in kingpins_data:
-                risk_level = RiskLevel.HIGH if data['influence'] > 0.5 else RiskLevel.MEDIUM if data['influence'] > 0.2 else RiskLevel.LOW
+            for k in top.tolist():
+                entity_id = p.node_ids[nodes[k]]
+                score = float(influence[k])
+                risk_level = RiskLevel.HIGH if score > 0.5 else RiskLevel.MEDIUM if score > 0.2 else RiskLevel.LOW
                 
                 kingpins.append(Kingpin(
-                    entity_id=data['entity_id'],
-                    entity_type="phone" if data['entity_id'].startswith('+') else "account",
-                    influence_score=data['influence'],
-                    pagerank_score=data['pagerank'],
-                    betweenness_centrality=data['betweenness'],
-                    connections=data['connections'],
+                    entity_id=entity_id,
+                    entity_type="phone" if entity_id.startswith('+') else "account",
+                    influence_score=score,
+                    pagerank_score=float(pagerank_scores[k]),
+                    betweenness_centrality=float(betweenness_scores[k]),
+                    connections=int(in_degree[k] + out_degree[k]),
                     risk_level=risk_level,
                     connected_rings=[]
                 ))
@@ -261,36 +507,27 @@ class IntelligenceEngine:
             logger.error(f"Kingpin detection failed: {e}")
             raise
     
-    def get_timeline(self, entity_id: str) -> EntityTimeline:
-        """Reconstruct chronological timeline for an entity"""
+    def get_timeline(
+        self,
+        entity_id: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> EntityTimeline:
+        """Reconstruct chronological timeline for an entity, optionally time-bounded.
+
+        With a case, only relationships to other case members are kept.
+        """
+        self._require_member(entity_id)
         try:
-            query = """
-            MATCH (n {phone_number: $entity_id})-[r]-(m)
-            RETURN type(r) as relation, 
-                   m.phone_number as to_entity,
-                   r.timestamp as timestamp,
-                   r.duration as duration,
-                   r.amount as amount,
-                   r.call_id as call_id,
-                   r.transaction_id as transaction_id
-            UNION ALL
-            MATCH (n {account_number: $entity_id})-[r]-(m)
-            RETURN type(r) as relation,
-                   m.account_number as to_entity,
-                   r.timestamp as timestamp,
-                   r.amount as amount,
-                   r.transaction_id as transaction_id,
-                   NULL as duration,
-                   NULL as call_id
-            ORDER BY timestamp DESC
-            """
-            
-            records = self.db.execute_query(query, {'entity_id': entity_id})
+            records = self.store.timeline(entity_id, naive_utc(since), naive_utc(until))
+            if self.case:
+                members = self._projection().index
+                records = [r for r in records if r.get('to_entity') in members]
             
             events = []
             for record in records:
                 relation = record.get('relation', '')
-                timestamp = record.get('timestamp', datetime.now().isoformat())
+                timestamp = to_iso(record.get('timestamp')) or datetime.now().isoformat()
                 to_entity = record.get('to_entity', 'unknown')
                 
                 # Map relation to event type
@@ -340,77 +577,145 @@ class IntelligenceEngine:
     
     def assess_risk(self, entity_id: str) -> RiskAssessment:
         """Comprehensive risk assessment for an entity"""
+        self._require_member(entity_id)
         try:
-            # Get entity connections
-            query = """
-            MATCH (n)
-            WHERE n.phone_number = $entity_id OR n.account_number = $entity_id
-            OPTIONAL MATCH (n)-[r]-(m)
-            RETURN count(distinct m) as connection_count,
-                   collect(type(r)) as relation_types
-            """
-            
-            result = self.db.execute_query(query, {'entity_id': entity_id})
-            connection_count = result[0].get('connection_count', 0) if result else 0
-            
-            # Get timeline
-            timeline = self.get_timeline(entity_id)
-            
-            # Calculate risk factors
-            factors = {
-                'connection_count': min(100, connection_count * 10),
-                'event_count': min(100, timeline.event_count * 5),
-                'network_density': min(100, (connection_count / max(1, timeline.event_count)) * 20)
-            }
-            
-            # Aggregate risk score
-            risk_score = sum(factors.values()) / len(factors)
-            
-            # Determine risk level
-            if risk_score > 70:
-                risk_level = RiskLevel.HIGH
-            elif risk_score > 40:
-                risk_level = RiskLevel.MEDIUM
-            else:
-                risk_level = RiskLevel.LOW
-            
-            # Generate recommendations
-            recommendations = []
-            if risk_score > 70:
-                recommendations.append("Immediate investigation recommended")
-                recommendations.append("Monitor all associated entities")
-                recommendations.append("Block suspicious accounts")
-            elif risk_score > 40:
-                recommendations.append("Enhanced monitoring advised")
-                recommendations.append("Review recent transactions")
-            
-            return RiskAssessment(
-                entity_id=entity_id,
-                entity_type="phone" if entity_id.startswith('+') else "account",
-                risk_level=risk_level,
-                risk_score=risk_score,
-                factors=factors,
-                recommendations=recommendations,
-                last_updated=datetime.now().isoformat()
+            record = self._risk_counts([entity_id]).get(entity_id, {})
+            return self._score_risk(
+                entity_id,
+                record.get('connection_count', 0),
+                record.get('event_count', 0)
             )
         
         except Exception as e:
             logger.error(f"Risk assessment failed: {e}")
             raise
     
-    def detect_anomalies(self, entity_id: str) -> List[AnomalyDetection]:
-        """Detect anomalous patterns"""
+    def _risk_counts(self, entity_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Connection and event counts of the entities found in the graph, by id.
+
+        With a case they are counted inside the case subgraph, the same way
+        the store counts them: distinct neighbours and incident relationships
+        of phones and accounts.
+        """
+        if not self.case:
+            return {r['entity_id']: r for r in self.store.connection_counts(entity_ids)}
+        
+        p = self._projection()
+        offsets, neighbors, _ = p.incident_adjacency()
+        counts = {}
+        for entity_id in entity_ids:
+            node = p.index.get(entity_id)
+            if node is None or p.label_of(node) not in ('Phone', 'BankAccount'):
+                continue
+            lo, hi = int(offsets[node]), int(offsets[node + 1])
+            if hi > lo:
+                counts[entity_id] = {
+                    'entity_id': entity_id,
+                    'connection_count': len(np.unique(neighbors[lo:hi])),
+                    'event_count': hi - lo
+                }
+        return counts
+    
+    def assess_risk_batch(self, entity_ids: List[str]) -> List[RiskBatchResult]:
+        """Risk assessment for a list of entities"""
+        return [result for chunk in self.iter_risk_batch(entity_ids) for result in chunk]
+    
+    def iter_risk_batch(self, entity_ids: List[str], chunk_size: int = 1000) -> Iterator[List[RiskBatchResult]]:
+        """Yield one result per requested id, in request order, a chunk at a time.
+
+        Each chunk is scored with one aggregation query. Ids without
+        relationships in the graph are ``not_found``, repeats of an earlier
+        id ``duplicate``, and with a case, ids outside it ``not_in_case``.
+        """
+        members = self._projection().index if self.case else None
+        seen = set()
+        for offset in range(0, len(entity_ids), chunk_size):
+            check_deadline()
+            chunk = entity_ids[offset:offset + chunk_size]
+            statuses: List[Optional[str]] = []
+            for entity_id in chunk:
+                if entity_id in seen:
+                    statuses.append('duplicate')
+                else:
+                    seen.add(entity_id)
+                    statuses.append('not_in_case' if members is not None and entity_id not in members else None)
+            
+            wanted = [e for e, status in zip(chunk, statuses) if status is None]
+            counts = self._risk_counts(wanted) if wanted else {}
+            
+            results = []
+            for entity_id, status in zip(chunk, statuses):
+                record = counts.get(entity_id) if status is None else None
+                if record is None:
+                    results.append(RiskBatchResult(entity_id=entity_id, status=status or 'not_found'))
+                    continue
+                results.append(RiskBatchResult(
+                    entity_id=entity_id,
+                    status='scored',
+                    assessment=self._score_risk(entity_id, record['connection_count'], record['event_count'])
+                ))
+            yield results
+    
+    def _score_risk(self, entity_id: str, connection_count: int, event_count: int) -> RiskAssessment:
+        """Turn raw connection/event counts into a scored risk assessment"""
+        # Calculate risk factors
+        factors = {
+            'connection_count': min(100, connection_count * 10),
+            'event_count': min(100, event_count * 5),
+            'network_density': min(100, (connection_count / max(1, event_count)) * 20)
+        }
+        
+        # Aggregate risk score
+        risk_score = sum(factors.values()) / len(factors)
+        
+        # Determine risk level
+        if risk_score > 70:
+            risk_level = RiskLevel.HIGH
+        elif risk_score > 40:
+            risk_level = RiskLevel.MEDIUM
+        else:
+            risk_level = RiskLevel.LOW
+        
+        # Generate recommendations
+        recommendations = []
+        if risk_score > 70:
+            recommendations.append("Immediate investigation recommended")
+            recommendations.append("Monitor all associated entities")
+            recommendations.append("Block suspicious accounts")
+        elif risk_score > 40:
+            recommendations.append("Enhanced monitoring advised")
+            recommendations.append("Review recent transactions")
+        
+        return RiskAssessment(
+            entity_id=entity_id,
+            entity_type="phone" if entity_id.startswith('+') else "account",
+            risk_level=risk_level,
+            risk_score=risk_score,
+            factors=factors,
+            recommendations=recommendations,
+            last_updated=datetime.now().isoformat()
+        )
+    
+    def detect_anomalies(
+        self,
+        entity_id: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[AnomalyDetection]:
+        """Detect anomalous patterns, optionally within a time window;
+        with a case, from the events between case members only"""
+        self._require_member(entity_id)
         try:
-            timeline = self.get_timeline(entity_id)
+            timeline = self.get_timeline(entity_id, since, until)
             anomalies = []
             
             # Check for SIM swapping
             sim_swaps = [e for e in timeline.events if e.event_type == 'sim_swap']
-            if len(sim_swaps) > 2:
+            if len(sim_swaps) > ANOMALY_SIGNALS['sim_swap'][0]:
                 anomalies.append(AnomalyDetection(
                     entity_id=entity_id,
                     anomaly_type="sim_swap",
-                    confidence=min(1.0, len(sim_swaps) / 5),
+                    confidence=min(1.0, len(sim_swaps) / ANOMALY_SIGNALS['sim_swap'][1]),
                     risk_level=RiskLevel.HIGH,
                     timestamp=datetime.now().isoformat(),
                     details={'swap_count': len(sim_swaps)}
@@ -418,11 +723,11 @@ class IntelligenceEngine:
             
             # Check for device hopping
             device_changes = [e for e in timeline.events if e.event_type == 'device_change']
-            if len(device_changes) > 3:
+            if len(device_changes) > ANOMALY_SIGNALS['device_hop'][0]:
                 anomalies.append(AnomalyDetection(
                     entity_id=entity_id,
                     anomaly_type="device_hop",
-                    confidence=min(1.0, len(device_changes) / 6),
+                    confidence=min(1.0, len(device_changes) / ANOMALY_SIGNALS['device_hop'][1]),
                     risk_level=RiskLevel.HIGH,
                     timestamp=datetime.now().isoformat(),
                     details={'device_change_count': len(device_changes)}
@@ -430,11 +735,11 @@ class IntelligenceEngine:
             
             # Check for call bursts
             calls = [e for e in timeline.events if e.event_type == 'call']
-            if len(calls) > 100:
+            if len(calls) > ANOMALY_SIGNALS['call_burst'][0]:
                 anomalies.append(AnomalyDetection(
                     entity_id=entity_id,
                     anomaly_type="call_burst",
-                    confidence=min(1.0, len(calls) / 500),
+                    confidence=min(1.0, len(calls) / ANOMALY_SIGNALS['call_burst'][1]),
                     risk_level=RiskLevel.MEDIUM,
                     timestamp=datetime.now().isoformat(),
                     details={'call_count': len(calls)}
@@ -443,11 +748,11 @@ class IntelligenceEngine:
             # Check for high-velocity transactions
             transactions = [e for e in timeline.events if e.event_type == 'transaction']
             total_amount = sum(float(e.details.get('amount', 0)) for e in transactions)
-            if total_amount > 500000:
+            if total_amount > ANOMALY_SIGNALS['money_movement'][0]:
                 anomalies.append(AnomalyDetection(
                     entity_id=entity_id,
                     anomaly_type="money_movement",
-                    confidence=min(1.0, total_amount / 1000000),
+                    confidence=min(1.0, total_amount / ANOMALY_SIGNALS['money_movement'][1]),
                     risk_level=RiskLevel.HIGH,
                     timestamp=datetime.now().isoformat(),
                     details={'total_amount': total_amount, 'transaction_count': len(transactions)}
@@ -459,3 +764,167 @@ class IntelligenceEngine:
         except Exception as e:
             logger.error(f"Anomaly detection failed: {e}")
             raise
+    
+    def sweep_anomalies(
+        self,
+        anomaly_type: Optional[str] = None,
+        top_n: int = 100
+    ) -> List[AnomalyDetection]:
+        """Rank anomalies across every entity with one aggregation per signal"""
+        try:
+            signals = [anomaly_type] if anomaly_type else list(ANOMALY_SIGNALS)
+            now = datetime.now().isoformat()
+            anomalies = []
+            
+            for signal in signals:
+                threshold, scale, risk_level = ANOMALY_SIGNALS[signal]
+                if self.case:
+                    records = self._case_sweep(signal, threshold, top_n)
+                else:
+                    records = self.store.anomaly_sweep(signal, threshold, top_n)
+                
+                for record in records:
+                    anomalies.append(AnomalyDetection(
+                        entity_id=record['entity_id'],
+                        anomaly_type=signal,
+                        confidence=min(1.0, float(record['value']) / scale),
+                        risk_level=risk_level,
+                        timestamp=now,
+                        details=record.get('details') or {}
+                    ))
+            
+            anomalies.sort(key=lambda a: a.confidence, reverse=True)
+            anomalies = anomalies[:top_n]
+            
+            logger.info(f"✓ Anomaly sweep found {len(anomalies)} anomalies")
+            return anomalies
+        
+        except Exception as e:
+            logger.error(f"Anomaly sweep failed: {e}")
+            raise
+    
+    def _case_sweep(self, signal: str, threshold: float, top_n: int) -> List[Dict[str, Any]]:
+        """One sweep signal over the case subgraph, as rows shaped like the sweep queries"""
+        p = self._projection()
+        label, relation, detail = SWEEP_SIGNALS[signal]
+        mask = p.rel == p.relation_code(relation)
+        ends = np.concatenate([p.src[mask], p.dst[mask]])
+        counts = np.bincount(ends, minlength=p.node_count)
+        if signal == 'money_movement':
+            value = np.bincount(ends, weights=np.tile(np.nan_to_num(p.amount[mask]), 2), minlength=p.node_count)
+        else:
+            value = counts
+
+        candidates = np.flatnonzero((p.node_labels == LABELS.index(label)) & (value > threshold))
+        top = candidates[np.argsort(-value[candidates], kind='stable')[:top_n]]
+        rows = []
+        for n in top.tolist():
+            details = {detail: value[n].item()}
+            if signal == 'money_movement':
+                details['transaction_count'] = int(counts[n])
+            rows.append({'entity_id': p.node_ids[n], 'value': value[n].item(), 'details': details})
+        return rows
+    
+    def detect_velocity_anomalies(
+        self,
+        entity_ids: Optional[List[str]] = None,
+        windows: Optional[List[str]] = None,
+        z_threshold: float = 3.0,
+        top_n: int = 100
+    ) -> List[AnomalyDetection]:
+        """Sliding-window call/money bursts across all (or the given) entities"""
+        try:
+            detector = VelocityDetector(self._projection())
+            return detector.detect(
+                windows=windows,
+                z_threshold=z_threshold,
+                entity_ids=entity_ids,
+                top_n=top_n
+            )
+        
+        except Exception as e:
+            logger.error(f"Velocity detection failed: {e}")
+            raise
+    
+    def trace_money_trail(
+        self,
+        account_number: str,
+        max_hops: int = 6,
+        top_k: int = 20,
+        min_fraction: float = 0.1,
+        max_gap_hours: Optional[float] = 72.0,
+        since: Optional[datetime] = None
+    ) -> MoneyTrail:
+        """Follow time-ordered SENT chains out of a source account"""
+        try:
+            tracer = MoneyFlowTracer(self._projection())
+            return tracer.trace(
+                account_number,
+                max_hops=max_hops,
+                top_k=top_k,
+                min_fraction=min_fraction,
+                max_gap_hours=max_gap_hours,
+                since=naive_utc(since)
+            )
+        
+        except Exception as e:
+            logger.error(f"Money trail tracing failed: {e}")
+            raise
+    
+    def find_similar_entities(self, entity_id: str, top_k: int = 10) -> Optional[SimilarEntities]:
+        """Phones and accounts that behave most like ``entity_id``: call durations,
+        fan-out, transaction sizes, activity hours and device churn.
+
+        None if the entity is unknown or has no behaviour profile.
+        """
+        self._require_member(entity_id)
+        try:
+            base = get_projection(self.store)
+            behavior_index.refresh(base)
+            node = base.index.get(entity_id)
+            if node is None:
+                return None
+
+            allowed = None
+            if self.case:
+                members = self.case.projection(base).node_ids
+                allowed = np.fromiter((base.index[e] for e in members), dtype=np.int64, count=len(members))
+            with ANALYTICS_DURATION.time(algorithm="behavior_similarity"):
+                found = behavior_index.nearest(node, top_k, allowed)
+            if found is None:
+                return None
+
+            return SimilarEntities(
+                entity_id=entity_id,
+                label=base.label_of(node),
+                features={f: round(v, 6) for f, v in zip(FEATURES, behavior_index.features(node).tolist())},
+                similar=[
+                    SimilarEntity(entity_id=base.node_ids[n], label=base.label_of(n), similarity=score)
+                    for n, score in found
+                ]
+            )
+
+        except Exception as e:
+            logger.error(f"Similarity search failed: {e}")
+            raise
+
+    def detect_money_cycles(
+        self,
+        max_length: int = 5,
+        window_hours: float = 72.0,
+        min_amount: float = 0.0,
+        top_k: int = 100
+    ) -> List[MoneyCycle]:
+        """Find circular SENT chains that close within a time window"""
+        try:
+            detector = CycleDetector(self._projection())
+            return detector.detect(
+                max_length=max_length,
+                window_hours=window_hours,
+                min_amount=min_amount,
+                top_k=top_k
+            )
+        
+        except Exception as e:
+            logger.error(f"Cycle detection failed: {e}")
+            raise
@@ -0,0 +1,357 @@
+import numpy as np
+import heapq
+from typing import List, Optional, Tuple
+from datetime import datetime, timezone
+import logging
+from compute import check_deadline
+# from app.models.schemas import MoneyTrail, MoneyTrailPath, MoneyTrailHop, MoneyCycle
+from models.schemas import MoneyTrail, MoneyTrailPath, MoneyTrailHop, MoneyCycle
+from services.projection import GraphProjection
+
+logger = logging.getLogger(__name__)
+
+class TemporalTransfers:
+    """SENT transfers laid out in the projection's timestamp-sorted adjacency,
+    so the transfers out of a node inside a time range are found with a
+    binary search.
+    """
+
+    def __init__(self, projection: GraphProjection):
+        self.projection = projection
+        self.offsets, order = projection.temporal_adjacency('SENT')
+        self.ts = projection.ts[order]
+        self.src = projection.src[order]
+        self.dst = projection.dst[order]
+        self.amount = np.nan_to_num(projection.amount[order])
+
+    def _onward(self, node: int, after: Optional[int], until: Optional[int]) -> range:
+        """Positions of transfers out of ``node`` with ``after <= ts <= until``"""
+        lo, hi = int(self.offsets[node]), int(self.offsets[node + 1])
+        row = self.ts[lo:hi]
+        if until is not None:
+            hi = lo + int(np.searchsorted(row, until, side='right'))
+        if after is not None:
+            lo = lo + int(np.searchsorted(row, after, side='left'))
+        return range(lo, hi)
+
+    def _hops(self, nodes: List[int], positions: tuple) -> List[MoneyTrailHop]:
+        p = self.projection
+        return [
+            MoneyTrailHop(
+                from_account=p.node_ids[u],
+                to_account=p.node_ids[v],
+                amount=float(self.amount[j]),
+                timestamp=datetime.utcfromtimestamp(int(self.ts[j])).isoformat()
+            )
+            for u, v, j in zip(nodes, nodes[1:], positions)
+        ]
+
+class MoneyFlowTracer(TemporalTransfers):
+    """Time-respecting multi-hop search over SENT transfers"""
+
+    def trace(
+        self,
+        source_account: str,
+        max_hops: int = 6,
+        top_k: int = 20,
+        min_fraction: float = 0.1,
+        max_gap_hours: Optional[float] = 72.0,
+        since: Optional[datetime] = None,
+        max_expansions: int = 200000
+    ) -> MoneyTrail:
+        """Rank the paths money from ``source_account`` can have taken.
+
+        Each hop must happen no earlier than the previous one (and within
+        ``max_gap_hours`` of it), and must carry at least ``min_fraction`` of
+        the previous hop's amount. Paths are ranked by the bottleneck amount
+        that could have flowed end to end.
+        """
+        p = self.projection
+        source = p.index.get(source_account)
+        if source is None or p.label_of(source) != 'BankAccount':
+            return MoneyTrail(source_account=source_account, paths=[], explored_transfers=0, truncated=False)
+
+        max_gap = int(max_gap_hours * 3600) if max_gap_hours else None
+        start_after = int(since.replace(tzinfo=timezone.utc).timestamp()) if since else None
+
+        best: list = []  # min-heap of (traced_amount, tie, positions, cash_out)
+        tie = 0
+        explored = 0
+        truncated = False
+
+        # Depth-first; each frame is (node, hop positions so far, nodes on path)
+        stack = [(source, (), (source,))]
+        while stack:
+            node, positions, path = stack.pop()
+
+            if positions:
+                last = positions[-1]
+                after, prev_amount = int(self.ts[last]), float(self.amount[last])
+                onward = self._onward(node, after, after + max_gap if max_gap else None)
+            else:
+                after, prev_amount = start_after, None
+                onward = self._onward(node, after, None)
+
+            at_limit = len(positions) >= max_hops
+            children = []
+            if not at_limit:
+                for j in onward:
+                    nxt = int(self.dst[j])
+                    if nxt in path:
+                        continue
+                    if prev_amount is not None and self.amount[j] < min_fraction * prev_amount:
+                        continue
+                    children.append(j)
+
+            if positions and (at_limit or not children):
+                traced = float(min(self.amount[list(positions)]))
+                entry = (traced, tie, positions, not at_limit)
+                tie += 1
+                if len(best) < top_k:
+                    heapq.heappush(best, entry)
+                elif traced > best[0][0]:
+                    heapq.heapreplace(best, entry)
+
+            explored += len(children)
+            if explored % 1024 < len(children):
+                check_deadline()
+            if explored > max_expansions:
+                truncated = True
+                break
+
+            # Largest transfers are popped (and explored) first
+            children.sort(key=lambda j: self.amount[j])
+            for j in children:
+                stack.append((int(self.dst[j]), positions + (j,), path + (int(self.dst[j]),)))
+
+        paths = [self._path(source, positions, cash_out) for _, _, positions, cash_out in sorted(best, reverse=True)]
+        logger.info(f"✓ Money trail for {source_account}: {len(paths)} paths, {explored} transfers explored")
+        return MoneyTrail(
+            source_account=source_account,
+            paths=paths,
+            explored_transfers=explored,
+            truncated=truncated
+        )
+
+    def _path(self, source: int, positions: tuple, cash_out: bool) -> MoneyTrailPath:
+        p = self.projection
+        nodes = [source] + [int(self.dst[j]) for j in positions]
+        hops = self._hops(nodes, positions)
+
+        return MoneyTrailPath(
+            accounts=[p.node_ids[n] for n in nodes],
+            hops=hops,
+            hop_count=len(hops),
+            traced_amount=min(h.amount for h in hops),
+            start_time=hops[0].timestamp,
+            end_time=hops[-1].timestamp,
+            cash_out=cash_out
+        )
+
+class CycleDetector(TemporalTransfers):
+    """Round-tripping detection: time-ordered SENT cycles of bounded length.
+
+    Enumeration is confined to strongly connected components and starts from
+    the earliest transfer of each cycle. Accounts that cannot get back to the
+    start within the remaining hop budget (BFS over reversed transfers inside
+    the cycle's time window) are pruned, and once K cycles are held, transfers
+    smaller than the weakest of them are skipped, which keeps dense clusters
+    tractable.
+    """
+
+    def _cyclic_nodes(self) -> np.ndarray:
+        """Accounts in a strongly connected component of two or more"""
+        # scipy.sparse is slow to import and only needed here
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.csgraph import connected_components
+
+        n = self.projection.node_count
+        adjacency = csr_matrix(
+            (np.ones(len(self.src), dtype=np.int8), (self.src, self.dst)),
+            shape=(n, n)
+        )
+        _, labels = connected_components(adjacency, directed=True, connection='strong')
+        sizes = np.bincount(labels)
+        return np.flatnonzero(sizes[labels] > 1)
+
+    def _can_continue(self, firsts: np.ndarray, window: int) -> np.ndarray:
+        """Vectorised pre-filter: the first transfer's recipient must send
+        money on, and its sender receive money, inside the window"""
+        if len(firsts) == 0:
+            return np.zeros(0, dtype=bool)
+        t_min = int(self.ts.min())
+        stride = int(self.ts.max()) - t_min + window + 1
+        start, end = self.ts[firsts] - t_min, self.ts[firsts] - t_min + window
+
+        # Rows are sorted by (node, time), so node * stride + time is monotonic
+        out_key = self.src.astype(np.int64) * stride + (self.ts - t_min)
+        rows = self.dst[firsts].astype(np.int64) * stride
+        sends_on = (
+            np.searchsorted(out_key, rows + end, side='right')
+            > np.searchsorted(out_key, rows + start, side='left')
+        )
+
+        offsets, _, times = self.projection.reverse_adjacency('SENT')
+        targets = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+        in_key = targets.astype(np.int64) * stride + (times - t_min)
+        rows = self.src[firsts].astype(np.int64) * stride
+        paid_back = (
+            np.searchsorted(in_key, rows + end, side='right')
+            > np.searchsorted(in_key, rows + start, side='left')
+        )
+        return sends_on & paid_back
+
+    def _distances_to(self, target: int, limit: int, after: int, until: int) -> dict:
+        """Hops needed to reach ``target`` using only transfers inside [after, until]"""
+        offsets, sources, times = self.projection.reverse_adjacency('SENT')
+        dist = {target: 0}
+        frontier = [target]
+        for d in range(1, limit + 1):
+            nxt = []
+            for v in frontier:
+                lo, hi = int(offsets[v]), int(offsets[v + 1])
+                row = times[lo:hi]
+                hi = lo + int(np.searchsorted(row, until, side='right'))
+                lo = lo + int(np.searchsorted(row, after, side='left'))
+                for u in sources[lo:hi]:
+                    u = int(u)
+                    if u not in dist:
+                        dist[u] = d
+                        nxt.append(u)
+            frontier = nxt
+        return dist
+
+    def detect(
+        self,
+        max_length: int = 5,
+        window_hours: float = 72.0,
+        min_amount: float = 0.0,
+        top_k: int = 100,
+        max_expansions: int = 1000000,
+        since: Optional[int] = None,
+        until: Optional[int] = None
+    ) -> List[MoneyCycle]:
+        """Top-K cycles by cycled amount that close within ``window_hours`` of their first transfer.
+
+        ``since`` / ``until`` (epoch seconds) confine every transfer of a
+        cycle to that period.
+        """
+        found, _ = self.search(max_length, window_hours, min_amount, top_k, max_expansions, since, until)
+        return self._cycles(found)
+
+    def search(
+        self,
+        max_length: int = 5,
+        window_hours: float = 72.0,
+        min_amount: float = 0.0,
+        top_k: Optional[int] = 100,
+        max_expansions: int = 1000000,
+        since: Optional[int] = None,
+        until: Optional[int] = None
+    ) -> Tuple[list, bool]:
+        """Raw cycle search behind ``detect``.
+
+        Returns ``(found, truncated)``: ``found`` holds
+        ``(cycled_amount, tie, nodes, positions)`` entries, and ``truncated``
+        is set when the expansion budget ran out first. ``top_k=None`` keeps
+        every cycle instead of the top K.
+        """
+        window = int(window_hours * 3600)
+        found: list = []  # min-heap of (cycled_amount, tie, nodes, positions)
+        tie = 0
+        explored = 0
+
+        def floor() -> float:
+            if top_k is not None and len(found) == top_k:
+                return max(min_amount, found[0][0])
+            return min_amount
+
+        # A cycle never carries more than its first transfer, so trying first
+        # transfers largest-first lets the search stop once the top K is settled
+        cyclic = np.zeros(self.projection.node_count, dtype=bool)
+        cyclic[self._cyclic_nodes()] = True
+        eligible = cyclic[self.src] & (self.amount >= min_amount)
+        if since is not None:
+            eligible &= self.ts >= since
+        if until is not None:
+            eligible &= self.ts <= until
+        firsts = np.flatnonzero(eligible)
+        firsts = firsts[self._can_continue(firsts, window)]
+        firsts = firsts[np.argsort(-self.amount[firsts], kind='stable')]
+
+        for first in firsts:
+            check_deadline()
+            first = int(first)
+            if top_k is not None and len(found) == top_k and self.amount[first] <= floor():
+                break
+
+            start = int(self.src[first])
+            deadline = int(self.ts[first]) + window
+            if until is not None:
+                deadline = min(deadline, until)
+            dist = None
+
+            # Depth-first; each frame is (node, nodes on path, hop positions)
+            stack = [(int(self.dst[first]), (start, int(self.dst[first])), (first,))]
+            while stack:
+                node, path, positions = stack.pop()
+                last = positions[-1]
+                onward = self._onward(node, int(self.ts[last]), deadline)
+                if not onward:
+                    continue
+
+                # Hop distances back to the start are only worth computing
+                # once the time window leaves somewhere to go
+                if dist is None:
+                    dist = self._distances_to(start, max_length - 1, int(self.ts[first]), deadline)
+                remaining = max_length - len(positions)
+                if dist.get(node, max_length) > remaining:
+                    continue
+
+                least = floor()
+                for j in onward:
+                    if self.amount[j] < least:
+                        continue
+                    nxt = int(self.dst[j])
+                    explored += 1
+                    if nxt == start:
+                        cycle = positions + (j,)
+                        # Hops never go back in time, so a cycle can only be
+                        # entered at another transfer when every hop shares
+                        # one timestamp; then the lowest position is its start
+                        if self.ts[j] == self.ts[first] and first != min(cycle):
+                            continue
+                        cycled = float(self.amount[list(cycle)].min())
+                        entry = (cycled, tie, path + (start,), cycle)
+                        tie += 1
+                        if top_k is None or len(found) < top_k:
+                            heapq.heappush(found, entry)
+                        elif cycled > found[0][0]:
+                            heapq.heapreplace(found, entry)
+                    elif nxt not in path and remaining > 1:
+                        stack.append((nxt, path + (nxt,), positions + (j,)))
+
+                if explored > max_expansions:
+                    logger.warning(f"Cycle search stopped after {explored} expansions")
+                    return found, True
+
+        return found, False
+
+    def _cycles(self, found: list) -> List[MoneyCycle]:
+        p = self.projection
+        cycles = []
+        for cycled, _, nodes, positions in sorted(found, reverse=True):
+            hops = self._hops(list(nodes), positions)
+            cycles.append(MoneyCycle(
+                accounts=[p.node_ids[n] for n in nodes],
+                hops=hops,
+                length=len(hops),
+                cycled_amount=cycled,
+                total_amount=float(self.amount[list(positions)].sum()),
+                duration_seconds=int(self.ts[positions[-1]] - self.ts[positions[0]]),
+                start_time=hops[0].timestamp,
+                end_time=hops[-1].timestamp
+            ))
+
+        logger.info(f"✓ Detected {len(cycles)} round-tripping cycles")
+        return cycles
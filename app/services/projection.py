@@ -0,0 +1,551 @@
+import numpy as np
+from array import array
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import itertools
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from config import settings
+from database.store import GraphStore
+from metrics import ANALYTICS_DURATION, MetricFamily, cache_lookup, register_collector
+
+logger = logging.getLogger(__name__)
+
+RELATIONS = ('MADE', 'SENT', 'USES', 'OWNS', 'RUNS_ON', 'HAS_SIM', 'CONNECTS_VIA', 'INVOLVED_IN')
+LABELS = ('Person', 'Phone', 'SIM', 'Device', 'BankAccount', 'IP', 'Complaint', 'Unknown')
+
+# Sentinel for relationships without a timestamp
+NO_TIME = np.iinfo(np.int64).min
+
+def csr_rows(offsets: np.ndarray, values: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Concatenated ``values[offsets[r]:offsets[r + 1]]`` for every row, without a Python loop"""
+    starts, ends = offsets[rows], offsets[rows + 1]
+    lengths = ends - starts
+    if lengths.sum() == 0:
+        return values[:0]
+    # Position within the output minus position within the row, per row
+    shift = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+    return values[shift + np.arange(lengths.sum())]
+
+class SortedIndex(Mapping):
+    """Entity id -> node lookup by binary search over sorted id arrays.
+
+    Used for memory-mapped snapshots: the sorted ids are shared pages
+    rather than a per-process dict. Nodes added after the snapshot sit in
+    the ``extra`` dict.
+    """
+
+    def __init__(self, sorted_ids: np.ndarray, positions: np.ndarray, extra: Optional[Dict[str, int]] = None):
+        self.sorted_ids = sorted_ids
+        self.positions = positions
+        self.extra = extra or {}
+
+    def __getitem__(self, entity: str) -> int:
+        node = self.extra.get(entity)
+        if node is not None:
+            return node
+        i = int(np.searchsorted(self.sorted_ids, entity))
+        if i < len(self.sorted_ids) and self.sorted_ids[i] == entity:
+            return int(self.positions[i])
+        raise KeyError(entity)
+
+    def __iter__(self):
+        yield from (str(entity) for entity in self.sorted_ids)
+        yield from self.extra
+
+    def __len__(self) -> int:
+        return len(self.sorted_ids) + len(self.extra)
+
+    def extended(self, added: Dict[str, int]) -> 'SortedIndex':
+        return SortedIndex(self.sorted_ids, self.positions, {**self.extra, **added})
+
+
+def _collect(records: Iterable[tuple], index: Mapping, first_node: int) -> tuple:
+    """Intern streamed edge rows against ``index``; nodes it lacks are numbered from ``first_node``.
+
+    Returns ``(added, node_ids, node_labels, src, dst, rel, ts, amount, duration)``
+    where ``added`` maps the new entities to their nodes.
+    """
+    # Streamed as tuples into growable typed buffers: no per-row dicts,
+    # and nothing but the columns themselves is held for the whole pull
+    added: Dict[str, int] = {}
+    node_ids: List[str] = []
+    node_labels = array('b')
+    src, dst, rel = array('i'), array('i'), array('b')
+    ts, amount, duration = array('q'), array('d'), array('d')
+    label_code = {label: i for i, label in enumerate(LABELS)}
+    relation_code = {relation: i for i, relation in enumerate(RELATIONS)}
+    unknown = len(LABELS) - 1
+    nan = float('nan')
+
+    def intern(entity: str, label: Optional[str]) -> int:
+        node = added.get(entity)
+        if node is None:
+            node = index.get(entity)
+        if node is None:
+            node = added[entity] = first_node + len(node_ids)
+            node_ids.append(entity)
+            node_labels.append(label_code.get(label, unknown))
+        return node
+
+    for source, target, source_label, target_label, relation, t, a, d in records:
+        src.append(intern(source, source_label))
+        dst.append(intern(target, target_label))
+        rel.append(relation_code[relation])
+        ts.append(NO_TIME if t is None else t)
+        amount.append(nan if a is None else a)
+        duration.append(nan if d is None else d)
+
+    return (
+        added, node_ids, np.frombuffer(node_labels, dtype=np.int8),
+        np.frombuffer(src, dtype=np.int32), np.frombuffer(dst, dtype=np.int32), np.frombuffer(rel, dtype=np.int8),
+        np.frombuffer(ts, dtype=np.int64), np.frombuffer(amount, dtype=np.float64),
+        np.frombuffer(duration, dtype=np.float64),
+    )
+
+# Projections that only ever grew from the same load share a lineage
+_lineages = itertools.count()
+
+# Bumped with every change to the snapshot layout; older snapshots are ignored
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_ARRAYS = ('node_ids', 'node_labels', 'src', 'dst', 'rel', 'ts', 'amount', 'duration',
+                   'sorted_ids', 'sorted_positions', 'incident_offsets', 'incident_neighbors', 'incident_edges')
+
+class GraphProjection:
+    """Columnar in-memory projection of the entity graph.
+
+    Nodes are interned to dense integer ids; edges are parallel NumPy arrays
+    (source, target, relation code, epoch seconds, amount, duration).
+    ``watermark`` is the store's ingest watermark the edges are complete up
+    to; the arrays are never written in place, so they can be memory-mapped
+    from a snapshot.
+    """
+
+    def __init__(
+        self,
+        node_ids: List[str],
+        node_labels: np.ndarray,
+        src: np.ndarray,
+        dst: np.ndarray,
+        rel: np.ndarray,
+        ts: np.ndarray,
+        amount: np.ndarray,
+        duration: np.ndarray,
+        index: Optional[Mapping] = None,
+        watermark: int = 0
+    ):
+        self.node_ids = np.asarray(node_ids, dtype=object)
+        self.node_labels = node_labels
+        self.index: Mapping = index if index is not None else {entity: i for i, entity in enumerate(node_ids)}
+        self.src = src
+        self.dst = dst
+        self.rel = rel
+        self.ts = ts
+        self.amount = amount
+        self.duration = duration
+        self.watermark = watermark
+        self.built_at = time.time()
+        self.refreshed_at = self.built_at
+        # Edge count of the snapshot this projection was opened from or saved to
+        self.snapshot_edges: Optional[int] = None
+        # Shared with the projections caught up from this one, whose node and
+        # edge arrays extend this one's, so derived indexes can update in place
+        self.lineage = next(_lineages)
+        self._derived: Dict[str, Any] = {}
+        self._derived_locks: Dict[str, threading.RLock] = {}
+        self._derived_lock = threading.Lock()  # guards _derived_locks only
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.src)
+
+    @staticmethod
+    def relation_code(relation: str) -> int:
+        return RELATIONS.index(relation)
+
+    def label_of(self, node: int) -> str:
+        return LABELS[self.node_labels[node]]
+
+    @staticmethod
+    def label_of_code(code: int) -> str:
+        return LABELS[code]
+
+    def edge_mask(self, relations: List[str]) -> np.ndarray:
+        """Boolean mask selecting edges of the given relationship types"""
+        codes = [self.relation_code(r) for r in relations]
+        return np.isin(self.rel, codes)
+
+    def degree(self) -> np.ndarray:
+        """Total degree of every node over all relationships"""
+        return self.derived('degree', lambda: (
+            np.bincount(self.src, minlength=self.node_count)
+            + np.bincount(self.dst, minlength=self.node_count)
+        ))
+
+    def time_window(self, since: Optional[int] = None, until: Optional[int] = None) -> np.ndarray:
+        """Edges with ``since <= ts <= until`` (epoch seconds; either end may be open).
+
+        The timestamped edges are sorted once per projection, so every window
+        after that is two binary searches. Edges without a timestamp are
+        never inside a window.
+        """
+        def build():
+            timed = np.flatnonzero(self.ts != NO_TIME)
+            order = timed[np.argsort(self.ts[timed], kind='stable')]
+            return order, self.ts[order]
+
+        order, times = self.derived('time_order', build)
+        lo = 0 if since is None else int(np.searchsorted(times, since, side='left'))
+        hi = len(times) if until is None else int(np.searchsorted(times, until, side='right'))
+        return order[lo:hi]
+
+    def derived(self, name: str, build: Callable[[], Any]) -> Any:
+        """Memoise a structure computed from this projection (dropped with it).
+
+        Each name builds under its own lock, so a slow build only holds up
+        callers waiting for that same structure.
+        """
+        with self._derived_lock:
+            lock = self._derived_locks.setdefault(name, threading.RLock())
+        with lock:
+            cache_lookup("projection_derived", name in self._derived)
+            if name not in self._derived:
+                self._derived[name] = build()
+            return self._derived[name]
+
+    def temporal_adjacency(self, relation: str) -> tuple:
+        """CSR adjacency by source node, each row's edges sorted by timestamp.
+
+        Returns ``(offsets, order)``: the out-edges of node ``u`` are
+        ``order[offsets[u]:offsets[u + 1]]`` (indices into the edge arrays).
+        Edges without a timestamp are left out.
+        """
+        def build():
+            edges = np.flatnonzero((self.rel == self.relation_code(relation)) & (self.ts != NO_TIME))
+            order = edges[np.lexsort((self.ts[edges], self.src[edges]))]
+            counts = np.bincount(self.src[order], minlength=self.node_count)
+            offsets = np.concatenate([[0], np.cumsum(counts)])
+            return offsets, order
+        return self.derived(f"adjacency:{relation}", build)
+
+    def reverse_adjacency(self, relation: str) -> tuple:
+        """CSR adjacency by target node, each row sorted by timestamp.
+
+        Returns ``(offsets, sources, timestamps)`` for the in-edges of each node.
+        Edges without a timestamp are left out.
+        """
+        def build():
+            edges = np.flatnonzero((self.rel == self.relation_code(relation)) & (self.ts != NO_TIME))
+            order = edges[np.lexsort((self.ts[edges], self.dst[edges]))]
+            counts = np.bincount(self.dst[order], minlength=self.node_count)
+            offsets = np.concatenate([[0], np.cumsum(counts)])
+            return offsets, self.src[order], self.ts[order]
+        return self.derived(f"reverse:{relation}", build)
+
+    def incident_adjacency(self) -> tuple:
+        """Undirected CSR adjacency over all relationships.
+
+        Returns ``(offsets, neighbors, edges)``: node ``u`` touches
+        ``neighbors[offsets[u]:offsets[u + 1]]`` through the matching entries
+        of ``edges`` (indices into the edge arrays).
+        """
+        def build():
+            ends = np.concatenate([self.src, self.dst])
+            others = np.concatenate([self.dst, self.src])
+            edge_ids = np.tile(np.arange(self.edge_count), 2)
+            order = np.argsort(ends, kind='stable')
+            counts = np.bincount(ends, minlength=self.node_count)
+            offsets = np.concatenate([[0], np.cumsum(counts)])
+            return offsets, others[order], edge_ids[order]
+        return self.derived('incident', build)
+
+    def subgraph(self, nodes: np.ndarray) -> 'GraphProjection':
+        """Induced subgraph on the given nodes, re-interned to dense ids.
+
+        Only the incident edges of ``nodes`` are visited, so the cost follows
+        the size of the subgraph rather than of the whole projection.
+        """
+        nodes = np.unique(nodes)
+        remap = np.full(self.node_count, -1, dtype=np.int32)
+        remap[nodes] = np.arange(len(nodes), dtype=np.int32)
+
+        offsets, _, incident = self.incident_adjacency()
+        edges = np.unique(csr_rows(offsets, incident, nodes))
+        edges = edges[(remap[self.src[edges]] >= 0) & (remap[self.dst[edges]] >= 0)]
+
+        return GraphProjection(
+            self.node_ids[nodes].tolist(),
+            self.node_labels[nodes],
+            remap[self.src[edges]],
+            remap[self.dst[edges]],
+            self.rel[edges],
+            self.ts[edges],
+            self.amount[edges],
+            self.duration[edges],
+        )
+
+    @classmethod
+    def load(cls, store: GraphStore) -> 'GraphProjection':
+        """Pull every relationship out of the graph store into columnar arrays"""
+        watermark = store.ingest_watermark()
+        index, node_ids, *columns = _collect(store.stream_edges(list(RELATIONS), upto=watermark), {}, 0)
+
+        projection = cls(node_ids, *columns, index=index, watermark=watermark)
+        logger.info(f"✓ Graph projection built with {projection.node_count} nodes and {projection.edge_count} edges")
+        return projection
+
+    def catch_up(self, store: GraphStore) -> 'GraphProjection':
+        """Apply the relationships ingested since ``watermark``.
+
+        Returns a new projection when there were any (this one is left
+        untouched for the requests still reading it), otherwise this one.
+        Arrays are never changed in place, so the structures memoised by
+        ``derived`` stay valid for the projection that built them; the new
+        projection starts without any.
+        """
+        watermark = store.ingest_watermark()
+        if watermark > self.watermark:
+            records = store.stream_edges(list(RELATIONS), after=self.watermark, upto=watermark)
+            added, node_ids, node_labels, *columns = _collect(records, self.index, self.node_count)
+            if len(columns[0]):
+                if isinstance(self.index, SortedIndex):
+                    index = self.index.extended(added)
+                else:
+                    index = {**self.index, **added}
+                projection = GraphProjection(
+                    np.concatenate([self.node_ids, np.asarray(node_ids, dtype=object)]),
+                    np.concatenate([self.node_labels, node_labels]),
+                    *(np.concatenate([old, new]) for old, new in zip(
+                        (self.src, self.dst, self.rel, self.ts, self.amount, self.duration), columns)),
+                    index=index, watermark=watermark,
+                )
+                projection.snapshot_edges = self.snapshot_edges
+                projection.lineage = self.lineage
+                logger.info(f"✓ Graph projection caught up with {len(columns[0])} edges and {len(node_ids)} nodes")
+                return projection
+        self.watermark = max(self.watermark, watermark)
+        self.refreshed_at = time.time()
+        return self
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def save(self, directory: str, backend: str) -> str:
+        """Write the projection under ``directory`` as one versioned folder of ``.npy`` files.
+
+        The folder is written under a temporary name and renamed into place,
+        so readers never see a partial snapshot. Returns its path.
+        """
+        path = os.path.join(directory, f"projection-{backend}-{self.watermark:012d}")
+        if os.path.isdir(path):
+            return path
+        os.makedirs(directory, exist_ok=True)
+
+        node_ids = np.asarray(self.node_ids, dtype=str)
+        order = np.argsort(node_ids, kind='stable')
+        offsets, neighbors, edges = self.incident_adjacency()
+        arrays = dict(
+            node_ids=node_ids, node_labels=self.node_labels, src=self.src, dst=self.dst, rel=self.rel,
+            ts=self.ts, amount=self.amount, duration=self.duration,
+            sorted_ids=node_ids[order], sorted_positions=order.astype(np.int32),
+            incident_offsets=offsets, incident_neighbors=neighbors, incident_edges=edges,
+        )
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "backend": backend,
+            "watermark": self.watermark,
+            "nodes": self.node_count,
+            "edges": self.edge_count,
+            "relations": list(RELATIONS),
+            "labels": list(LABELS),
+            "created_at": time.time(),
+        }
+
+        staging = tempfile.mkdtemp(prefix=".projection-", dir=directory)
+        try:
+            for name in SNAPSHOT_ARRAYS:
+                np.save(os.path.join(staging, f"{name}.npy"), arrays[name])
+            with open(os.path.join(staging, "manifest.json"), "w") as f:
+                json.dump(manifest, f)
+            os.rename(staging, path)
+        except OSError:
+            # Another worker published the same watermark first
+            shutil.rmtree(staging, ignore_errors=True)
+            if not os.path.isdir(path):
+                raise
+        self.snapshot_edges = self.edge_count
+        logger.info(f"✓ Graph projection snapshot saved to {path}")
+        return path
+
+    @classmethod
+    def open(cls, path: str) -> 'GraphProjection':
+        """Memory-map a snapshot written by ``save``; pages are shared by every process mapping it"""
+        with open(os.path.join(path, "manifest.json")) as f:
+            manifest = json.load(f)
+        # Plain read-only views onto the mapped files. Only the node ids are
+        # copied out, as Python strings, since that is what the API hands out
+        arrays = {name: np.asarray(np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r'))
+                  for name in SNAPSHOT_ARRAYS}
+
+        projection = cls(
+            arrays['node_ids'], arrays['node_labels'], arrays['src'], arrays['dst'], arrays['rel'],
+            arrays['ts'], arrays['amount'], arrays['duration'],
+            index=SortedIndex(arrays['sorted_ids'], arrays['sorted_positions']),
+            watermark=manifest['watermark'],
+        )
+        projection._derived['incident'] = (
+            arrays['incident_offsets'], arrays['incident_neighbors'], arrays['incident_edges']
+        )
+        projection.snapshot_edges = projection.edge_count
+        logger.info(f"✓ Graph projection snapshot opened from {path} "
+                    f"({projection.node_count} nodes, {projection.edge_count} edges)")
+        return projection
+
+def _snapshots(directory: str, backend: str) -> List[Tuple[int, str]]:
+    """``(watermark, path)`` of the usable snapshots for ``backend``, newest first"""
+    found = []
+    if not os.path.isdir(directory):
+        return found
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            with open(os.path.join(path, "manifest.json")) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if (manifest.get("format") == SNAPSHOT_FORMAT and manifest.get("backend") == backend
+                and manifest.get("relations") == list(RELATIONS) and manifest.get("labels") == list(LABELS)):
+            found.append((manifest["watermark"], path))
+    return sorted(found, reverse=True)
+
+
+def prune_snapshots(directory: str, backend: str, keep: int):
+    """Remove all but the ``keep`` newest snapshots of ``backend``"""
+    for _, path in _snapshots(directory, backend)[keep:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+# ------------------------------------------------------------------
+# Shared projection cache
+# ------------------------------------------------------------------
+
+_projection: Optional[GraphProjection] = None
+_projection_stale = False
+_projection_lock = threading.Lock()
+_snapshot_lock = threading.Lock()
+
+
+def _cold_start(store: GraphStore) -> GraphProjection:
+    """Open the newest snapshot the store has not moved behind, else load in full"""
+    directory = settings.PROJECTION_SNAPSHOT_DIR
+    if directory:
+        watermark = store.ingest_watermark()
+        for snapshot_watermark, path in _snapshots(directory, store.backend):
+            if snapshot_watermark > watermark:
+                continue  # taken from a database that has since been replaced
+            try:
+                with ANALYTICS_DURATION.time(algorithm="projection_snapshot_open"):
+                    projection = GraphProjection.open(path)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Projection snapshot {path} unreadable: {e}")
+                continue
+            with ANALYTICS_DURATION.time(algorithm="projection_catch_up"):
+                return projection.catch_up(store)
+
+    with ANALYTICS_DURATION.time(algorithm="projection_load"):
+        return GraphProjection.load(store)
+
+
+def _save_snapshot(projection: GraphProjection, backend: str):
+    """Write a snapshot off the request path; one at a time per process"""
+    if not _snapshot_lock.acquire(blocking=False):
+        return
+
+    def work():
+        global _projection
+        try:
+            with ANALYTICS_DURATION.time(algorithm="projection_snapshot_save"):
+                path = projection.save(settings.PROJECTION_SNAPSHOT_DIR, backend)
+            prune_snapshots(settings.PROJECTION_SNAPSHOT_DIR, backend, settings.PROJECTION_SNAPSHOT_KEEP)
+            # Swap in the mapped copy so this process shares its pages too
+            mapped = GraphProjection.open(path)
+            with _projection_lock:
+                if _projection is projection:
+                    mapped.refreshed_at = projection.refreshed_at
+                    mapped.lineage = projection.lineage
+                    _projection = mapped
+        except Exception as e:
+            logger.warning(f"Projection snapshot not saved: {e}")
+        finally:
+            _snapshot_lock.release()
+
+    threading.Thread(target=work, name="projection-snapshot", daemon=True).start()
+
+
+def get_projection(store: GraphStore) -> GraphProjection:
+    """Return the cached projection, catching it up with new ingest when stale"""
+    global _projection, _projection_stale
+
+    with _projection_lock:
+        stale = (
+            _projection is None
+            or _projection_stale
+            or time.time() - _projection.refreshed_at > settings.PROJECTION_TTL_SECONDS
+        )
+        cache_lookup("projection", not stale)
+        if stale:
+            if _projection is None:
+                _projection = _cold_start(store)
+            else:
+                with ANALYTICS_DURATION.time(algorithm="projection_catch_up"):
+                    _projection = _projection.catch_up(store)
+            _projection_stale = False
+
+            pending = _projection.edge_count - (_projection.snapshot_edges or 0)
+            if settings.PROJECTION_SNAPSHOT_DIR and (
+                _projection.snapshot_edges is None or pending >= settings.PROJECTION_SNAPSHOT_MIN_DELTA
+            ):
+                _save_snapshot(_projection, store.backend)
+        return _projection
+
+
+def invalidate_projection():
+    """Mark the cached projection stale after the graph has been modified.
+
+    The next request catches it up with the new relationships instead of
+    reloading the whole graph.
+    """
+    global _projection_stale
+    with _projection_lock:
+        _projection_stale = True
+
+
+@register_collector
+def projection_metrics():
+    """Graph size from the cached projection; never triggers a load"""
+    projection = _projection
+    if projection is None:
+        return
+    nodes = np.bincount(projection.node_labels, minlength=len(LABELS))
+    edges = np.bincount(projection.rel, minlength=len(RELATIONS))
+    yield MetricFamily(
+        "synapsters_graph_nodes", "gauge", "Nodes in the in-memory projection by label",
+        [("", {"label": label}, int(count)) for label, count in zip(LABELS, nodes)],
+    )
+    yield MetricFamily(
+        "synapsters_graph_relationships", "gauge", "Relationships in the in-memory projection by type",
+        [("", {"relation": relation}, int(count)) for relation, count in zip(RELATIONS, edges)],
+    )
+    yield MetricFamily(
+        "synapsters_projection_age_seconds", "gauge", "Seconds since the projection was loaded",
+        [("", {}, time.time() - projection.built_at)],
+    )
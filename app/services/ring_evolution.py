@@ -0,0 +1,246 @@
+import numpy as np
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import logging
+from compute import check_deadline
+from models.schemas import RingEvent, RingEvolution, RingLineage, RingWindow
+from services.communities import label_propagation
+from services.projection import GraphProjection
+
+logger = logging.getLogger(__name__)
+
+# Longest series served in one request
+MAX_WINDOWS = 400
+
+# Members listed per ring; member_count is always exact
+MAX_LISTED_MEMBERS = 100
+
+
+class TooManyWindows(ValueError):
+    """The requested series would exceed ``MAX_WINDOWS``"""
+
+
+def iso(epoch: int) -> str:
+    return datetime.utcfromtimestamp(epoch).isoformat()
+
+
+class RingEvolutionTracker:
+    """Community detection over a series of time windows, with rings matched
+    between consecutive windows by member overlap.
+
+    Each window is cut from the projection's time-sorted edges, and its label
+    propagation starts from the previous window's labels, so a long series
+    costs little more than its first window. Matching uses exact Jaccard
+    similarity, computed for every pair of rings at once from the shared
+    members' (previous ring, current ring) pairs.
+    """
+
+    def __init__(self, projection: GraphProjection, relations: Tuple[str, ...] = ('MADE', 'SENT')):
+        self.projection = projection
+        self.mask = projection.edge_mask(list(relations))
+
+    def span(self) -> Optional[Tuple[int, int]]:
+        """First and last timestamp of the tracked relationships"""
+        edges = self.projection.time_window()
+        edges = edges[self.mask[edges]]
+        if len(edges) == 0:
+            return None
+        return int(self.projection.ts[edges[0]]), int(self.projection.ts[edges[-1]])
+
+    def _communities(
+        self,
+        lo: int,
+        hi: int,
+        previous: Optional[Tuple[np.ndarray, np.ndarray]]
+    ) -> Tuple[np.ndarray, np.ndarray, int]:
+        """Communities among the edges in [lo, hi].
+
+        Returns ``(nodes, community, edge_count)``: the sorted projection
+        nodes active in the window and a compact community id for each.
+        Labels carried over from ``previous`` are split into connected
+        pieces, so a ring that broke apart is not held together by its old
+        label.
+        """
+        # scipy.sparse is slow to import and only needed here
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.csgraph import connected_components
+
+        p = self.projection
+        edges = p.time_window(lo, hi)
+        edges = edges[self.mask[edges]]
+        nodes, ends = np.unique(np.concatenate([p.src[edges], p.dst[edges]]), return_inverse=True)
+        n = len(nodes)
+        if n == 0:
+            return nodes, np.zeros(0, dtype=np.int64), 0
+        src, dst = ends[:len(edges)], ends[len(edges):]
+
+        labels = None
+        if previous is not None and len(previous[0]):
+            prev_nodes, prev_community = previous
+            pos = np.minimum(np.searchsorted(prev_nodes, nodes), len(prev_nodes) - 1)
+            seen = prev_nodes[pos] == nodes
+            labels = np.where(seen, prev_community[pos], prev_community.max() + 1 + np.arange(n))
+
+        labels = label_propagation(n, src, dst, labels=labels)
+        adjacency = csr_matrix((np.ones(len(src), dtype=np.int8), (src, dst)), shape=(n, n))
+        _, pieces = connected_components(adjacency, directed=False)
+        community = np.unique(labels.astype(np.int64) * n + pieces, return_inverse=True)[1]
+        return nodes, community, len(edges)
+
+    @staticmethod
+    def _overlaps(
+        prev_nodes: np.ndarray,
+        prev_community: np.ndarray,
+        prev_sizes: np.ndarray,
+        nodes: np.ndarray,
+        community: np.ndarray,
+        sizes: np.ndarray,
+        min_size: int,
+        min_jaccard: float
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """``(previous ring, current ring, jaccard)`` for every matching pair of rings"""
+        _, i, j = np.intersect1d(prev_nodes, nodes, assume_unique=True, return_indices=True)
+        a, b = prev_community[i], community[j]
+        keep = (prev_sizes[a] >= min_size) & (sizes[b] >= min_size)
+        width = len(sizes)
+        pairs, shared = np.unique(a[keep] * width + b[keep], return_counts=True)
+        a, b = pairs // width, pairs % width
+        jaccard = shared / (prev_sizes[a] + sizes[b] - shared)
+        keep = jaccard >= min_jaccard
+        return a[keep], b[keep], jaccard[keep]
+
+    def track(
+        self,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        window: int = 30 * 86400,
+        step: Optional[int] = None,
+        min_size: int = 3,
+        min_jaccard: float = 0.3
+    ) -> RingEvolution:
+        """Rings in each ``window``-second period from ``since`` to ``until``
+        (epoch seconds; default the span of the data), one every ``step``
+        seconds, with their lineage.
+
+        A ring keeps its id into the next window when it and its successor
+        are each other's best match. Several predecessors make a merge,
+        several successors a split; rings without a match are born or die.
+        """
+        step = step or window
+        if since is None or until is None:
+            span = self.span()
+            if span is None:
+                return RingEvolution(windows=[], rings=[], events=[])
+            since = span[0] if since is None else since
+            until = span[1] if until is None else until
+        count = max(0, (until - since) // step + 1)
+        if count > MAX_WINDOWS:
+            raise TooManyWindows(f"{count} windows requested; at most {MAX_WINDOWS} per series")
+
+        p = self.projection
+        windows: List[RingWindow] = []
+        events: List[RingEvent] = []
+        lineages: Dict[str, dict] = {}
+        previous = None  # (nodes, community, sizes, ring ids) of the last window
+        next_id = 0
+
+        for start in range(since, since + count * step, step):
+            check_deadline()
+            stamp = iso(start)
+            nodes, community, edge_count = self._communities(
+                start, start + window - 1, previous[:2] if previous else None
+            )
+            sizes = np.bincount(community)
+            rings = np.flatnonzero(sizes >= min_size).tolist()
+            windows.append(RingWindow(
+                window_start=stamp, window_end=iso(start + window - 1),
+                edge_count=edge_count, ring_count=len(rings)
+            ))
+
+            predecessors, successors = defaultdict(list), defaultdict(list)
+            prev_ids: Dict[int, str] = {}
+            if previous is not None:
+                prev_nodes, prev_community, prev_sizes, prev_ids = previous
+                a, b, jaccard = self._overlaps(prev_nodes, prev_community, prev_sizes,
+                                               nodes, community, sizes, min_size, min_jaccard)
+                for a, b, jaccard in zip(a.tolist(), b.tolist(), jaccard.tolist()):
+                    predecessors[b].append((jaccard, a))
+                    successors[a].append((jaccard, b))
+
+            # Ids: kept on mutual best matches, fresh otherwise
+            ids: Dict[int, str] = {}
+            for b in rings:
+                if predecessors[b]:
+                    _, a = max(predecessors[b])
+                    if max(successors[a])[1] == b:
+                        ids[b] = prev_ids[a]
+                if b not in ids:
+                    ids[b] = f"ring_{next_id}"
+                    next_id += 1
+            inherited = {a: b for b in rings for _, a in predecessors[b] if ids[b] == prev_ids[a]}
+
+            for a, ring_id in prev_ids.items():
+                lineage = lineages[ring_id]
+                if not successors[a]:
+                    lineage['ended'] = stamp
+                    events.append(RingEvent(window_start=stamp, event_type="death", ring_id=ring_id,
+                                            member_count=0, previous_member_count=int(prev_sizes[a])))
+                    continue
+                if a not in inherited:
+                    lineage['ended'] = stamp
+                    lineage['merged_into'] = ids[max(successors[a])[1]]
+                if len(successors[a]) > 1:
+                    events.append(RingEvent(
+                        window_start=stamp, event_type="split", ring_id=ring_id,
+                        member_count=int(sizes[inherited[a]]) if a in inherited else 0,
+                        previous_member_count=int(prev_sizes[a]),
+                        related=[ids[b] for _, b in sorted(successors[a], reverse=True) if ids[b] != ring_id]
+                    ))
+
+            # Members of every community, grouped once
+            order = np.argsort(community, kind='stable')
+            offsets = np.concatenate([[0], np.cumsum(sizes)])
+            for b in rings:
+                ring_id, size = ids[b], int(sizes[b])
+                matches = sorted(predecessors[b], reverse=True)
+                best = matches[0] if matches else None
+                before = int(prev_sizes[best[1]]) if best and prev_ids[best[1]] == ring_id else None
+
+                if ring_id not in lineages:
+                    lineages[ring_id] = {
+                        'born': stamp, 'ended': None, 'merged_into': None, 'peak': 0,
+                        'split_from': prev_ids[best[1]] if len(matches) == 1 else None,
+                    }
+                if not matches:
+                    events.append(RingEvent(window_start=stamp, event_type="birth", ring_id=ring_id,
+                                            member_count=size))
+                elif len(matches) > 1:
+                    events.append(RingEvent(
+                        window_start=stamp, event_type="merge", ring_id=ring_id, member_count=size,
+                        previous_member_count=before, overlap=best[0],
+                        related=[prev_ids[a] for _, a in matches if prev_ids[a] != ring_id]
+                    ))
+                elif before is not None and size != before and len(successors[best[1]]) == 1:
+                    events.append(RingEvent(
+                        window_start=stamp, event_type="growth" if size > before else "shrink",
+                        ring_id=ring_id, member_count=size, previous_member_count=before, overlap=best[0]
+                    ))
+
+                lineage = lineages[ring_id]
+                members = nodes[order[offsets[b]:offsets[b] + min(size, MAX_LISTED_MEMBERS)]]
+                lineage.update(last_seen=stamp, size=size, peak=max(lineage['peak'], size),
+                               members=[p.node_ids[n] for n in members])
+
+            previous = (nodes, community, sizes, {b: ids[b] for b in rings})
+
+        rings = [
+            RingLineage(
+                ring_id=ring_id, born=l['born'], last_seen=l['last_seen'], ended=l['ended'],
+                split_from=l['split_from'], merged_into=l['merged_into'],
+                peak_member_count=l['peak'], member_count=l['size'], members=l['members']
+            )
+            for ring_id, l in lineages.items()
+        ]
+        logger.info(f"✓ Tracked {len(rings)} rings over {len(windows)} windows ({len(events)} events)")
+        return RingEvolution(windows=windows, rings=rings, events=events)
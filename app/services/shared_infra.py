@@ -0,0 +1,155 @@
+import numpy as np
+from typing import Dict, List
+import logging
+from compute import check_deadline
+from models.schemas import SharedInfraCluster, SharedInfraLink, SharedInfrastructure
+from services.projection import GraphProjection
+
+logger = logging.getLogger(__name__)
+
+# Listed per cluster; counts are always exact
+MAX_LISTED_MEMBERS = 200
+MAX_LISTED_INFRA = 50
+MAX_LISTED_LINKS = 25
+
+# Hubs reported back as skipped
+MAX_LISTED_HUBS = 20
+
+
+class SharedInfrastructureDetector:
+    """Phones tied together by shared handsets and IP addresses (SIM farms,
+    mule handsets passed around a crew).
+
+    Phone x Device comes from RUNS_ON and Phone x IP from RUNS_ON times
+    CONNECTS_VIA, both as sparse incidence matrices; their self-products
+    give every pair of phones that share infrastructure in one sparse
+    matrix multiplication. Devices and IPs used by more than
+    ``max_hub_phones`` phones (carrier NAT, public Wi-Fi) are dropped
+    first, which is what keeps the products sparse: each remaining
+    resource contributes at most ``max_hub_phones ** 2`` pairs.
+    """
+
+    def __init__(self, projection: GraphProjection):
+        self.projection = projection
+
+    def _incidence(self, relation: str):
+        """Binary ``node x node`` sparse matrix of one relationship type"""
+        from scipy.sparse import csr_matrix
+
+        p = self.projection
+        mask = p.edge_mask([relation])
+        matrix = csr_matrix(
+            (np.ones(int(mask.sum()), dtype=np.float32), (p.src[mask], p.dst[mask])),
+            shape=(p.node_count, p.node_count)
+        )
+        matrix.data[:] = 1  # parallel relationships count once
+        return matrix
+
+    def detect(
+        self,
+        max_hub_phones: int = 50,
+        min_weight: float = 0.0,
+        min_size: int = 2,
+        top_n: int = 100
+    ) -> SharedInfrastructure:
+        """Clusters of phones connected through shared devices or IPs.
+
+        A pair's weight sums ``1 / ln(1 + k)`` over the resources it shares,
+        where ``k`` is how many phones use the resource, so a handset two
+        phones share outweighs an IP twenty phones share.
+        """
+        # scipy.sparse is slow to import and only needed here
+        from scipy.sparse import csr_matrix, diags, triu
+        from scipy.sparse.csgraph import connected_components
+
+        p = self.projection
+        phone_device = self._incidence('RUNS_ON')
+        phone_ip = phone_device @ self._incidence('CONNECTS_VIA')
+        phone_ip.data[:] = 1
+
+        skipped: Dict[str, int] = {}
+        weight = shared_devices = shared_ips = None
+        for name, incidence in (('devices', phone_device), ('ips', phone_ip)):
+            check_deadline()
+            phones = np.asarray(incidence.sum(axis=0)).ravel()
+            hubs = np.flatnonzero(phones > max_hub_phones)
+            for r in hubs[np.argsort(-phones[hubs], kind='stable')][:MAX_LISTED_HUBS]:
+                skipped[p.node_ids[r]] = int(phones[r])
+            kept = (phones >= 2) & (phones <= max_hub_phones)
+
+            incidence = (incidence @ diags(kept.astype(np.float32))).tocsr()
+            incidence.eliminate_zeros()
+            scale = np.where(kept, 1.0 / np.log1p(np.maximum(phones, 1)), 0.0).astype(np.float32)
+            shared = triu(incidence @ incidence.T, k=1).tocsr()
+            scored = triu((incidence @ diags(scale)) @ incidence.T, k=1).tocsr()
+            weight = scored if weight is None else weight + scored
+            if name == 'devices':
+                phone_device, shared_devices = incidence, shared
+            else:
+                phone_ip, shared_ips = incidence, shared
+
+        links = weight.tocoo()
+        keep = links.data > min_weight
+        a, b, w = links.row[keep], links.col[keep], links.data[keep]
+        if len(a) == 0:
+            return SharedInfrastructure(clusters=[], phone_count=0, link_count=0, skipped_hubs=skipped)
+        device_counts = np.asarray(shared_devices[a, b]).ravel()
+        ip_counts = np.asarray(shared_ips[a, b]).ravel()
+
+        # Clusters are the connected components of the linked phones
+        n = p.node_count
+        linked = np.unique(np.concatenate([a, b]))
+        local = np.full(n, -1, dtype=np.int64)
+        local[linked] = np.arange(len(linked))
+        graph = csr_matrix((w, (local[a], local[b])), shape=(len(linked), len(linked)))
+        _, component = connected_components(graph, directed=False)
+        sizes = np.bincount(component)
+        totals = np.bincount(component[local[a]], weights=w, minlength=len(sizes))
+
+        eligible = np.flatnonzero(sizes >= min_size)
+        eligible = eligible[np.argsort(-totals[eligible], kind='stable')][:top_n]
+
+        order = np.argsort(component, kind='stable')
+        offsets = np.concatenate([[0], np.cumsum(sizes)])
+        link_component = component[local[a]]
+
+        clusters: List[SharedInfraCluster] = []
+        for rank, c in enumerate(eligible.tolist()):
+            check_deadline()
+            members = linked[order[offsets[c]:offsets[c + 1]]]
+
+            def shared_by(incidence) -> List[str]:
+                """Resources used by two or more of the members, most used first"""
+                used, counts = np.unique(incidence[members].indices, return_counts=True)
+                used = used[counts >= 2][np.argsort(-counts[counts >= 2], kind='stable')]
+                return [p.node_ids[r] for r in used[:MAX_LISTED_INFRA]]
+
+            inside = np.flatnonzero(link_component == c)
+            inside = inside[np.argsort(-w[inside], kind='stable')][:MAX_LISTED_LINKS]
+            clusters.append(SharedInfraCluster(
+                cluster_id=f"infra_{rank}",
+                member_count=len(members),
+                members=[p.node_ids[m] for m in members[:MAX_LISTED_MEMBERS]],
+                devices=shared_by(phone_device),
+                ips=shared_by(phone_ip),
+                weight=float(totals[c]),
+                links=[
+                    SharedInfraLink(
+                        phone_a=p.node_ids[a[j]],
+                        phone_b=p.node_ids[b[j]],
+                        weight=float(w[j]),
+                        shared_devices=int(device_counts[j]),
+                        shared_ips=int(ip_counts[j])
+                    )
+                    for j in inside.tolist()
+                ]
+            ))
+
+        logger.info(f"✓ Found {len(clusters)} shared-infrastructure clusters over {len(a)} phone links "
+                    f"({len(skipped)} hubs skipped)")
+        return SharedInfrastructure(
+            clusters=clusters,
+            phone_count=len(linked),
+            link_count=len(a),
+            skipped_hubs=skipped
+        )
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Interactive latency under a batch-analytics flood.
+
+A burst of --batch slow jobs (kingpins, fraud rings) is queued, and quick
+lookups (timeline, risk) keep arriving while it drains. Both run on
+--workers threads:
+
+- FIFO: a plain pool of that size, as run_in_threadpool did once the
+  CPU-bound work had saturated the cores
+- executor: the compute executor, with interactive jobs ahead of batch,
+  one worker reserved for them and the batch queue bounded
+
+Work is simulated with sleeps, so the numbers show queueing alone.
+
+Usage: python benchmarks/bench_admission.py [--workers 4] [--batch 16] [--lookups 50]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# The app is run from its own directory; settings need Neo4j vars to import
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+os.environ.setdefault("NEO4J_USER", "neo4j")
+os.environ.setdefault("NEO4J_PASSWORD", "unused")
+
+from compute import ComputeExecutor, ComputeRejected, Priority  # noqa: E402
+
+
+async def flood(submit_batch, submit_lookup, args):
+    loop = asyncio.get_running_loop()
+
+    async def lookup():
+        start = loop.time()
+        await submit_lookup()
+        return (loop.time() - start) * 1000
+
+    batch = [asyncio.ensure_future(submit_batch()) for _ in range(args.batch)]
+    await asyncio.sleep(0.01)
+
+    # Lookups keep arriving while the flood drains, one every --interval-ms
+    lookups = []
+    for _ in range(args.lookups):
+        lookups.append(asyncio.ensure_future(lookup()))
+        await asyncio.sleep(args.interval_ms / 1000)
+
+    latencies = await asyncio.gather(*lookups)
+    results = await asyncio.gather(*batch, return_exceptions=True)
+    return list(latencies), sum(isinstance(r, ComputeRejected) for r in results)
+
+
+def report(name, latencies, rejected):
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"   {name:<10} lookup p50 {statistics.median(latencies):8.1f} ms   "
+          f"p95 {p95:8.1f} ms   batch rejected {rejected}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--lookups", type=int, default=50)
+    parser.add_argument("--batch-ms", type=float, default=500.0)
+    parser.add_argument("--lookup-ms", type=float, default=5.0)
+    parser.add_argument("--interval-ms", type=float, default=40.0)
+    args = parser.parse_args()
+
+    batch_job = lambda: time.sleep(args.batch_ms / 1000)  # noqa: E731
+    lookup_job = lambda: time.sleep(args.lookup_ms / 1000)  # noqa: E731
+
+    print(f"⏱  {args.batch} batch jobs of {args.batch_ms:.0f} ms, {args.lookups} lookups of "
+          f"{args.lookup_ms:.0f} ms every {args.interval_ms:.0f} ms, {args.workers} workers")
+
+    pool = ThreadPoolExecutor(args.workers)
+
+    async def fifo():
+        loop = asyncio.get_running_loop()
+        return await flood(
+            lambda: loop.run_in_executor(pool, batch_job),
+            lambda: loop.run_in_executor(pool, lookup_job),
+            args,
+        )
+
+    report("FIFO", *asyncio.run(fifo()))
+    pool.shutdown()
+
+    executor = ComputeExecutor(
+        workers=args.workers,
+        reserved_interactive=1,
+        queue_limits={Priority.INTERACTIVE: 64, Priority.BATCH: args.workers},
+        budgets={Priority.INTERACTIVE: 60.0, Priority.BATCH: 600.0},
+    )
+    executor.start()
+
+    async def prioritised():
+        return await flood(
+            lambda: executor.run(Priority.BATCH, batch_job),
+            lambda: executor.run(Priority.INTERACTIVE, lookup_job),
+            args,
+        )
+
+    report("executor", *asyncio.run(prioritised()))
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Compare the JSON and columnar binary encodings of a graph snapshot:
+payload bytes (raw and gzipped), server encode time and decode time.
+
+The decode timed here is a NumPy reader with the same steps as the
+frontend's decodeGraphColumnar (typed-array views plus one string split),
+against json.loads for JSON.
+
+Usage: python benchmarks/bench_columnar.py [--edges 1000 10000 100000]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+# The app is run from its own directory; settings need Neo4j vars to import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+sys.path.insert(0, os.path.dirname(__file__))
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+os.environ.setdefault("NEO4J_USER", "neo4j")
+os.environ.setdefault("NEO4J_PASSWORD", "unused")
+
+from bench_serialization import FakeDB, synthetic_rows  # noqa: E402
+from database.graph import Neo4jStore  # noqa: E402
+from responses import FastJSONResponse, encode_graph_columnar  # noqa: E402
+from services.intelligence import IntelligenceEngine  # noqa: E402
+
+
+def decode_columnar(payload: bytes) -> dict:
+    """Reference reader for the columnar layout"""
+    assert payload[:4] == b"RSG1"
+    (header_length,) = struct.unpack("<I", payload[4:8])
+    header = json.loads(payload[8:8 + header_length])
+    base = 8 + header_length
+    columns = {}
+    for c in header["columns"]:
+        raw = payload[base + c["offset"]:base + c["offset"] + c["length"]]
+        if c["dtype"] == "utf8":
+            text = raw.decode("utf-8")
+            columns[c["name"]] = text.split("\0") if text else []
+        else:
+            columns[c["name"]] = np.frombuffer(raw, dtype=np.dtype(c["dtype"]).newbyteorder("<"))
+    return {"header": header, "columns": columns}
+
+
+def best_of(fn, repeat=7):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--edges", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    rows = synthetic_rows(max(args.edges))
+    engine = IntelligenceEngine(Neo4jStore(FakeDB(rows)))
+
+    for edges in args.edges:
+        snapshot = engine.get_graph_snapshot(limit=edges)
+        as_json = FastJSONResponse(snapshot).body
+        as_columns = encode_graph_columnar(snapshot)
+
+        # Round trip: endpoints and weights survive the encoding
+        decoded = decode_columnar(as_columns)["columns"]
+        ids = decoded["node_id"]
+        assert [ids[i] for i in decoded["edge_source"][:100]] == [e["source"] for e in snapshot["edges"][:100]]
+        assert np.allclose(decoded["edge_weight"], [e["weight"] for e in snapshot["edges"]], rtol=1e-6)
+
+        print(f"\n📦 {len(snapshot['nodes'])} nodes, {len(snapshot['edges'])} relationships")
+        for name, payload, encode, decode in [
+            ("json", as_json, lambda: FastJSONResponse(snapshot).body, lambda: json.loads(as_json)),
+            ("columnar", as_columns, lambda: encode_graph_columnar(snapshot), lambda: decode_columnar(as_columns)),
+        ]:
+            print(f"   {name:<9} {len(payload) / 1024:9.1f} KiB   gzip {len(gzip.compress(payload, 6)) / 1024:8.1f} KiB   "
+                  f"encode {best_of(encode):7.2f} ms   decode {best_of(decode):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark: throughput of the API as the number of concurrent
+clients grows.
+
+By default the app runs in-process against stand-in databases that take
+--latency-ms per query: a blocking one for the engine (like the sync
+driver) and an awaitable one for the system routes (like the async
+driver). The same timeline work is also served by a route that calls the
+engine on the event loop, the way routes did before, for comparison.
+
+Pass --url to load a running deployment instead.
+
+Usage: python benchmarks/bench_concurrency.py [--clients 1 4 16 64] [--url http://localhost:8000 --entity +919800000001]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+# The app is run from its own directory; settings need Neo4j vars to import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+os.environ.setdefault("NEO4J_USER", "neo4j")
+os.environ.setdefault("NEO4J_PASSWORD", "unused")
+
+
+class BlockingDB:
+    """Sync stand-in: each query blocks its thread, like the sync driver"""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def execute_read(self, query, params=None, name=None):
+        time.sleep(self.latency)
+        return [{"timestamp": "2024-01-01T00:00:00", "event_type": "CALL",
+                 "from_entity": "+919800000001", "to_entity": "+919800000002", "details": {}}]
+
+
+class AwaitableDB:
+    """Async stand-in: each query yields to the event loop, like the async driver"""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    async def execute_read(self, query, params=None, name=None):
+        await asyncio.sleep(self.latency)
+        return [{"status": 1}]
+
+
+def in_process_app(latency):
+    import main
+    import routes.intelligence as intelligence
+    import routes.system as system
+    from database.graph import Neo4jStore
+    from services.intelligence import IntelligenceEngine
+
+    blocking, awaitable = BlockingDB(latency), AwaitableDB(latency)
+    store = Neo4jStore(blocking)
+    intelligence.get_store = lambda: store
+
+    async def get_async_db():
+        return awaitable
+    system.get_async_db = get_async_db
+
+    # The previous pattern: sync engine call straight on the event loop
+    @main.app.get("/bench/timeline-on-loop/{entity_id}")
+    async def timeline_on_loop(entity_id: str):
+        return IntelligenceEngine(store).get_timeline(entity_id)
+
+    return main.app
+
+
+async def run(client, path, clients, requests):
+    latencies = []
+
+    async def worker(count):
+        for _ in range(count):
+            start = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(requests // clients) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return len(latencies) / elapsed, latencies[len(latencies) // 2] * 1000, latencies[int(len(latencies) * 0.99)] * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--entity", default="+919800000001", help="Entity for timeline requests")
+    args = parser.parse_args()
+
+    paths = {
+        "timeline (threadpool)": f"/api/v1/intelligence/timeline/{args.entity}",
+        "health (async driver)": "/api/v1/system/health",
+    }
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+        print(f"📦 {args.url}")
+    else:
+        app = in_process_app(args.latency_ms / 1000)
+        client = httpx.AsyncClient(app=app, base_url="http://bench", timeout=60)
+        paths["timeline (on event loop)"] = f"/bench/timeline-on-loop/{args.entity}"
+        print(f"📦 in-process app, {args.latency_ms:.0f} ms per query")
+
+    async with client:
+        for name, path in paths.items():
+            print(f"\n   {name}")
+            for clients in args.clients:
+                throughput, p50, p99 = await run(client, path, clients, max(args.requests, clients))
+                print(f"   {clients:>4} clients: {throughput:8.1f} req/s   p50 {p50:7.1f} ms   p99 {p99:7.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark graph snapshot serialization: Pydantic models through
+``response_model`` (the previous path) against plain dicts encoded by
+FastJSONResponse, with and without response compression.
+
+Reports p50/p99 latency and bytes sent per request.
+
+Usage: python benchmarks/bench_serialization.py [--edges 1000 10000] [--requests N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# The app is run from its own directory; settings need Neo4j vars to import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+os.environ.setdefault("NEO4J_USER", "neo4j")
+os.environ.setdefault("NEO4J_PASSWORD", "unused")
+
+from fastapi import FastAPI, Query  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from database.graph import Neo4jStore  # noqa: E402
+from models.schemas import GraphSnapshot  # noqa: E402
+from responses import CompressionMiddleware, FastJSONResponse, brotli, orjson  # noqa: E402
+from services.intelligence import IntelligenceEngine  # noqa: E402
+
+
+class FakeDB:
+    """Returns synthetic snapshot rows shaped like the Neo4j query result"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute_read(self, query, params=None, name=None):
+        return self.rows[:params["limit"]]
+
+
+def synthetic_rows(count, seed=11):
+    rng = np.random.default_rng(seed)
+    nodes = max(50, count // 3)
+    t0 = datetime(2024, 1, 1)
+    rows = []
+    for i in range(count):
+        u, v = (int(x) for x in rng.integers(0, nodes, 2))
+        money = i % 3 == 0
+        rows.append({
+            "source_id": u,
+            "target_id": v,
+            "source_label": "BankAccount" if money else "Phone",
+            "target_label": "BankAccount" if money else "Phone",
+            "source_entity": f"ACC{u:08d}" if money else f"+9198{u:08d}",
+            "target_entity": f"ACC{v:08d}" if money else f"+9198{v:08d}",
+            "relation": "SENT" if money else "MADE",
+            "amount": float(rng.uniform(100, 50_000)) if money else None,
+            "duration": None if money else int(rng.integers(5, 900)),
+            "timestamp": t0 + timedelta(seconds=int(rng.integers(0, 90 * 86400))),
+        })
+    return rows
+
+
+def build_app(rows, compress):
+    engine = IntelligenceEngine(Neo4jStore(FakeDB(rows)))
+    app = FastAPI()
+    if compress:
+        app.add_middleware(CompressionMiddleware, minimum_size=1024, level=6)
+
+    @app.get("/model", response_model=GraphSnapshot)
+    def model_path(limit: int = Query(...)):
+        return GraphSnapshot(**engine.get_graph_snapshot(limit=limit))
+
+    @app.get("/fast", response_model=GraphSnapshot)
+    def fast_path(limit: int = Query(...)):
+        return FastJSONResponse(engine.get_graph_snapshot(limit=limit))
+
+    return app
+
+
+def measure(client, path, limit, encoding, requests):
+    headers = {"Accept-Encoding": encoding}
+    client.get(path, params={"limit": limit}, headers=headers)  # warm-up
+    latencies, sent = [], 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get(path, params={"limit": limit}, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        sent = int(response.headers.get("content-length", len(response.content)))
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    return p50, p99, sent
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--edges", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"📦 orjson: {'yes' if orjson else 'no'}, brotli: {'yes' if brotli else 'no'}")
+    rows = synthetic_rows(max(args.edges))
+    encodings = ["identity", "gzip"] + (["br"] if brotli else [])
+
+    plain = TestClient(build_app(rows, compress=False))
+    compressed = TestClient(build_app(rows, compress=True))
+
+    for edges in args.edges:
+        print(f"\n   {edges} relationships")
+        for path in ("/model", "/fast"):
+            for encoding in encodings:
+                client = plain if encoding == "identity" else compressed
+                p50, p99, sent = measure(client, path, edges, encoding, args.requests)
+                print(f"   {path:<7} {encoding:<9} p50 {p50:7.1f} ms   p99 {p99:7.1f} ms   {sent / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Behaviour index: full build, query latency, and an incremental update
+after a catch-up, on a synthetic projection of phones and accounts.
+
+Usage: python benchmarks/bench_similarity.py [--entities 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+os.environ.setdefault("NEO4J_USER", "neo4j")
+os.environ.setdefault("NEO4J_PASSWORD", "unused")
+
+from services.behavior import BehaviorIndex  # noqa: E402
+from services.projection import GraphProjection, LABELS, RELATIONS  # noqa: E402
+
+
+def synthetic(entities, edges, seed=11):
+    """Phones calling phones and accounts paying accounts, over 90 days"""
+    rng = np.random.default_rng(seed)
+    half = entities // 2
+    money = rng.random(edges) < 0.3
+    offset = np.where(money, half, 0)
+    src = (rng.integers(0, half, edges) + offset).astype(np.int32)
+    dst = (rng.integers(0, half, edges) + offset).astype(np.int32)
+    rel = np.where(money, RELATIONS.index('SENT'), RELATIONS.index('MADE')).astype(np.int8)
+    ts = 1_700_000_000 + rng.integers(0, 90 * 86400, edges)
+    amount = np.where(money, rng.lognormal(8, 1.5, edges), np.nan)
+    duration = np.where(money, np.nan, rng.exponential(180, edges))
+    labels = np.where(np.arange(entities) < half, LABELS.index('Phone'), LABELS.index('BankAccount')).astype(np.int8)
+    ids = [f"E{i:09d}" for i in range(entities)]
+    return ids, labels, src, dst, rel, ts, amount, duration
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entities", type=int, default=1_000_000)
+    parser.add_argument("--edges-per-entity", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    ids, labels, src, dst, rel, ts, amount, duration = synthetic(
+        args.entities, args.entities * args.edges_per_entity
+    )
+    print(f"📦 {args.entities} entities, {len(src)} relationships")
+
+    # Hold the last 1% of edges back for the incremental update
+    cut = int(len(src) * 0.99)
+    base = GraphProjection(ids, labels, src[:cut], dst[:cut], rel[:cut], ts[:cut], amount[:cut], duration[:cut])
+    grown = GraphProjection(ids, labels, src, dst, rel, ts, amount, duration, index=base.index)
+    grown.lineage = base.lineage
+
+    index = BehaviorIndex()
+    start = time.perf_counter()
+    index.refresh(base)
+    print(f"   build          {time.perf_counter() - start:8.2f} s")
+
+    rng = np.random.default_rng(3)
+    latencies = []
+    for node in rng.integers(0, args.entities, args.queries):
+        start = time.perf_counter()
+        index.nearest(int(node), 10)
+        latencies.append((time.perf_counter() - start) * 1000)
+    print(f"   query          {np.median(latencies):8.2f} ms median, {np.percentile(latencies, 99):.2f} ms p99 (top 10)")
+
+    start = time.perf_counter()
+    index.refresh(grown)
+    print(f"   update         {time.perf_counter() - start:8.2f} s   ({len(src) - cut} new edges)")
+
+
+if __name__ == "__main__":
+    main()
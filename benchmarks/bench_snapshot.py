@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Projection start-up time: a full pull from the graph store versus opening a
+memory-mapped snapshot of the same projection and catching up with an
+empty delta.
+
+Usage: python benchmarks/bench_snapshot.py [--edges 500000]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+sys.path.insert(0, os.path.dirname(__file__))
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+os.environ.setdefault("NEO4J_USER", "neo4j")
+os.environ.setdefault("NEO4J_PASSWORD", "unused")
+
+from bench_streaming import StreamingDB  # noqa: E402
+from database.graph import Neo4jStore  # noqa: E402
+from services.projection import GraphProjection  # noqa: E402
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--edges", type=int, default=500_000)
+    args = parser.parse_args()
+
+    store = Neo4jStore(StreamingDB(args.edges))
+    directory = tempfile.mkdtemp(prefix="bench-snapshot-")
+    try:
+        print(f"📦 {args.edges} relationships")
+        loaded, load_s = timed(lambda: GraphProjection.load(store))
+        print(f"   full load      {load_s:8.2f} s")
+
+        path, save_s = timed(lambda: loaded.save(directory, store.backend))
+        size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+        print(f"   snapshot save  {save_s:8.2f} s   ({size / 2**20:.1f} MiB on disk)")
+
+        opened, open_s = timed(lambda: GraphProjection.open(path).catch_up(store))
+        print(f"   snapshot open  {open_s:8.2f} s   ({opened.node_count} nodes, {opened.edge_count} edges)")
+        print(f"   speedup        {load_s / open_s:8.1f}x")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark.
+
+1. Time to ``import main`` in a fresh interpreter, with networkx, scipy and
+   pandas deferred to first use (now) and preloaded (as before).
+2. Schema initialisation against a stand-in connection that takes
+   --latency-ms per statement: the previous unconditional DDL and
+   timestamp migrations, a first run of the migration ledger, and a
+   restart with the ledger already current.
+
+Usage: python benchmarks/bench_startup.py [--runs 5] [--latency-ms 20]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+
+# The app is run from its own directory; settings need Neo4j vars to import
+sys.path.insert(0, APP_DIR)
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+os.environ.setdefault("NEO4J_USER", "neo4j")
+os.environ.setdefault("NEO4J_PASSWORD", "unused")
+
+from database.graph import Neo4jConnection  # noqa: E402
+from database.migrations import migrate  # noqa: E402
+
+IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+{preload}
+import main
+print(time.perf_counter() - start, ",".join(m for m in ("networkx", "scipy", "pandas") if m in sys.modules))
+"""
+
+
+def import_time(preload: str, runs: int):
+    timings, loaded = [], ""
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_SCRIPT.format(preload=preload)],
+            cwd=APP_DIR, capture_output=True, text=True, check=True,
+        ).stdout.split()
+        timings.append(float(out[0]))
+        loaded = out[1] if len(out) > 1 else "-"
+    return statistics.median(timings) * 1000, loaded
+
+
+class LatencyConnection(Neo4jConnection):
+    """Neo4jConnection whose statements only cost a fixed round trip"""
+
+    def __init__(self, latency):
+        super().__init__("bolt://unused", "neo4j", "unused", "neo4j")
+        self.latency = latency
+        self.statements = 0
+        self.schema = {}
+
+    def _round_trip(self):
+        self.statements += 1
+        time.sleep(self.latency)
+
+    def execute_query(self, query, params=None, name=None):
+        self._round_trip()
+        return []
+
+    def execute_read(self, query, params=None, name=None):
+        self._round_trip()
+        return [{"version": self.schema.get("version", 0)}]
+
+    def execute_write(self, query, params=None, name=None):
+        self._round_trip()
+        self.schema["version"] = params["version"]
+        return []
+
+
+def timed(db, run):
+    db.statements = 0
+    start = time.perf_counter()
+    run()
+    return (time.perf_counter() - start) * 1000, db.statements
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    print("📦 import main (median of fresh interpreters)")
+    for name, preload in [
+        ("lazy (now)", ""),
+        ("eager (before)", "import networkx, scipy.sparse.csgraph, pandas"),
+    ]:
+        ms, loaded = import_time(preload, args.runs)
+        print(f"   {name:<16} {ms:8.1f} ms   heavy modules loaded: {loaded}")
+
+    print(f"\n📦 schema initialisation, {args.latency_ms:.0f} ms per statement")
+    db = LatencyConnection(args.latency_ms / 1000)
+    for name, run in [
+        ("unconditional DDL (before)", lambda: (db.create_indexes(), db.migrate_timestamps())),
+        ("ledger, fresh database", lambda: migrate(db)),
+        ("ledger, restart", lambda: migrate(db)),
+    ]:
+        ms, statements = timed(db, run)
+        print(f"   {name:<27} {ms:8.1f} ms   {statements:3d} statements")
+
+
+if __name__ == "__main__":
+    main()
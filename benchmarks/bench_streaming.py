@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Peak memory and time of building the graph projection from a materialised
+list of dicts (the previous loader) versus the streaming tuple loader.
+
+The stand-in connection produces real neo4j.Record objects lazily, the
+way a driver result does, so only the loader's own allocations differ.
+
+Usage: python benchmarks/bench_streaming.py [--edges 500000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from neo4j import Record
+
+# The app is run from its own directory; settings need Neo4j vars to import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+os.environ.setdefault("NEO4J_USER", "neo4j")
+os.environ.setdefault("NEO4J_PASSWORD", "unused")
+
+from database.graph import Neo4jStore  # noqa: E402
+from services.projection import GraphProjection, LABELS, RELATIONS, NO_TIME  # noqa: E402
+
+KEYS = ["source", "target", "source_label", "target_label", "relation", "ts", "amount", "duration"]
+
+
+class StreamingDB:
+    """Yields records one by one, like a driver result"""
+
+    def __init__(self, edges, seed=5):
+        self.edges = edges
+        self.seed = seed
+
+    def _records(self):
+        rng = np.random.default_rng(self.seed)
+        nodes = self.edges // 4
+        for start in range(0, self.edges, 10_000):
+            count = min(10_000, self.edges - start)
+            u, v = rng.integers(0, nodes, count), rng.integers(0, nodes, count)
+            money = rng.random(count) < 0.3
+            ts = 1_700_000_000 + rng.integers(0, 90 * 86400, count)
+            value = rng.uniform(100, 50_000, count)
+            for i in range(count):
+                if money[i]:
+                    row = (f"ACC{u[i]:08d}", f"ACC{v[i]:08d}", "BankAccount", "BankAccount",
+                           "SENT", int(ts[i]), float(value[i]), None)
+                else:
+                    row = (f"+9198{u[i]:08d}", f"+9198{v[i]:08d}", "Phone", "Phone",
+                           "MADE", int(ts[i]), None, float(value[i] % 900))
+                yield Record(zip(KEYS, row))
+
+    def graph_version(self):
+        return 0
+
+    def execute_query(self, query, params=None):
+        return [record.data() for record in self._records()]
+
+    def stream_query(self, query, params=None, fetch_size=None, as_tuples=False, name=None):
+        for record in self._records():
+            yield record if as_tuples else record.data()
+
+
+def load_materialised(db):
+    """The previous loader: every row as a dict, then arrays sized from the list"""
+    records = db.execute_query("")
+    index, node_ids, node_labels = {}, [], []
+    n = len(records)
+    src, dst = np.empty(n, dtype=np.int32), np.empty(n, dtype=np.int32)
+    rel = np.empty(n, dtype=np.int8)
+    ts = np.full(n, NO_TIME, dtype=np.int64)
+    amount, duration = np.full(n, np.nan), np.full(n, np.nan)
+
+    def intern(entity, label):
+        node = index.get(entity)
+        if node is None:
+            node = index[entity] = len(node_ids)
+            node_ids.append(entity)
+            node_labels.append(LABELS.index(label) if label in LABELS else len(LABELS) - 1)
+        return node
+
+    for i, record in enumerate(records):
+        src[i] = intern(record['source'], record.get('source_label'))
+        dst[i] = intern(record['target'], record.get('target_label'))
+        rel[i] = RELATIONS.index(record['relation'])
+        if record.get('ts') is not None:
+            ts[i] = record['ts']
+        if record.get('amount') is not None:
+            amount[i] = record['amount']
+        if record.get('duration') is not None:
+            duration[i] = record['duration']
+    return GraphProjection(node_ids, np.asarray(node_labels, dtype=np.int8), src, dst, rel, ts, amount, duration)
+
+
+def measure(name, build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    projection = build()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"   {name:<13} peak {peak / 2**20:8.1f} MiB   {elapsed:6.2f} s traced   "
+          f"({projection.node_count} nodes, {projection.edge_count} edges)")
+    return projection
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--edges", type=int, default=500_000)
+    args = parser.parse_args()
+
+    db = StreamingDB(args.edges)
+    print(f"📦 {args.edges} relationships")
+    old = measure("materialised", lambda: load_materialised(db))
+    new = measure("streaming", lambda: GraphProjection.load(Neo4jStore(db)))
+    assert np.array_equal(old.src, new.src) and np.array_equal(old.ts, new.ts)
+    assert np.allclose(old.amount, new.amount, equal_nan=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Shared fixtures for the test suite.
+
+Tests run against the embedded graph store, so no Neo4j server is needed:
+``python -m pytest -q`` from the repository root.
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+os.environ["GRAPH_BACKEND"] = "embedded"
+os.environ["EMBEDDED_DB_PATH"] = ":memory:"
+os.environ["PROJECTION_SNAPSHOT_DIR"] = ""
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "app"))
+
+import pytest  # noqa: E402
+
+# Smoke script against a running server; run it directly
+collect_ignore = ["test_backend.py"]
+
+
+def reset_caches():
+    """Drop the process-wide projection, stats cache and case workspaces between tests"""
+    from services import projection
+    from services.cases import case_store
+    from services.graph_stats import graph_stats_cache
+
+    graph_stats_cache.invalidate()
+    projection._projection = None
+    projection._projection_stale = False
+    for case in case_store.all():
+        case_store.remove(case.case_id)
+
+
+@pytest.fixture
+def store():
+    """A fresh in-memory embedded store"""
+    from database.embedded import EmbeddedStore
+
+    reset_caches()
+    store = EmbeddedStore(":memory:")
+    yield store
+    store.close()
+    reset_caches()
+
+
+@pytest.fixture
+def graph():
+    """Build a ``GraphProjection`` from
+    ``(source, target, source_label, target_label, relation, epoch_seconds, amount, duration)`` rows"""
+    from services.projection import GraphProjection, _collect
+
+    def build(rows):
+        index, node_ids, *columns = _collect(rows, {}, 0)
+        return GraphProjection(node_ids, *columns, index=index)
+
+    return build
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """API client on a fresh embedded store, with the shared caches reset"""
+    from fastapi.testclient import TestClient
+    from config import settings
+    from database import store as store_module
+    import main
+
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    store_module.close_store()
+    reset_caches()
+
+    with TestClient(main.app) as client:
+        assert client.get("/api/v1/system/health").status_code == 200
+        store_module.get_store()
+        yield client
+
+    store_module.close_store()
+    reset_caches()
+
+
+@pytest.fixture
+def upload(client, tmp_path):
+    """Upload CSV rows through the data endpoint: ``upload("calls", header, rows)``"""
+
+    def send(file_type, header, rows):
+        path = tmp_path / f"{file_type}.csv"
+        path.write_text("\n".join([header, *(",".join(map(str, row)) for row in rows)]) + "\n")
+        with open(path, "rb") as f:
+            response = client.post("/api/v1/data/upload", params={"file_type": file_type},
+                                   files={"file": (path.name, f)})
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    return send
+
+
+# ------------------------------------------------------------------
+# Neo4j driver stand-in
+# ------------------------------------------------------------------
+
+class FakeResult:
+    def __init__(self, rows):
+        from neo4j import Record
+
+        self.rows = rows
+        self.records = [Record(row) for row in rows]
+        self.summary = SimpleNamespace(result_available_after=1, result_consumed_after=2, profile=None)
+
+    def keys(self):
+        return list(self.rows[0]) if self.rows else []
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def consume(self):
+        return self.summary
+
+
+class AsyncFakeResult(FakeResult):
+    async def __aiter__(self):
+        for record in self.records:
+            yield record
+
+    async def consume(self):
+        return self.summary
+
+
+class FakeSession:
+    def __init__(self, driver, config):
+        self.driver = driver
+        self.config = config
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, params=None):
+        from neo4j.exceptions import TransientError
+
+        self.driver.runs.append((query, params, self.config))
+        if self.driver.transient_failures:
+            self.driver.transient_failures -= 1
+            raise TransientError("deadlock detected")
+        return self.driver.result_type(self.driver.respond(query, params or {}))
+
+    def _retry(self, work):
+        """Managed transactions retry transient errors, as the driver does"""
+        from neo4j.exceptions import TransientError
+
+        while True:
+            try:
+                return work(self)
+            except TransientError:
+                continue
+
+    execute_read = execute_write = _retry
+
+
+class AsyncFakeSession(FakeSession):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query, params=None):
+        return FakeSession.run(self, query, params)
+
+    async def _retry(self, work):
+        from neo4j.exceptions import TransientError
+
+        while True:
+            try:
+                return await work(self)
+            except TransientError:
+                continue
+
+    execute_read = execute_write = _retry
+
+
+class FakeDriver:
+    """Records every run; ``respond(query, params)`` gives each query's rows"""
+
+    def __init__(self, respond=None, asynchronous=False):
+        self.respond = respond or (lambda query, params: [])
+        self.asynchronous = asynchronous
+        self.result_type = AsyncFakeResult if asynchronous else FakeResult
+        self.runs = []
+        self.transient_failures = 0
+
+    def session(self, **config):
+        return (AsyncFakeSession if self.asynchronous else FakeSession)(self, config)
+
+
+@pytest.fixture
+def neo4j_connection():
+    """Neo4j connections on a ``FakeDriver``: ``connect(respond, asynchronous=False)``"""
+    from database.graph import AsyncNeo4jConnection, Neo4jConnection
+    from database.instrumentation import query_recorder
+
+    def connect(respond=None, asynchronous=False):
+        cls = AsyncNeo4jConnection if asynchronous else Neo4jConnection
+        connection = cls("bolt://fake:7687", "neo4j", "secret", "neo4j")
+        connection.driver = FakeDriver(respond, asynchronous)
+        return connection
+
+    query_recorder.reset()
+    yield connect
+    query_recorder.reset()
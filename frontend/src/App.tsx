@@ -1,12 +1,12 @@
 import { useEffect, useState } from "react";
 import {
-  fetchGraphSnapshot,
+  fetchGraphColumnar,
   fetchGraphStats,
   fetchFraudRings,
   fetchKingpins,
 } from "./api/client";
+import type { ColumnarGraph } from "./api/columnar";
 import type {
-  GraphSnapshot,
   GraphStats,
   FraudRing,
   Kingpin,
@@ -20,7 +20,7 @@ import UploadPanel from "./components/UploadPanel";
 
 function App() {
   const [stats, setStats] = useState<GraphStats | undefined>();
-  const [snapshot, setSnapshot] = useState<GraphSnapshot | undefined>();
+  const [graph, setGraph] = useState<ColumnarGraph | undefined>();
   const [rings, setRings] = useState<FraudRing[] | undefined>();
   const [kingpins, setKingpins] = useState<Kingpin[] | undefined>();
   const [loading, setLoading] = useState(false);
@@ -32,12 +32,12 @@ function App() {
     try {
       const [s, g, r, k] = await Promise.all([
         fetchGraphStats(),
-        fetchGraphSnapshot(),
+        fetchGraphColumnar(),
         fetchFraudRings(),
         fetchKingpins(),
       ]);
       setStats(s);
-      setSnapshot(g);
+      setGraph(g);
       setRings(r);
       setKingpins(k);
     } catch (err: any) {
@@ -82,7 +82,7 @@ function App() {
         <UploadPanel onUploaded={hydrate} />
 
         <div className="grid grid-cols-1 xl:grid-cols-3 gap-6">
-          <GraphView snapshot={snapshot} />
+          <GraphView graph={graph} />
           <div className="space-y-6">
             <KingpinPanel data={kingpins} />
             <FraudRingPanel data={rings} />
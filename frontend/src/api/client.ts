@@ -1,6 +1,7 @@
 import axios from "axios";
 import type {
   GraphSnapshot,
+  EgoNetwork,
   GraphStats,
   FraudRing,
   Kingpin,
@@ -8,6 +9,11 @@ import type {
   RiskAssessment,
   AnomalyDetection,
 } from "./types";
+import {
+  GRAPH_COLUMNAR_MEDIA_TYPE,
+  decodeGraphColumnar,
+  type ColumnarGraph,
+} from "./columnar";
 
 const api = axios.create({
   baseURL: import.meta.env.VITE_ENV==="dev"? "http://localhost:8000":import.meta.env.VITE_API_BASE,
@@ -24,6 +30,35 @@ export async function fetchGraphSnapshot(limit = 400): Promise<GraphSnapshot> {
   return data;
 }
 
+export async function fetchGraphColumnar(limit = 400): Promise<ColumnarGraph> {
+  // Columnar binary: a fraction of the JSON payload, decoded as typed-array views
+  const { data } = await api.get<ArrayBuffer>("/api/v1/intelligence/graph", {
+    params: { limit },
+    headers: { Accept: GRAPH_COLUMNAR_MEDIA_TYPE },
+    responseType: "arraybuffer",
+  });
+  return decodeGraphColumnar(data);
+}
+
+export async function fetchGraphLod(communityId?: string): Promise<GraphSnapshot> {
+  const { data } = await api.get<GraphSnapshot>("/api/v1/intelligence/graph/lod", {
+    params: communityId ? { community_id: communityId } : {},
+  });
+  return data;
+}
+
+export async function fetchEgoNetwork(
+  entityId: string,
+  hops = 2,
+  relations?: string[]
+): Promise<EgoNetwork> {
+  const { data } = await api.get<EgoNetwork>(
+    `/api/v1/intelligence/ego/${encodeURIComponent(entityId)}`,
+    { params: { hops, relations }, paramsSerializer: { indexes: null } }
+  );
+  return data;
+}
+
 export async function fetchFraudRings(): Promise<FraudRing[]> {
   const { data } = await api.get<FraudRing[]>("/api/v1/intelligence/clusters");
   return data;
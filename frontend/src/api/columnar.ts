@@ -0,0 +1,128 @@
+import type { GraphEdge, GraphNode, GraphSnapshot, RiskLevel } from "./types";
+
+export const GRAPH_COLUMNAR_MEDIA_TYPE = "application/vnd.synapsters.graph-columnar";
+
+const MAGIC = "RSG1";
+const NO_RISK = 255;
+
+interface ColumnSpec {
+  name: string;
+  dtype: "utf8" | "uint8" | "int32" | "float32" | "float64";
+  offset: number;
+  length: number;
+}
+
+interface Header {
+  version: number;
+  node_count: number;
+  edge_count: number;
+  labels: string[];
+  relations: string[];
+  risk_levels: RiskLevel[];
+  columns: ColumnSpec[];
+}
+
+/** Graph snapshot as typed-array views over the response buffer */
+export interface ColumnarGraph {
+  nodeCount: number;
+  edgeCount: number;
+  labels: string[];
+  relations: string[];
+  riskLevels: RiskLevel[];
+  nodeId: string[];
+  nodeEntity: string[];
+  nodeLabel: Uint8Array;
+  nodeRisk: Uint8Array;
+  nodeDegree: Int32Array;
+  edgeSource: Int32Array;
+  edgeTarget: Int32Array;
+  edgeRelation: Uint8Array;
+  edgeWeight: Float32Array;
+  edgeAmount: Float32Array;
+  edgeDuration: Float32Array;
+  edgeTimeMs: Float64Array;
+}
+
+const TYPED = {
+  uint8: Uint8Array,
+  int32: Int32Array,
+  float32: Float32Array,
+  float64: Float64Array,
+} as const;
+
+export function decodeGraphColumnar(buffer: ArrayBuffer): ColumnarGraph {
+  const view = new DataView(buffer);
+  const decoder = new TextDecoder();
+  if (decoder.decode(new Uint8Array(buffer, 0, 4)) !== MAGIC) {
+    throw new Error("Not a columnar graph payload");
+  }
+  const headerLength = view.getUint32(4, true);
+  const header: Header = JSON.parse(decoder.decode(new Uint8Array(buffer, 8, headerLength)));
+  const base = 8 + headerLength;
+
+  const columns: Record<string, any> = {};
+  for (const c of header.columns) {
+    if (c.dtype === "utf8") {
+      const text = decoder.decode(new Uint8Array(buffer, base + c.offset, c.length));
+      columns[c.name] = text.length ? text.split("\0") : [];
+    } else {
+      const Typed = TYPED[c.dtype];
+      columns[c.name] = new Typed(buffer, base + c.offset, c.length / Typed.BYTES_PER_ELEMENT);
+    }
+  }
+
+  return {
+    nodeCount: header.node_count,
+    edgeCount: header.edge_count,
+    labels: header.labels,
+    relations: header.relations,
+    riskLevels: header.risk_levels,
+    nodeId: columns.node_id,
+    nodeEntity: columns.node_entity,
+    nodeLabel: columns.node_label,
+    nodeRisk: columns.node_risk,
+    nodeDegree: columns.node_degree,
+    edgeSource: columns.edge_source,
+    edgeTarget: columns.edge_target,
+    edgeRelation: columns.edge_relation,
+    edgeWeight: columns.edge_weight,
+    edgeAmount: columns.edge_amount,
+    edgeDuration: columns.edge_duration,
+    edgeTimeMs: columns.edge_time_ms,
+  };
+}
+
+const orNull = (value: number) => (Number.isNaN(value) ? null : value);
+
+/** Expand the columns into the JSON-shaped snapshot the views consume */
+export function toGraphSnapshot(g: ColumnarGraph): GraphSnapshot {
+  const nodes: GraphNode[] = new Array(g.nodeCount);
+  for (let i = 0; i < g.nodeCount; i++) {
+    nodes[i] = {
+      id: g.nodeId[i],
+      label: g.labels[g.nodeLabel[i]],
+      entity_id: g.nodeEntity[i],
+      risk_level: g.nodeRisk[i] === NO_RISK ? undefined : g.riskLevels[g.nodeRisk[i]],
+      degree: g.nodeDegree[i],
+      metadata: { entity: g.nodeEntity[i] },
+    };
+  }
+
+  const edges: GraphEdge[] = new Array(g.edgeCount);
+  for (let i = 0; i < g.edgeCount; i++) {
+    const time = g.edgeTimeMs[i];
+    edges[i] = {
+      source: g.nodeId[g.edgeSource[i]],
+      target: g.nodeId[g.edgeTarget[i]],
+      relation: g.relations[g.edgeRelation[i]],
+      weight: g.edgeWeight[i],
+      metadata: {
+        amount: orNull(g.edgeAmount[i]),
+        duration: orNull(g.edgeDuration[i]),
+        timestamp: Number.isNaN(time) ? null : new Date(time).toISOString().slice(0, -1),
+      },
+    };
+  }
+
+  return { nodes, edges };
+}
@@ -20,6 +20,15 @@ export interface GraphEdge {
 export interface GraphSnapshot {
   nodes: GraphNode[];
   edges: GraphEdge[];
+  community_id?: string | null;
+  parent_id?: string | null;
+}
+
+export interface EgoNetwork extends GraphSnapshot {
+  center: string;
+  hops: number;
+  skipped_hubs: string[];
+  truncated: boolean;
 }
 
 export interface GraphStats {
@@ -28,6 +37,7 @@ export interface GraphStats {
   node_breakdown: Record<string, number>;
   relationship_breakdown: Record<string, number>;
   density: number;
+  graph_version?: number | null;
 }
 
 export interface FraudRing {
@@ -39,6 +49,7 @@ export interface FraudRing {
   risk_score: number;
   ring_type: string;
   confidence: number;
+  cycle_count: number;
 }
 
 export interface Kingpin {
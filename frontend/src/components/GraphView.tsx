@@ -1,10 +1,11 @@
 import CytoscapeComponent from "react-cytoscapejs";
-import type { GraphSnapshot, GraphNode } from "../api/types";
+import type { GraphNode } from "../api/types";
+import type { ColumnarGraph } from "../api/columnar";
 import { useMemo, useState } from "react";
 import Section from "./Section";
 
 interface Props {
-  snapshot?: GraphSnapshot;
+  graph?: ColumnarGraph;
 }
 
 const riskColor = (node: GraphNode) => {
@@ -13,31 +14,38 @@ const riskColor = (node: GraphNode) => {
   return "#38bdf8";
 };
 
-export default function GraphView({ snapshot }: Props) {
+export default function GraphView({ graph }: Props) {
   const [layoutKey, setLayoutKey] = useState(0);
 
   const elements = useMemo(() => {
-    if (!snapshot) return [];
-    const nodes = snapshot.nodes.map((n) => ({
-      data: {
-        id: n.id,
-        label: `${n.label}: ${n.entity_id}`,
-        risk: n.risk_level,
-        weight: Math.max(1, n.degree),
-      },
-      classes: n.risk_level?.toLowerCase(),
-    }));
-    const edges = snapshot.edges.map((e, idx) => ({
-      data: {
-        id: `e-${idx}`,
-        source: e.source,
-        target: e.target,
-        label: e.relation,
-        weight: e.weight,
-      },
-    }));
-    return [...nodes, ...edges];
-  }, [snapshot]);
+    if (!graph) return [];
+    // Built straight from the typed-array columns, no intermediate objects
+    const elements = new Array(graph.nodeCount + graph.edgeCount);
+    for (let i = 0; i < graph.nodeCount; i++) {
+      const risk = graph.riskLevels[graph.nodeRisk[i]];
+      elements[i] = {
+        data: {
+          id: graph.nodeId[i],
+          label: `${graph.labels[graph.nodeLabel[i]]}: ${graph.nodeEntity[i]}`,
+          risk,
+          weight: Math.max(1, graph.nodeDegree[i]),
+        },
+        classes: risk?.toLowerCase(),
+      };
+    }
+    for (let i = 0; i < graph.edgeCount; i++) {
+      elements[graph.nodeCount + i] = {
+        data: {
+          id: `e-${i}`,
+          source: graph.nodeId[graph.edgeSource[i]],
+          target: graph.nodeId[graph.edgeTarget[i]],
+          label: graph.relations[graph.edgeRelation[i]],
+          weight: graph.edgeWeight[i],
+        },
+      };
+    }
+    return elements;
+  }, [graph]);
 
   return (
     <Section
@@ -54,7 +62,7 @@ export default function GraphView({ snapshot }: Props) {
       className="col-span-2"
     >
       <div className="h-[460px] rounded-xl overflow-hidden border border-slate-700/40">
-        {snapshot ? (
+        {graph ? (
           <CytoscapeComponent
             key={layoutKey}
             elements={elements as any}
@@ -0,0 +1,53 @@
+"""Graph-wide anomaly sweep: one aggregation per signal"""
+
+from datetime import datetime
+
+from services.cases import case_store
+from services.intelligence import IntelligenceEngine
+
+HEADER_SIMS = "sim_number,phone_number,provider,activation_date"
+HEADER_TRANSACTIONS = "transaction_id,from_account,to_account,amount,timestamp,transaction_type"
+PHONE = "+919876543210"
+
+
+def test_store_sweep_thresholds_and_order(store):
+    for i in range(4):
+        store.merge_sim(f"SIM{i}", PHONE, "Jio", datetime(2024, 1, 1))
+    store.merge_sim("SIM9", "+919123456789", "Jio", datetime(2024, 1, 1))
+    store.merge_transaction("ACC1", "ACC2", "T1", 400000, datetime(2024, 1, 1), "transfer")
+    store.merge_transaction("ACC1", "ACC3", "T2", 300000, datetime(2024, 1, 2), "transfer")
+
+    assert store.anomaly_sweep("sim_swap", 2, 10) == [
+        {"entity_id": PHONE, "value": 4, "details": {"swap_count": 4}}
+    ]
+    money = store.anomaly_sweep("money_movement", 500000, 10)
+    assert [r["entity_id"] for r in money] == ["ACC1"]
+    assert money[0]["details"] == {"total_amount": 700000.0, "transaction_count": 2}
+
+
+def test_engine_sweep_matches_case_sweep(store):
+    for i in range(4):
+        store.merge_sim(f"SIM{i}", PHONE, "Jio", datetime(2024, 1, 1))
+    engine = IntelligenceEngine(store)
+    whole = engine.sweep_anomalies("sim_swap")
+    case = engine.open_case([PHONE], hops=1)
+    scoped = IntelligenceEngine(store, case_store.get(case.case_id)).sweep_anomalies("sim_swap")
+
+    assert [(a.entity_id, a.confidence, a.details) for a in whole] == \
+        [(a.entity_id, a.confidence, a.details) for a in scoped]
+    assert whole[0].confidence == 0.8
+
+
+def test_sweep_endpoint(client, upload):
+    upload("sims", HEADER_SIMS, [(f"SIM{i}", "9876543210", "Jio", "2024-01-01") for i in range(3)])
+    upload("transactions", HEADER_TRANSACTIONS, [
+        (f"T{i}", "ACC1", f"ACC{i + 2}", 300000, f"2024-01-0{i + 1}T10:00:00", "transfer") for i in range(4)
+    ])
+
+    anomalies = client.get("/api/v1/intelligence/anomalies").json()
+    assert [(a["entity_id"], a["anomaly_type"]) for a in anomalies] == [
+        ("ACC1", "money_movement"), (PHONE, "sim_swap"),
+    ]
+    assert client.get("/api/v1/intelligence/anomalies", params={"anomaly_type": "nope"}).status_code == 400
+    only = client.get("/api/v1/intelligence/anomalies", params={"anomaly_type": "sim_swap"}).json()
+    assert [a["anomaly_type"] for a in only] == ["sim_swap"]
@@ -0,0 +1,37 @@
+"""Async Neo4j connection used from the event loop"""
+
+import asyncio
+
+from neo4j import READ_ACCESS
+
+from routes import system
+
+
+def test_async_reads_run_in_managed_read_transactions(neo4j_connection):
+    db = neo4j_connection(lambda query, params: [{"n": params["x"]}], asynchronous=True)
+    rows = asyncio.run(db.execute_read("RETURN $x AS n", {"x": 7}, name="probe"))
+    assert rows == [{"n": 7}]
+    (_, _, config), = db.driver.runs
+    assert config["default_access_mode"] == READ_ACCESS
+
+
+def test_async_stream_yields_records(neo4j_connection):
+    db = neo4j_connection(lambda query, params: [{"n": i} for i in range(3)], asynchronous=True)
+
+    async def collect():
+        return [row async for row in db.stream_query("UNWIND range(0, 2) AS n RETURN n")]
+
+    assert asyncio.run(collect()) == [{"n": 0}, {"n": 1}, {"n": 2}]
+
+
+def test_health_awaits_the_async_driver(client, neo4j_connection, monkeypatch):
+    db = neo4j_connection(lambda query, params: [{"status": 1}], asynchronous=True)
+
+    async def get_async_db():
+        return db
+
+    monkeypatch.setattr(system, "is_embedded", lambda: False)
+    monkeypatch.setattr(system, "get_async_db", get_async_db)
+    body = client.get("/api/v1/system/health").json()
+    assert body["status"] == "operational"
+    assert [query for query, _, _ in db.driver.runs] == ["RETURN 1 AS status"]
@@ -0,0 +1,117 @@
+"""Behavioural feature vectors and the similarity index"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from services.behavior import FEATURES, BehaviorIndex, behavior_features
+from services.projection import GraphProjection
+
+HOUR = 3600
+
+
+def feature(row, name):
+    return float(row[FEATURES.index(name)])
+
+
+def call(a, b, duration, epoch=10 * HOUR):
+    return (a, b, "Phone", "Phone", "MADE", epoch, None, duration)
+
+
+def transfer(a, b, amount, epoch=10 * HOUR):
+    return (a, b, "BankAccount", "BankAccount", "SENT", epoch, amount, None)
+
+
+def test_features_of_one_phone_and_one_account(graph):
+    p = graph([
+        call("A", "B", 10), call("A", "C", 60, 2 * HOUR), call("A", "C", 700),
+        ("A", "D1", "Phone", "Device", "RUNS_ON", None, None, None),
+        transfer("ACC1", "ACC2", 100.0), transfer("ACC1", "ACC3", 1000.0),
+    ])
+    phone, account = behavior_features(p, np.array([p.index["A"], p.index["ACC1"]]))
+
+    assert feature(phone, "calls_log") == pytest.approx(np.log1p(3))
+    assert [feature(phone, f) for f in ("calls_under_30s", "calls_30s_2m", "calls_2m_10m", "calls_over_10m")] == \
+        pytest.approx([1 / 3, 1 / 3, 0, 1 / 3])
+    assert feature(phone, "fan_out_log") == pytest.approx(np.log1p(2))
+    assert feature(phone, "fan_in_log") == 0
+    assert feature(phone, "active_08h") == pytest.approx(2 / 3)
+    assert feature(phone, "active_00h") == pytest.approx(1 / 3)
+    assert feature(phone, "devices_log") == pytest.approx(np.log1p(1))
+
+    assert feature(account, "transactions_log") == pytest.approx(np.log1p(2))
+    assert feature(account, "amount_log_mean") == pytest.approx(2.5)
+    assert feature(account, "amount_log_std") == pytest.approx(0.5)
+    assert feature(account, "calls_log") == 0
+
+
+def pings_and_talkers(graph):
+    rows = []
+    for i in range(3):
+        rows += [call(f"P{i}", f"T{j}", 5) for j in range(6)]  # many short pings
+    for i in range(3):
+        rows += [call(f"L{i}", "T0", 1800)]  # one long call
+    return graph(rows)
+
+
+def test_nearest_ranks_alike_behaviour_first(graph):
+    p = pings_and_talkers(graph)
+    index = BehaviorIndex()
+    index.refresh(p)
+
+    found = index.nearest(p.index["P0"], 2)
+    assert {p.node_ids[n] for n, _ in found} == {"P1", "P2"}
+    assert found[0][1] == pytest.approx(1.0)
+    assert p.index["P0"] not in {n for n, _ in index.nearest(p.index["P0"], 100)}
+
+    allowed = np.array([p.index[e] for e in ("P0", "L0", "L1")])
+    assert {p.node_ids[n] for n, _ in index.nearest(p.index["P0"], 5, allowed)} == {"L0", "L1"}
+    assert np.allclose(index.features(p.index["L0"]), behavior_features(p, np.array([p.index["L0"]]))[0],
+                       atol=1e-5)
+
+
+def test_refresh_after_catch_up_only_reprofiles_touched_entities(store):
+    when = datetime(2024, 1, 15, 10)
+    store.merge_call("+919000000001", "+919000000002", "C1", 10, when, "outgoing")
+    store.merge_call("+919000000003", "+919000000004", "C2", 10, when, "outgoing")
+    p = GraphProjection.load(store)
+    index = BehaviorIndex()
+    index.refresh(p)
+    untouched = index.features(p.index["+919000000003"]).copy()
+    scale = index.scale.copy()
+
+    store.merge_call("+919000000001", "+919000000005", "C3", 900, when, "outgoing")
+    caught_up = p.catch_up(store)
+    index.refresh(caught_up)
+
+    assert index.edge_count == caught_up.edge_count and index.size == 5
+    assert np.array_equal(index.scale, scale)  # statistics are kept from the first build
+    assert np.array_equal(index.features(caught_up.index["+919000000003"]), untouched)
+    node = caught_up.index["+919000000001"]
+    assert np.allclose(index.features(node), behavior_features(caught_up, np.array([node]))[0], atol=1e-5)
+    # The older projection of the same lineage is still answered
+    assert index.nearest(p.index["+919000000002"], 1) is not None
+
+
+def test_unprofiled_entities(graph):
+    p = graph([call("A", "B", 10), ("A", "D1", "Phone", "Device", "RUNS_ON", None, None, None)])
+    index = BehaviorIndex()
+    index.refresh(p)
+    assert index.nearest(p.index["D1"], 5) is None
+    assert index.features(p.index["D1"]) is None
+    assert [n for n, _ in index.nearest(p.index["A"], 5)] == [p.index["B"]]  # the device is never a match
+
+
+def test_endpoint(client, upload):
+    header = "call_id,from_phone,to_phone,duration_seconds,timestamp,call_type"
+    upload("calls", header, [
+        ("C1", "9876543210", "9123456789", 5, "2024-01-15T10:00:00", "outgoing"),
+        ("C2", "9000000001", "9123456789", 5, "2024-01-15T10:00:00", "outgoing"),
+    ])
+
+    body = client.get("/api/v1/intelligence/similar/+919876543210", params={"top_k": 1}).json()
+    assert body["label"] == "Phone"
+    assert [s["entity_id"] for s in body["similar"]] == ["+919000000001"]
+    assert set(body["features"]) == set(FEATURES)
+    assert client.get("/api/v1/intelligence/similar/+910000000000").status_code == 404
@@ -0,0 +1,48 @@
+"""Per-entity lookups inside a case see only the case subgraph"""
+
+from datetime import datetime
+
+from services.cases import case_store
+from services.intelligence import IntelligenceEngine
+
+A, B, C = "+919000000001", "+919000000002", "+919000000003"
+
+
+def build(store):
+    store.merge_call(C, A, "C0", 60, datetime(2024, 1, 1, 9), "outgoing")
+    store.merge_call(A, B, "C1", 60, datetime(2024, 1, 1, 10), "outgoing")
+    for i in range(4):
+        store.merge_sim(f"SIM{i}", B, "Jio", datetime(2024, 1, 1))
+
+
+def scoped(store, seed):
+    case = IntelligenceEngine(store).open_case([seed], hops=1)
+    return IntelligenceEngine(store, case_store.get(case.case_id))
+
+
+def test_timeline_keeps_events_between_members(store):
+    build(store)
+    engine = scoped(store, C)  # C and A; B is two hops out
+    events = engine.get_timeline(A).events
+    assert [e.to_entity for e in events] == [C]
+    assert len(IntelligenceEngine(store).get_timeline(A).events) == 2
+
+
+def test_risk_counts_only_case_relationships(store):
+    build(store)
+    whole = IntelligenceEngine(store).assess_risk(A).factors
+    inside = scoped(store, C).assess_risk(A).factors
+    assert (whole["connection_count"], whole["event_count"]) == (20, 10)
+    assert (inside["connection_count"], inside["event_count"]) == (10, 5)
+
+
+def test_case_counts_match_the_store_when_nothing_is_cut(store):
+    build(store)
+    engine = scoped(store, A)  # A, B and C
+    assert engine._risk_counts([A, "SIM0", "NOPE"]) == IntelligenceEngine(store)._risk_counts([A, "SIM0", "NOPE"])
+
+
+def test_anomalies_ignore_events_outside_the_case(store):
+    build(store)
+    assert [a.anomaly_type for a in IntelligenceEngine(store).detect_anomalies(B)] == ["sim_swap"]
+    assert scoped(store, A).detect_anomalies(B) == []  # B's SIMs are outside
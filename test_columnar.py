@@ -0,0 +1,63 @@
+"""Columnar binary encoding of graph snapshots"""
+
+import json
+import struct
+
+import numpy as np
+
+from responses import GRAPH_COLUMNAR_MAGIC, GRAPH_COLUMNAR_MEDIA_TYPE, NO_RISK, encode_graph_columnar
+
+HEADER_CALLS = "call_id,from_phone,to_phone,duration_seconds,timestamp,call_type"
+
+
+def decode(payload: bytes):
+    assert payload[:4] == GRAPH_COLUMNAR_MAGIC
+    (length,) = struct.unpack("<I", payload[4:8])
+    header = json.loads(payload[8:8 + length])
+    start = 8 + length
+    assert start % 8 == 0
+    columns = {}
+    for spec in header["columns"]:
+        assert spec["offset"] % 8 == 0
+        raw = payload[start + spec["offset"]:start + spec["offset"] + spec["length"]]
+        if spec["dtype"] == "utf8":
+            columns[spec["name"]] = raw.decode("utf-8").split("\0")
+        else:
+            columns[spec["name"]] = np.frombuffer(raw, dtype=np.dtype(spec["dtype"]).newbyteorder("<"))
+    return header, columns
+
+
+def test_round_trip():
+    snapshot = {
+        "nodes": [
+            {"id": "a", "label": "Phone", "entity_id": "+91ä", "risk_level": "HIGH", "degree": 3},
+            {"id": "b", "label": "BankAccount", "entity_id": "ACC1", "degree": 1},
+        ],
+        "edges": [
+            {"source": "a", "target": "b", "relation": "USES", "weight": 2.0,
+             "metadata": {"amount": None, "duration": 60, "timestamp": "2024-01-15T10:00:00"}},
+        ],
+    }
+    header, columns = decode(encode_graph_columnar(snapshot))
+
+    assert (header["node_count"], header["edge_count"]) == (2, 1)
+    assert columns["node_id"] == ["a", "b"]
+    assert columns["node_entity"] == ["+91ä", "ACC1"]
+    assert [header["labels"][c] for c in columns["node_label"]] == ["Phone", "BankAccount"]
+    assert columns["node_risk"][0] == header["risk_levels"].index("HIGH")
+    assert columns["node_risk"][1] == NO_RISK
+    assert (columns["edge_source"][0], columns["edge_target"][0]) == (0, 1)
+    assert np.isnan(columns["edge_amount"][0])
+    assert columns["edge_duration"][0] == 60
+    assert columns["edge_time_ms"][0] == 1705312800000.0
+
+
+def test_snapshot_endpoint_negotiates_encoding(client, upload):
+    upload("calls", HEADER_CALLS, [("C1", "9876543210", "9123456789", 60, "2024-01-15T10:00:00", "outgoing")])
+    response = client.get("/api/v1/intelligence/graph", headers={"Accept": GRAPH_COLUMNAR_MEDIA_TYPE})
+    assert response.headers["content-type"] == GRAPH_COLUMNAR_MEDIA_TYPE
+    header, columns = decode(response.content)
+
+    as_json = client.get("/api/v1/intelligence/graph").json()
+    assert columns["node_id"] == [n["id"] for n in as_json["nodes"]]
+    assert header["edge_count"] == len(as_json["edges"])
@@ -0,0 +1,87 @@
+"""Bounded compute executor with priorities, queue limits and deadlines"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from compute import (
+    ComputeExecutor, DeadlineExceeded, Overloaded, Priority, Unavailable, check_deadline, compute_executor,
+)
+
+
+@pytest.fixture
+def executor():
+    executor = ComputeExecutor(
+        workers=2,
+        reserved_interactive=1,
+        queue_limits={Priority.INTERACTIVE: 4, Priority.BATCH: 1},
+        budgets={Priority.INTERACTIVE: 2.0, Priority.BATCH: 5.0},
+    )
+    executor.start()
+    yield executor
+    executor.shutdown()
+
+
+def test_runs_jobs_and_checkpoints_are_free_outside(executor):
+    check_deadline()
+    assert asyncio.run(executor.run(Priority.INTERACTIVE, lambda a, b=0: a + b, 1, b=2)) == 3
+
+
+def test_batch_never_takes_the_reserved_worker(executor):
+    started, release = threading.Event(), threading.Event()
+    executor.submit(Priority.BATCH, lambda: started.set() or release.wait(5))
+    assert started.wait(5)
+    queued = executor.submit(Priority.BATCH, lambda: "second batch")
+    try:
+        # The batch job holds its one worker; an interactive lookup still runs
+        assert asyncio.run(executor.run(Priority.INTERACTIVE, lambda: "lookup")) == "lookup"
+        assert not queued.future.done()
+        assert executor.stats()["queued"] == {"interactive": 0, "batch": 1}
+
+        # A full batch queue refuses at once with a retry hint
+        with pytest.raises(Overloaded) as rejected:
+            executor.submit(Priority.BATCH, lambda: None)
+        assert rejected.value.status_code == 429
+        assert "Retry-After" in rejected.value.headers
+    finally:
+        release.set()
+    assert queued.future.result(5) == "second batch"
+
+
+def test_running_job_stops_at_its_next_checkpoint(executor):
+    def spin():
+        while True:
+            check_deadline()
+            time.sleep(0.01)
+
+    job = executor.submit(Priority.INTERACTIVE, spin, budget=0.05)
+    with pytest.raises(DeadlineExceeded):
+        job.future.result(5)
+
+
+def test_awaiting_past_the_budget_answers_504(executor):
+    release = threading.Event()
+    try:
+        with pytest.raises(DeadlineExceeded) as exceeded:
+            asyncio.run(executor.run(Priority.INTERACTIVE, release.wait, 5, budget=0.05))
+        assert exceeded.value.status_code == 504
+    finally:
+        release.set()
+
+
+def test_stopped_executor_is_unavailable():
+    executor = ComputeExecutor(1, 0, {p: 1 for p in Priority}, {p: 1.0 for p in Priority})
+    with pytest.raises(Unavailable):
+        executor.submit(Priority.INTERACTIVE, lambda: None)
+
+
+def test_rejections_become_http_errors(client, monkeypatch):
+    def refuse(*args, **kwargs):
+        raise Overloaded("busy", retry_after=7)
+
+    monkeypatch.setattr(compute_executor, "submit", refuse)
+    response = client.get("/api/v1/intelligence/kingpins")
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "7"
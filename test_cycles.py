@@ -0,0 +1,90 @@
+"""Round-tripping cycle detection and its use in fraud rings"""
+
+from datetime import datetime
+
+from services.intelligence import IntelligenceEngine
+from services.money_flow import CycleDetector
+
+T0 = 1_700_000_000
+HOUR = 3600
+
+
+def transfer(src, dst, ts, amount):
+    return (src, dst, "BankAccount", "BankAccount", "SENT", ts, amount, None)
+
+
+def test_cycle_closes_in_time_order(graph):
+    p = graph([
+        transfer("A", "B", T0, 1000),
+        transfer("B", "C", T0 + HOUR, 900),
+        transfer("C", "A", T0 + 2 * HOUR, 800),
+        transfer("C", "A", T0 - 100 * HOUR, 5000),  # too long before the loop
+    ])
+    cycles = CycleDetector(p).detect()
+    assert [(c.accounts, c.cycled_amount, c.duration_seconds) for c in cycles] == [
+        (["A", "B", "C", "A"], 800, 2 * HOUR),
+    ]
+
+
+def test_same_second_cycle_against_node_order(graph):
+    # A stale transfer fixes node order A < B < C, so the A -> C -> B -> A
+    # cycle runs against it
+    p = graph([
+        transfer("A", "B", T0 - 1000 * HOUR, 1),
+        transfer("A", "C", T0, 100),
+        transfer("C", "B", T0, 100),
+        transfer("B", "A", T0, 100),
+    ])
+    assert list(p.node_ids) == ["A", "B", "C"]
+    cycles = CycleDetector(p).detect()
+    assert [c.accounts for c in cycles] == [["A", "C", "B", "A"]]
+
+
+def test_cycle_starting_with_same_second_hops_is_found_once(graph):
+    p = graph([
+        transfer("B", "C", T0, 100),
+        transfer("A", "B", T0, 100),
+        transfer("C", "A", T0 + HOUR, 100),
+    ])
+    assert [c.accounts for c in CycleDetector(p).detect()] == [["A", "B", "C", "A"]]
+
+
+def test_window_and_bounds(graph):
+    rows = [
+        transfer("A", "B", T0, 100),
+        transfer("B", "A", T0 + 100 * HOUR, 100),
+    ]
+    assert CycleDetector(graph(rows)).detect() == []
+    assert len(CycleDetector(graph(rows)).detect(window_hours=200)) == 1
+    assert CycleDetector(graph(rows)).detect(window_hours=200, until=T0 + HOUR) == []
+
+
+def test_search_without_top_k_keeps_every_cycle(graph):
+    rows = []
+    for i in range(5):
+        rows += [transfer(f"A{i}", f"B{i}", T0, 100 + i), transfer(f"B{i}", f"A{i}", T0 + 1, 100 + i)]
+    detector = CycleDetector(graph(rows))
+    assert len(detector.detect(top_k=2)) == 2
+    found, truncated = detector.search(top_k=None)
+    assert len(found) == 5 and not truncated
+    _, truncated = detector.search(top_k=None, max_expansions=3)
+    assert truncated
+
+
+def test_fraud_rings_count_cycles_once_per_projection(store, monkeypatch):
+    when = datetime(2024, 1, 1)
+    store.merge_transaction("ACC1", "ACC2", "T1", 1000, when, "transfer")
+    store.merge_transaction("ACC2", "ACC3", "T2", 1000, when, "transfer")
+    store.merge_transaction("ACC3", "ACC1", "T3", 1000, when, "transfer")
+
+    searches = []
+    original = CycleDetector.search
+    monkeypatch.setattr(CycleDetector, "search", lambda self, *a, **kw: searches.append(1) or original(self, *a, **kw))
+
+    engine = IntelligenceEngine(store)
+    rings = engine.detect_fraud_rings()
+    assert [(r.member_count, r.cycle_count, r.cycles_truncated, r.ring_type) for r in rings] == [
+        (3, 1, False, "money_laundering"),
+    ]
+    engine.detect_fraud_rings()
+    assert len(searches) == 1
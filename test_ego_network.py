@@ -0,0 +1,59 @@
+"""Bounded k-hop ego networks"""
+
+from services.ego_network import EgoNetworkExplorer
+
+T0 = 1_700_000_000
+
+
+def call(src, dst):
+    return (src, dst, "Phone", "Phone", "MADE", T0, None, 60)
+
+
+def test_hops_and_fan_out(graph):
+    rows = [call("C", "N1"), call("C", "N1"), call("C", "N2"), call("C", "N3"), call("N1", "F1")]
+    explorer = EgoNetworkExplorer(graph(rows))
+
+    one = explorer.expand("C", hops=1)
+    assert sorted(n.entity_id for n in one.nodes) == ["C", "N1", "N2", "N3"]
+    assert not one.truncated
+
+    two = explorer.expand("C", hops=2)
+    assert {n.entity_id: n.metadata["hop"] for n in two.nodes}["F1"] == 2
+    # Parallel calls collapse into one edge
+    assert [e.metadata["edge_count"] for e in two.edges if e.target == "N1"] == [2]
+
+    # The strongest tie survives the fan-out cap
+    capped = explorer.expand("C", hops=1, fan_out=1)
+    assert [n.entity_id for n in capped.nodes] == ["C", "N1"]
+    assert capped.truncated
+
+
+def test_hubs_are_shown_but_not_expanded(graph):
+    rows = [call("C", "HUB")] + [call("HUB", f"X{i}") for i in range(5)]
+    ego = EgoNetworkExplorer(graph(rows)).expand("C", hops=2, max_hub_degree=3)
+    assert [n.entity_id for n in ego.nodes] == ["C", "HUB"]
+    assert ego.skipped_hubs == ["HUB"]
+
+    # The centre is expanded even when it is a hub itself
+    ego = EgoNetworkExplorer(graph(rows)).expand("HUB", hops=1, max_hub_degree=3)
+    assert len(ego.nodes) == 7
+
+
+def test_relation_filter_and_unknown_entity(graph):
+    rows = [call("C", "N1"), ("C", "ACC1", "Phone", "BankAccount", "USES", T0, None, None)]
+    explorer = EgoNetworkExplorer(graph(rows))
+    ego = explorer.expand("C", hops=1, relations=["USES"])
+    assert sorted(n.entity_id for n in ego.nodes) == ["ACC1", "C"]
+    assert [e.relation for e in ego.edges] == ["USES"]
+    assert explorer.expand("NOPE") is None
+
+
+def test_ego_endpoint(client, upload):
+    upload("calls", "call_id,from_phone,to_phone,duration_seconds,timestamp,call_type", [
+        ("C1", "9876543210", "9123456789", 60, "2024-01-15T10:00:00", "outgoing"),
+    ])
+    body = client.get("/api/v1/intelligence/ego/+919876543210", params={"hops": 1}).json()
+    assert body["center"] == "+919876543210"
+    assert len(body["nodes"]) == 2
+    assert client.get("/api/v1/intelligence/ego/NOPE").status_code == 404
+    assert client.get("/api/v1/intelligence/ego/+919876543210", params={"relations": "BOGUS"}).status_code == 400
@@ -0,0 +1,67 @@
+"""Embedded SQLite graph store"""
+
+from datetime import datetime, timezone
+
+from config import settings
+from database.embedded import SCHEMA_VERSION, EmbeddedStore
+
+A, B = "+919000000001", "+919000000002"
+WHEN = datetime(2024, 1, 15, 10, 0)
+
+
+def test_relationships_merge_like_cypher(store):
+    store.merge_call(A, B, "C1", 60, WHEN, "outgoing")
+    store.merge_call(A, B, "C1", 60, WHEN, "outgoing")
+    store.merge_call(A, B, "C2", 60, WHEN, "outgoing")
+    store.merge_device("D1", "10.0.0.1", A, "android", "IMEI1", WHEN)
+    store.merge_device("D1", "10.0.0.1", A, "android", "IMEI1", WHEN)
+
+    nodes, relationships = store.count_breakdown()
+    assert nodes == {"Phone": 2, "Device": 1, "IP": 1}
+    assert relationships == {"MADE": 2, "CONNECTS_VIA": 1, "RUNS_ON": 1}
+
+
+def test_stream_edges_pages_and_resumes(store, monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_FETCH_SIZE", 2)
+    for i in range(5):
+        store.merge_call(A, B, f"C{i}", 60 + i, WHEN, "outgoing")
+    watermark = store.ingest_watermark()
+    store.merge_call(B, A, "LATE", 1, WHEN, "outgoing")
+
+    rows = list(store.stream_edges(["MADE"], upto=watermark))
+    assert [row[7] for row in rows] == [60, 61, 62, 63, 64]
+    assert rows[0][:6] == (A, B, "Phone", "Phone", "MADE", int(WHEN.replace(tzinfo=timezone.utc).timestamp()))
+
+    delta = list(store.stream_edges(["MADE"], after=watermark))
+    assert [(row[0], row[7]) for row in delta] == [(B, 1)]
+
+
+def test_snapshot_bounds_and_versions(store):
+    assert store.graph_version() == 0
+    store.merge_transaction("ACC1", "ACC2", "T1", 500.0, datetime(2024, 1, 1), "transfer")
+    store.merge_transaction("ACC1", "ACC2", "T2", 700.0, datetime(2024, 3, 1), "transfer")
+    assert store.bump_graph_version() == 1
+
+    rows = store.snapshot_edges(10, datetime(2024, 2, 1), None)
+    assert [(r["source_entity"], r["amount"], r["timestamp"]) for r in rows] == [
+        ("ACC1", 700.0, datetime(2024, 3, 1)),
+    ]
+    assert store.connection_counts(["ACC1", "ACC9"]) == [
+        {"entity_id": "ACC1", "connection_count": 1, "event_count": 2},
+    ]
+
+
+def test_file_store_persists_across_reopen(tmp_path):
+    path = str(tmp_path / "graph.db")
+    first = EmbeddedStore(path)
+    first.merge_call(A, B, "C1", 60, WHEN, "outgoing")
+    first.bump_graph_version()
+    first.close()
+
+    second = EmbeddedStore(path)
+    try:
+        assert second.schema_version == SCHEMA_VERSION
+        assert second.graph_version() == 1
+        assert [e["call_id"] for e in second.timeline(A, None, None)] == ["C1"]
+    finally:
+        second.close()
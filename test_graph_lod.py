@@ -0,0 +1,72 @@
+"""Level-of-detail graph views and the projection's derived cache"""
+
+import threading
+import time
+
+from services.graph_lod import GraphLOD
+
+T0 = 1_700_000_000
+
+
+def pairs(count):
+    return [(f"P{i}a", f"P{i}b", "Phone", "Phone", "MADE", T0, None, 60) for i in range(count)]
+
+
+def leaves(lod, community_id):
+    view = lod.view(community_id)
+    if view.nodes and view.nodes[0].label == "Community":
+        return [m for node in view.nodes for m in leaves(lod, node.entity_id)]
+    return [node.entity_id for node in view.nodes]
+
+
+def test_extra_communities_fold_into_a_rest_supernode(graph):
+    p = graph(pairs(10))
+    lod = GraphLOD(p, max_nodes=3)
+    root = lod.view()
+    assert [n.entity_id for n in root.nodes] == ["0", "1", "rest"]
+    assert [n.metadata["community_count"] for n in root.nodes] == [1, 1, 8]
+    assert root.nodes[2].metadata["member_count"] == 16
+
+    rest = lod.view("rest")
+    assert rest.parent_id == "root"
+    assert [n.entity_id for n in rest.nodes] == ["rest.0", "rest.1", "rest.rest"]
+    # Every node is still reachable by zooming
+    assert sorted(leaves(lod, "root")) == sorted(p.node_ids)
+
+
+def test_small_graph_shows_members(graph):
+    p = graph(pairs(2))
+    view = GraphLOD(p).view()
+    assert sorted(n.entity_id for n in view.nodes) == sorted(p.node_ids)
+    assert len(view.edges) == 2
+
+
+def test_derived_builds_do_not_block_other_names(graph):
+    p = graph(pairs(1))
+    building = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        building.set()
+        release.wait(5)
+        return "slow"
+
+    worker = threading.Thread(target=p.derived, args=("slow", slow))
+    worker.start()
+    assert building.wait(5)
+    started = time.monotonic()
+    assert p.derived("fast", lambda: "fast") == "fast"
+    assert time.monotonic() - started < 1
+    release.set()
+    worker.join()
+    assert p.derived("slow", lambda: "rebuilt") == "slow"
+
+
+def test_lod_endpoint(client, upload):
+    upload("calls", "call_id,from_phone,to_phone,duration_seconds,timestamp,call_type", [
+        ("C1", "9876543210", "9123456789", 60, "2024-01-15T10:00:00", "outgoing"),
+    ])
+    body = client.get("/api/v1/intelligence/graph/lod").json()
+    assert body["community_id"] == "root"
+    assert len(body["nodes"]) == 2
+    assert client.get("/api/v1/intelligence/graph/lod", params={"community_id": "9.9"}).status_code == 404
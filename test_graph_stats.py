@@ -0,0 +1,56 @@
+"""Count-store graph statistics cached per graph version"""
+
+import asyncio
+
+from database.graph import GRAPH_META_LABEL, GRAPH_VERSION_QUERY
+from services.graph_stats import TOKENS_QUERY, GraphStatsCache, count_store_query
+
+HEADER_CALLS = "call_id,from_phone,to_phone,duration_seconds,timestamp,call_type"
+
+
+def test_count_store_query_quotes_tokens():
+    query, params = count_store_query(["Phone", "Odd`Label"], ["MADE"])
+    assert "MATCH (n:`Odd``Label`)" in query
+    assert "MATCH ()-[r:`MADE`]->()" in query
+    assert params == {"label0": "Phone", "label1": "Odd`Label", "type0": "MADE"}
+    assert query.count("UNION ALL") == 4
+
+
+def test_stats_recomputed_only_when_the_version_moves(neo4j_connection):
+    version = {"value": 1}
+
+    def respond(query, params):
+        if query == GRAPH_VERSION_QUERY:
+            return [{"version": version["value"]}]
+        if query == TOKENS_QUERY:
+            return [{"labels": ["Phone", GRAPH_META_LABEL], "types": ["MADE"]}]
+        return [
+            {"kind": "nodes", "name": "", "count": 4},
+            {"kind": "relationships", "name": "", "count": 2},
+            {"kind": "label", "name": "Phone", "count": 3},
+            {"kind": "label", "name": GRAPH_META_LABEL, "count": 1},
+            {"kind": "type", "name": "MADE", "count": 2},
+        ]
+
+    db = neo4j_connection(respond, asynchronous=True)
+    cache = GraphStatsCache()
+    stats = asyncio.run(cache.get(db))
+    assert (stats.total_nodes, stats.total_relationships, stats.graph_version) == (3, 2, 1)
+    assert stats.node_breakdown == {"Phone": 3}
+    assert stats.density == 2 / 6
+
+    runs = len(db.driver.runs)
+    assert asyncio.run(cache.get(db)) is stats
+    assert len(db.driver.runs) == runs + 1  # only the version lookup
+
+    version["value"] = 2
+    assert asyncio.run(cache.get(db)).graph_version == 2
+
+
+def test_stats_endpoint_follows_uploads(client, upload):
+    before = client.get("/api/v1/system/graph/stats").json()
+    upload("calls", HEADER_CALLS, [("C1", "9876543210", "9123456789", 60, "2024-01-15T10:00:00", "outgoing")])
+    after = client.get("/api/v1/system/graph/stats").json()
+    assert after["graph_version"] > before["graph_version"]
+    assert after["node_breakdown"] == {"Phone": 2}
+    assert after["relationship_breakdown"] == {"MADE": 1}
@@ -0,0 +1,82 @@
+"""Kingpin centrality from the projection's edge arrays"""
+
+from datetime import datetime
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from services.centrality import betweenness, pagerank, simple_digraph
+from services.intelligence import IntelligenceEngine
+
+PHONES = [f"+9190000000{i:02d}" for i in range(12)]
+
+
+def random_edges(n, m, seed):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, n, m), rng.integers(0, n, m)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_centrality_matches_networkx(seed):
+    n = 40
+    src, dst = simple_digraph(*random_edges(n, 120, seed), n)
+    G = nx.DiGraph()
+    G.add_nodes_from(range(n))
+    G.add_edges_from(zip(src.tolist(), dst.tolist()))
+
+    expected_pr = nx.pagerank(G)
+    expected_bc = nx.betweenness_centrality(G)
+    assert np.allclose(pagerank(n, src, dst), [expected_pr[i] for i in range(n)], atol=1e-8)
+    assert np.allclose(betweenness(n, src, dst), [expected_bc[i] for i in range(n)], atol=1e-12)
+
+
+def test_betweenness_batches_agree(monkeypatch):
+    from services import centrality
+
+    n = 30
+    src, dst = simple_digraph(*random_edges(n, 90, 7), n)
+    whole = betweenness(n, src, dst)
+    monkeypatch.setattr(centrality, "BETWEENNESS_BATCH_CELLS", n * 4)
+    assert np.allclose(betweenness(n, src, dst), whole)
+
+
+def test_simple_digraph_drops_parallel_edges():
+    src, dst = simple_digraph(np.array([0, 0, 1, 0]), np.array([1, 1, 0, 1]), 2)
+    assert list(zip(src.tolist(), dst.tolist())) == [(0, 1), (1, 0)]
+
+
+def expected_kingpins(edges):
+    G = nx.DiGraph(edges)
+    pr, bc = nx.pagerank(G), nx.betweenness_centrality(G)
+    max_in = max(dict(G.in_degree()).values())
+    max_out = max(dict(G.out_degree()).values())
+    return {
+        node: pr[node] * 0.4 + bc[node] * 0.3
+        + G.in_degree(node) / max_in * 0.15 + G.out_degree(node) / max_out * 0.15
+        for node in G
+    }
+
+
+def test_engine_scores_and_window(store):
+    calls = [(0, 1, 1), (0, 2, 1), (1, 3, 2), (2, 3, 2), (3, 4, 3), (4, 0, 3),
+             (5, 3, 20), (3, 6, 20), (0, 1, 21)]
+    for i, (a, b, day) in enumerate(calls):
+        store.merge_call(PHONES[a], PHONES[b], f"C{i}", 60, datetime(2024, 1, day), "outgoing")
+    store.merge_transaction("ACC1", "ACC2", "T1", 1000, datetime(2024, 1, 5), "transfer")
+    engine = IntelligenceEngine(store)
+
+    kingpins = engine.detect_kingpins(top_k=50)
+    expected = expected_kingpins(
+        [(PHONES[a], PHONES[b]) for a, b, _ in calls] + [("ACC1", "ACC2")]
+    )
+    assert {k.entity_id: round(k.influence_score, 9) for k in kingpins} == \
+        {node: round(score, 9) for node, score in expected.items()}
+    scores = [k.influence_score for k in kingpins]
+    assert scores == sorted(scores, reverse=True)
+
+    windowed = engine.detect_kingpins(top_k=50, since=datetime(2024, 1, 10))
+    expected = expected_kingpins([(PHONES[a], PHONES[b]) for a, b, day in calls if day >= 10])
+    assert {k.entity_id: round(k.influence_score, 9) for k in windowed} == \
+        {node: round(score, 9) for node, score in expected.items()}
+    assert engine.detect_kingpins(top_k=2)[:2] == kingpins[:2]
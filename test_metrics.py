@@ -0,0 +1,17 @@
+"""Prometheus metrics endpoint and request labelling"""
+
+HEADER_CALLS = "call_id,from_phone,to_phone,duration_seconds,timestamp,call_type"
+
+
+def test_requests_are_labelled_by_route_template(client, upload):
+    upload("calls", HEADER_CALLS, [("C1", "9876543210", "9123456789", 60, "2024-01-15T10:00:00", "outgoing")])
+    assert client.get("/api/v1/intelligence/risk/+919876543210").status_code == 200
+
+    body = client.get("/metrics").text
+    assert 'route="/api/v1/intelligence/risk/{entity_id}"' in body
+    assert "+919876543210" not in body
+
+
+def test_unknown_paths_are_unmatched(client):
+    client.get("/no/such/path")
+    assert 'route="unmatched",status="404"' in client.get("/metrics").text
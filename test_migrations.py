@@ -0,0 +1,82 @@
+"""Versioned schema migrations and startup cost"""
+
+import os
+import subprocess
+import sys
+
+from database import graph
+from database.migrations import (
+    LATEST_VERSION, RECORD_FAILURE_QUERY, RECORD_MIGRATION_QUERY, SCHEMA_VERSION_QUERY, MigrationResult, migrate,
+)
+
+
+def ledger(version):
+    def respond(query, params):
+        return [{"version": version}] if query == SCHEMA_VERSION_QUERY else []
+    return respond
+
+
+def records(db):
+    return [(params["version"], query) for query, params, _ in db.driver.runs
+            if query in (RECORD_MIGRATION_QUERY, RECORD_FAILURE_QUERY)]
+
+
+def stub_steps(db, **failures):
+    for step in ("create_indexes", "migrate_timestamps", "create_ingest_indexes"):
+        setattr(db, step, failures.get(step, lambda: []))
+
+
+def test_pending_migrations_run_in_order(neo4j_connection):
+    db = neo4j_connection(ledger(1))
+    stub_steps(db)
+    assert migrate(db) == MigrationResult(LATEST_VERSION)
+    assert records(db) == [(2, RECORD_MIGRATION_QUERY), (3, RECORD_MIGRATION_QUERY)]
+
+
+def test_up_to_date_schema_runs_nothing(neo4j_connection):
+    db = neo4j_connection(ledger(LATEST_VERSION))
+    assert migrate(db) == MigrationResult(LATEST_VERSION)
+    assert len(db.driver.runs) == 1
+
+
+def test_failed_statements_stop_without_raising(neo4j_connection):
+    db = neo4j_connection(ledger(0))
+    stub_steps(db, migrate_timestamps=lambda: ["()-[x:MADE]->() x.timestamp"])
+    assert migrate(db) == MigrationResult(1, failed=2)
+    # Recorded as failed; migration 3 waits for the next start
+    assert records(db) == [(1, RECORD_MIGRATION_QUERY), (2, RECORD_FAILURE_QUERY)]
+
+
+def test_raising_migration_is_not_fatal(neo4j_connection):
+    db = neo4j_connection(ledger(0))
+
+    def unsupported():
+        raise RuntimeError("Invalid input 'IS'")
+
+    stub_steps(db, create_indexes=unsupported)
+    assert migrate(db) == MigrationResult(0, failed=1)
+
+
+def test_timestamp_migration_avoids_type_predicates(neo4j_connection):
+    db = neo4j_connection()
+    assert db.migrate_timestamps() == []
+    queries = [query for query, _, _ in db.driver.runs]
+    assert len(queries) == 5
+    assert not any("IS ::" in q for q in queries)
+
+
+def test_failed_migration_does_not_block_readiness(monkeypatch):
+    monkeypatch.setattr(graph, "_neo4j", object())
+    monkeypatch.setattr(graph, "_async_neo4j", object())
+    monkeypatch.setattr(graph, "_schema_version", 1)
+    monkeypatch.setattr(graph, "_failed_migration", 2)
+    state = graph.readiness()
+    assert state["ready"]
+    assert (state["schema_version"], state["failed_migration"]) == (1, 2)
+
+
+def test_startup_defers_heavy_imports():
+    app = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app")
+    script = "import main, sys; print(','.join(m for m in ('networkx', 'scipy', 'pandas', 'neo4j') if m in sys.modules))"
+    loaded = subprocess.run([sys.executable, "-c", script], cwd=app, capture_output=True, text=True, check=True)
+    assert loaded.stdout.strip() == ""
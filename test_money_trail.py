@@ -0,0 +1,60 @@
+"""Time-respecting money trails over SENT transfers"""
+
+from services.money_flow import MoneyFlowTracer
+
+T0 = 1_700_000_000
+HOUR = 3600
+HEADER_TRANSACTIONS = "transaction_id,from_account,to_account,amount,timestamp,transaction_type"
+
+
+def transfer(src, dst, ts, amount):
+    return (src, dst, "BankAccount", "BankAccount", "SENT", ts, amount, None)
+
+
+def test_hops_respect_time_order_and_gap(graph):
+    p = graph([
+        transfer("A", "B", T0, 1000),
+        transfer("B", "C", T0 + HOUR, 900),
+        transfer("B", "D", T0 - HOUR, 900),       # before the money arrived
+        transfer("C", "E", T0 + 100 * HOUR, 800),  # beyond the 72h gap
+    ])
+    trail = MoneyFlowTracer(p).trace("A")
+    assert [path.accounts for path in trail.paths] == [["A", "B", "C"]]
+    assert trail.paths[0].traced_amount == 900
+    assert trail.paths[0].cash_out
+    assert not trail.truncated
+
+
+def test_min_fraction_and_ranking(graph):
+    p = graph([
+        transfer("A", "B", T0, 1000),
+        transfer("B", "C", T0 + HOUR, 50),   # under 10% of the incoming hop
+        transfer("A", "D", T0, 400),
+        transfer("A", "E", T0, 700),
+    ])
+    trail = MoneyFlowTracer(p).trace("A", top_k=2)
+    assert [(path.accounts, path.traced_amount) for path in trail.paths] == [
+        (["A", "B"], 1000), (["A", "E"], 700),
+    ]
+
+
+def test_hop_limit_is_not_a_cash_out(graph):
+    p = graph([transfer(f"A{i}", f"A{i + 1}", T0 + i, 100) for i in range(4)])
+    trail = MoneyFlowTracer(p).trace("A0", max_hops=2)
+    assert [(path.hop_count, path.cash_out) for path in trail.paths] == [(2, False)]
+
+
+def test_unknown_account_has_no_paths(graph):
+    p = graph([("P1", "A", "Phone", "BankAccount", "USES", T0, None, None)])
+    assert MoneyFlowTracer(p).trace("P1").paths == []
+    assert MoneyFlowTracer(p).trace("NOPE").paths == []
+
+
+def test_money_trail_endpoint(client, upload):
+    upload("transactions", HEADER_TRANSACTIONS, [
+        ("T1", "ACC1", "ACC2", 5000, "2024-01-01T10:00:00", "transfer"),
+        ("T2", "ACC2", "ACC3", 4500, "2024-01-01T12:00:00", "transfer"),
+    ])
+    body = client.get("/api/v1/intelligence/money-trail/acc1").json()
+    assert body["paths"][0]["accounts"] == ["ACC1", "ACC2", "ACC3"]
+    assert body["paths"][0]["start_time"] == "2024-01-01T10:00:00"
@@ -0,0 +1,76 @@
+"""Per-query stats, slow-query log and PROFILE summaries"""
+
+import logging
+
+import pytest
+
+from config import settings
+from database.instrumentation import default_query_name, query_recorder, summarize_profile
+
+
+def test_queries_are_recorded_by_name(neo4j_connection):
+    db = neo4j_connection(lambda query, params: [{"n": 1}, {"n": 2}])
+    db.execute_read("MATCH (n) RETURN n", name="probe")
+    db.execute_read("MATCH (n) RETURN n", name="probe")
+    db.execute_query("  match (m)\n RETURN m  ")
+
+    probe = query_recorder.get("probe").snapshot()
+    assert (probe["mode"], probe["count"], probe["rows"], probe["errors"]) == ("read", 2, 4, 0)
+    assert probe["db_ms"] == 6.0  # 1 ms to first record + 2 ms to consume, twice
+    assert query_recorder.get(default_query_name("match (m) RETURN m")).mode == "auto"
+
+
+def test_errors_are_recorded_and_raised(neo4j_connection):
+    def fail(query, params):
+        raise ValueError("syntax error")
+
+    db = neo4j_connection(fail)
+    with pytest.raises(ValueError):
+        db.execute_write("CREATE (", name="broken")
+    snapshot = query_recorder.get("broken").snapshot()
+    assert snapshot["errors"] == 1
+    assert snapshot["last_error"] == "ValueError: syntax error"
+
+
+def test_slow_query_log_redacts_parameters(neo4j_connection, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0)
+    db = neo4j_connection()
+    with caplog.at_level(logging.WARNING, logger="database.slow_queries"):
+        db.execute_read("MATCH (p {phone_number: $phone}) RETURN p", {"phone": "+919876543210", "ids": [1, 2]},
+                        name="lookup")
+    message = caplog.records[-1].getMessage()
+    assert "Slow query lookup (read)" in message
+    assert "+919876543210" not in message
+    assert "'phone': '<str>'" in message and "'ids': '<list[2]>'" in message
+
+
+def test_profile_summary_finds_index_seeks_and_scans():
+    plan = {
+        "operatorType": "ProduceResults@neo4j", "rows": 2, "dbHits": 0, "args": {},
+        "children": [
+            {"operatorType": "NodeIndexSeek@neo4j", "rows": 2, "dbHits": 3,
+             "args": {"Details": "RANGE INDEX p:Phone(phone_number)"}, "children": []},
+            {"operatorType": "NodeByLabelScan@neo4j", "rows": 9, "dbHits": 10,
+             "args": {"Details": "a:BankAccount"}, "children": []},
+        ],
+    }
+    summary = summarize_profile(plan)
+    assert summary["db_hits"] == 13
+    assert summary["index_used"]
+    assert summary["indexes"] == ["RANGE INDEX p:Phone(phone_number)"]
+    assert summary["scans"] == ["a:BankAccount"]
+    assert [op["operator"] for op in summary["operators"]] == ["ProduceResults", "NodeIndexSeek", "NodeByLabelScan"]
+
+
+def test_query_endpoints(client, neo4j_connection):
+    db = neo4j_connection()
+    db.execute_read("MATCH (n) RETURN n", name="probe")
+    db.execute_write("CREATE (n)", name="writer")
+
+    names = [q["name"] for q in client.get("/api/v1/system/queries").json()]
+    assert {"probe", "writer"} <= set(names)
+    profile = "/api/v1/system/queries/{}/profile"
+    assert client.post(profile.format("missing"), json={"params": {}}).status_code == 404
+    assert client.post(profile.format("writer"), json={"params": {}}).status_code == 400
+    # The embedded backend has no PROFILE
+    assert client.post(profile.format("probe"), json={"params": {}}).status_code == 400
@@ -0,0 +1,43 @@
+"""Request handlers never open the graph store on the event loop"""
+
+import asyncio
+
+import pytest
+
+import routes
+from config import settings
+from database import graph
+
+
+def test_neo4j_requests_get_503_until_startup_finishes(client, monkeypatch):
+    monkeypatch.setattr(settings, "GRAPH_BACKEND", "neo4j")
+    monkeypatch.setattr(graph, "_neo4j", None)
+
+    responses = [
+        client.get("/api/v1/intelligence/kingpins"),
+        client.post("/api/v1/cases", json={"seeds": ["X"]}),
+        client.post("/api/v1/data/upload", params={"file_type": "calls"}, files={"file": ("a.csv", b"x")}),
+        client.get("/api/v1/system/pool"),
+    ]
+    for response in responses:
+        assert response.status_code == 503, response.url
+        assert response.headers["Retry-After"] == str(routes.STORE_RETRY_AFTER)
+
+    assert client.get("/api/v1/system/live").status_code == 200
+    assert client.get("/api/v1/system/ready").status_code == 503
+
+
+def test_store_is_resolved_on_a_worker_thread(client, monkeypatch):
+    opened = []
+
+    def get_store():
+        with pytest.raises(RuntimeError):
+            asyncio.get_running_loop()
+        opened.append(True)
+        return original()
+
+    original = routes.get_store
+    monkeypatch.setattr(routes, "get_store", get_store)
+    assert client.get("/api/v1/intelligence/kingpins").status_code == 200
+    assert client.get("/api/v1/system/graph/stats").status_code == 200
+    assert len(opened) == 2
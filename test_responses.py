@@ -0,0 +1,48 @@
+"""Fast JSON rendering and response compression"""
+
+import json
+
+import numpy as np
+
+import responses
+from models.schemas import GraphSnapshot, RiskLevel
+from responses import FastJSONResponse
+
+HEADER_CALLS = "call_id,from_phone,to_phone,duration_seconds,timestamp,call_type"
+
+
+def test_fast_json_matches_the_standard_encoder(monkeypatch):
+    content = {
+        "risk": RiskLevel.HIGH,
+        "counts": np.array([1, 2, 3]),
+        "total": np.float64(2.5),
+        "nested": [{"a": 1.5, "b": None}],
+    }
+    fast = json.loads(FastJSONResponse(content).body)
+    monkeypatch.setattr(responses, "orjson", None)
+    plain = json.loads(FastJSONResponse(content).body)
+    assert fast == plain == {"risk": "HIGH", "counts": [1, 2, 3], "total": 2.5, "nested": [{"a": 1.5, "b": None}]}
+
+
+def calls(upload, count):
+    upload("calls", HEADER_CALLS, [
+        (f"C{i}", "9876543210", f"91234{i:05d}", 60, "2024-01-15T10:00:00", "outgoing") for i in range(count)
+    ])
+
+
+def test_snapshot_keeps_the_response_schema(client, upload):
+    calls(upload, 5)
+    response = client.get("/api/v1/intelligence/graph")
+    assert "Accept" in response.headers["vary"].split(", ")
+    snapshot = GraphSnapshot.model_validate(response.json())
+    assert len(snapshot.nodes) == 6 and len(snapshot.edges) == 5
+
+
+def test_large_responses_are_compressed(client, upload):
+    calls(upload, 60)
+    big = client.get("/api/v1/intelligence/graph", headers={"Accept-Encoding": "gzip"})
+    assert big.headers["content-encoding"] == "gzip"
+    assert len(big.json()["edges"]) == 60
+
+    small = client.get("/api/v1/system/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
@@ -0,0 +1,100 @@
+"""Fraud ring evolution across time windows"""
+
+import pytest
+
+from services.ring_evolution import MAX_WINDOWS, RingEvolutionTracker, TooManyWindows
+
+DAY = 86400
+A, B = ["a1", "a2", "a3"], ["b1", "b2", "b3"]
+
+
+def ring(members, day):
+    """Calls around a cycle of ``members`` on ``day``"""
+    pairs = zip(members, members[1:] + members[:1])
+    return [(a, b, "Phone", "Phone", "MADE", day * DAY + i, None, 60) for i, (a, b) in enumerate(pairs)]
+
+
+def bridge(left, right, day):
+    return [(a, b, "Phone", "Phone", "MADE", day * DAY + 50, None, 60) for a in left for b in right]
+
+
+def events(evolution):
+    return [(e.window_start[:10], e.event_type, e.ring_id, e.member_count) for e in evolution.events]
+
+
+def test_birth_growth_merge_death(graph):
+    p = graph(
+        ring(A, 0) + ring(B, 0)
+        + ring(A + ["a4"], 1) + ring(B, 1)
+        + ring(A + ["a4"], 2) + ring(B, 2) + bridge(A + ["a4"], B, 2)
+        + ring(["c1", "c2", "c3"], 4)
+    )
+    evolution = RingEvolutionTracker(p).track(window=DAY)
+
+    assert [(w.edge_count, w.ring_count) for w in evolution.windows] == [(6, 2), (7, 2), (19, 1), (0, 0), (3, 1)]
+    assert events(evolution) == [
+        ("1970-01-01", "birth", "ring_0", 3),
+        ("1970-01-01", "birth", "ring_1", 3),
+        ("1970-01-02", "growth", "ring_0", 4),
+        ("1970-01-03", "merge", "ring_0", 7),
+        ("1970-01-04", "death", "ring_0", 0),
+        ("1970-01-05", "birth", "ring_2", 3),
+    ]
+    assert evolution.events[3].related == ["ring_1"]
+
+    rings = {r.ring_id: r for r in evolution.rings}
+    assert rings["ring_1"].merged_into == "ring_0"
+    assert rings["ring_1"].ended == "1970-01-03T00:00:00"
+    assert rings["ring_0"].peak_member_count == 7
+    assert sorted(rings["ring_0"].members) == sorted(A + B + ["a4"])
+    assert rings["ring_2"].ended is None
+
+
+def test_split_keeps_id_on_the_best_match(graph):
+    left = A + ["a4"]
+    p = graph(
+        ring(left, 0) + ring(B, 0) + bridge(left, B, 0)
+        + ring(left, 1) + ring(B, 1)
+    )
+    evolution = RingEvolutionTracker(p).track(window=DAY)
+
+    split = [e for e in evolution.events if e.event_type == "split"]
+    assert len(split) == 1
+    assert split[0].ring_id == "ring_0" and split[0].member_count == 4
+    assert split[0].previous_member_count == 7
+    assert split[0].related == ["ring_1"]
+    assert {r.ring_id: r.split_from for r in evolution.rings} == {"ring_0": None, "ring_1": "ring_0"}
+
+
+def test_untimestamped_and_other_relations_are_ignored(graph):
+    p = graph(
+        ring(A, 0)
+        + [("a1", "d1", "Phone", "Device", "RUNS_ON", None, None, None),
+           ("x1", "x2", "Phone", "Phone", "MADE", None, None, 60)]
+    )
+    tracker = RingEvolutionTracker(p)
+    assert tracker.span() == (0, 2)
+    evolution = tracker.track(window=DAY)
+    assert [r.members for r in evolution.rings] == [A]
+
+
+def test_empty_and_oversized_series(graph):
+    assert RingEvolutionTracker(graph([])).track().windows == []
+    with pytest.raises(TooManyWindows):
+        RingEvolutionTracker(graph(ring(A, 0))).track(0, MAX_WINDOWS * DAY, window=DAY)
+
+
+def test_endpoint(client, upload):
+    header = "call_id,from_phone,to_phone,duration_seconds,timestamp,call_type"
+    phones = ["9876543210", "9123456789", "9000000001"]
+    upload("calls", header, [
+        (f"C{i}", a, b, 60, f"2024-01-0{i + 1}T10:00:00", "outgoing")
+        for i, (a, b) in enumerate(zip(phones, phones[1:] + phones[:1]))
+    ])
+
+    body = client.get("/api/v1/intelligence/clusters/evolution", params={"window_days": 7}).json()
+    assert [e["event_type"] for e in body["events"]] == ["birth"]
+    assert body["rings"][0]["member_count"] == 3
+    response = client.get("/api/v1/intelligence/clusters/evolution",
+                          params={"window_days": 1, "step_days": 0.001})
+    assert response.status_code == 400
@@ -0,0 +1,77 @@
+"""Bulk risk assessment: one result per requested id, streamed per chunk"""
+
+import json
+
+from database.embedded import EmbeddedStore
+from services.intelligence import IntelligenceEngine
+
+HEADER_CALLS = "call_id,from_phone,to_phone,duration_seconds,timestamp,call_type"
+A, B, C = "+919876543210", "+919123456789", "+919000000001"
+
+
+def calls(upload):
+    upload("calls", HEADER_CALLS, [
+        ("C1", A[3:], B[3:], 60, "2024-01-15T10:00:00", "outgoing"),
+        ("C2", A[3:], C[3:], 60, "2024-01-15T11:00:00", "outgoing"),
+    ])
+
+
+def test_every_requested_id_gets_a_status(client, upload):
+    calls(upload)
+    response = client.post("/api/v1/intelligence/risk/batch",
+                           json={"entity_ids": [A, "ACC404", A, B]})
+    assert response.status_code == 200
+    body = json.loads(response.text)
+    assert body["error"] is None
+    assert [(r["entity_id"], r["status"]) for r in body["results"]] == [
+        (A, "scored"), ("ACC404", "not_found"), (A, "duplicate"), (B, "scored"),
+    ]
+    assert body["results"][0]["assessment"]["factors"]["connection_count"] == 20
+    assert body["results"][1]["assessment"] is None
+
+
+def test_case_members_only(client, upload):
+    calls(upload)
+    case = client.post("/api/v1/cases", json={"seeds": [B], "hops": 1}).json()["case_id"]
+    response = client.post("/api/v1/intelligence/risk/batch", params={"case_id": case},
+                           json={"entity_ids": [B, C]})
+    assert [r["status"] for r in response.json()["results"]] == ["scored", "not_in_case"]
+
+
+def test_chunks_keep_request_order(store):
+    store.merge_call(A, B, "C1", 60, None, "outgoing")
+    engine = IntelligenceEngine(store)
+    chunks = list(engine.iter_risk_batch([B, "X", A, B, "Y"], chunk_size=2))
+    assert [len(c) for c in chunks] == [2, 2, 1]
+    assert [r.status for c in chunks for r in c] == ["scored", "not_found", "scored", "duplicate", "not_found"]
+
+
+def test_store_failure_before_streaming_is_an_error_status(client, upload, monkeypatch):
+    calls(upload)
+
+    def broken(self, entity_ids):
+        raise RuntimeError("store unavailable")
+
+    monkeypatch.setattr(EmbeddedStore, "connection_counts", broken)
+    response = client.post("/api/v1/intelligence/risk/batch", json={"entity_ids": [A]})
+    assert response.status_code == 500
+
+
+def test_failure_mid_stream_ends_with_an_error_object(client, upload, monkeypatch):
+    calls(upload)
+    original = EmbeddedStore.connection_counts
+    served = []
+
+    def fails_second_time(self, entity_ids):
+        served.append(entity_ids)
+        if len(served) > 1:
+            raise RuntimeError("connection lost")
+        return original(self, entity_ids)
+
+    monkeypatch.setattr(EmbeddedStore, "connection_counts", fails_second_time)
+    ids = [A] * 1000 + [B]  # B is the first id of the second chunk
+    response = client.post("/api/v1/intelligence/risk/batch", json={"entity_ids": ids})
+    assert response.status_code == 200
+    body = json.loads(response.text)
+    assert len(body["results"]) == 1000
+    assert body["error"] == {"status_code": 500, "detail": "connection lost"}
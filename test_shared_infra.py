@@ -0,0 +1,76 @@
+"""Phones linked through shared devices and IPs"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from services.intelligence import IntelligenceEngine
+from services.shared_infra import SharedInfrastructureDetector
+
+
+def runs_on(phone, device):
+    return (phone, device, "Phone", "Device", "RUNS_ON", None, None, None)
+
+
+def connects_via(device, ip):
+    return (device, ip, "Device", "IP", "CONNECTS_VIA", 0, None, None)
+
+
+def handsets_and_nat(graph):
+    """P0-P3 share DEV0; P4 and P5 share DEV1 and its IP1; every device also sits behind IP0"""
+    rows = [runs_on(f"P{i}", "DEV0") for i in range(4)]
+    rows += [runs_on("P4", "DEV1"), runs_on("P5", "DEV1"), runs_on("P6", "DEV2")]
+    rows += [connects_via(d, "IP0") for d in ("DEV0", "DEV1", "DEV2")]
+    rows += [connects_via("DEV1", "IP1")]
+    return graph(rows)
+
+
+def test_clusters_weights_and_skipped_hubs(graph):
+    result = SharedInfrastructureDetector(handsets_and_nat(graph)).detect(max_hub_phones=4)
+
+    assert result.skipped_hubs == {"IP0": 7}
+    assert result.phone_count == 6 and result.link_count == 7
+    handset, pair = result.clusters
+    assert sorted(handset.members) == ["P0", "P1", "P2", "P3"]
+    assert handset.devices == ["DEV0"] and handset.ips == []
+    assert handset.weight == pytest.approx(6 / np.log(5))
+    assert len(handset.links) == 6
+
+    assert sorted(pair.members) == ["P4", "P5"]
+    assert (pair.devices, pair.ips) == (["DEV1"], ["IP1"])
+    link = pair.links[0]
+    assert (link.shared_devices, link.shared_ips) == (1, 1)
+    assert link.weight == pytest.approx(2 / np.log(3))
+
+
+def test_hub_limit_and_filters(graph):
+    p = handsets_and_nat(graph)
+    # With the NAT kept every phone is in one cluster, through IP0
+    everything = SharedInfrastructureDetector(p).detect(max_hub_phones=10)
+    assert everything.skipped_hubs == {}
+    assert [c.member_count for c in everything.clusters] == [7]
+    assert everything.clusters[0].ips == ["IP0", "IP1"]
+
+    # Handset links at 1/ln(5) fall below the threshold; the P4-P5 link does not
+    strong = SharedInfrastructureDetector(p).detect(max_hub_phones=4, min_weight=1.0)
+    assert [sorted(c.members) for c in strong.clusters] == [["P4", "P5"]]
+    assert [c.member_count for c in SharedInfrastructureDetector(p).detect(max_hub_phones=4, min_size=3).clusters] == [4]
+    assert len(SharedInfrastructureDetector(p).detect(max_hub_phones=4, top_n=1).clusters) == 1
+
+
+def test_no_shared_infrastructure(graph):
+    result = SharedInfrastructureDetector(graph([runs_on("P0", "DEV0")])).detect()
+    assert (result.clusters, result.phone_count, result.link_count) == ([], 0, 0)
+
+
+def test_engine_over_the_store(store):
+    when = datetime(2024, 1, 15, 10)
+    for i, phone in enumerate(["+919000000001", "+919000000002"]):
+        store.merge_device("DEV0", f"10.0.0.{i}", phone, "android", "IMEI0", when)
+
+    result = IntelligenceEngine(store).detect_shared_infrastructure()
+    assert [sorted(c.members) for c in result.clusters] == [["+919000000001", "+919000000002"]]
+    assert result.clusters[0].devices == ["DEV0"]
+    # Both phones reach the two IPs through the one handset
+    assert result.clusters[0].links[0].shared_ips == 2
@@ -0,0 +1,99 @@
+"""Memory-mapped projection snapshots with delta catch-up"""
+
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from config import settings
+from services import projection as projection_module
+from services.projection import GraphProjection, SortedIndex, prune_snapshots
+
+A, B, C = "+919000000001", "+919000000002", "+919000000003"
+WHEN = datetime(2024, 1, 15, 10, 0)
+
+
+def same_graph(left, right):
+    assert list(left.node_ids) == list(right.node_ids)
+    for column in ("node_labels", "src", "dst", "rel", "ts"):
+        assert np.array_equal(getattr(left, column), getattr(right, column))
+    for column in ("amount", "duration"):
+        assert np.array_equal(getattr(left, column), getattr(right, column), equal_nan=True)
+
+
+def test_save_and_open_round_trip(store, tmp_path):
+    store.merge_call(A, B, "C1", 60, WHEN, "outgoing")
+    store.merge_transaction("ACC1", "ACC2", "T1", 500.0, WHEN, "transfer")
+    loaded = GraphProjection.load(store)
+
+    opened = GraphProjection.open(loaded.save(str(tmp_path), store.backend))
+    same_graph(loaded, opened)
+    assert isinstance(opened.index, SortedIndex)
+    assert opened.index[B] == loaded.index[B]
+    assert "NOPE" not in opened.index
+    for mapped, built in zip(opened.incident_adjacency(), loaded.incident_adjacency()):
+        assert np.array_equal(mapped, built)
+
+
+def test_catch_up_matches_a_full_load(store, tmp_path):
+    store.merge_call(A, B, "C1", 60, WHEN, "outgoing")
+    opened = GraphProjection.open(GraphProjection.load(store).save(str(tmp_path), store.backend))
+    assert opened.catch_up(store) is opened  # nothing new
+
+    store.merge_call(B, C, "C2", 30, WHEN, "outgoing")
+    caught_up = opened.catch_up(store)
+    same_graph(caught_up, GraphProjection.load(store))
+    assert caught_up.index[C] == 2
+    assert opened.edge_count == 1  # readers of the old projection are unaffected
+
+
+def test_cold_start_prefers_a_usable_snapshot(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROJECTION_SNAPSHOT_DIR", str(tmp_path))
+    store.merge_call(A, B, "C1", 60, WHEN, "outgoing")
+    GraphProjection.load(store).save(str(tmp_path), store.backend)
+    store.merge_call(B, C, "C2", 30, WHEN, "outgoing")
+
+    cold = projection_module._cold_start(store)
+    assert isinstance(cold.index, SortedIndex)  # opened, then caught up
+    same_graph(cold, GraphProjection.load(store))
+
+    # A snapshot ahead of the store comes from a replaced database
+    monkeypatch.setattr(store, "ingest_watermark", lambda: 0)
+    assert isinstance(projection_module._cold_start(store).index, dict)
+
+
+def test_prune_keeps_the_newest(store, tmp_path):
+    for i in range(3):
+        store.merge_call(A, B, f"C{i}", 60, WHEN, "outgoing")
+        GraphProjection.load(store).save(str(tmp_path), store.backend)
+    prune_snapshots(str(tmp_path), store.backend, keep=1)
+    assert [p.name for p in tmp_path.iterdir()] == ["projection-embedded-000000000003"]
+
+
+def test_adjacency_builds_once_and_stays_with_its_projection(store, monkeypatch):
+    store.merge_transaction("ACC1", "ACC2", "T1", 500.0, WHEN, "transfer")
+    p = GraphProjection.load(store)
+    builds = []
+    lexsort = np.lexsort
+
+    def slow_lexsort(keys):
+        builds.append(1)
+        time.sleep(0.05)
+        return lexsort(keys)
+
+    monkeypatch.setattr(np, "lexsort", slow_lexsort)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(p.temporal_adjacency("SENT"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(builds) == 1
+    assert all(result is results[0] for result in results)
+
+    store.merge_transaction("ACC2", "ACC3", "T2", 200.0, WHEN, "transfer")
+    caught_up = p.catch_up(store)
+    assert len(caught_up.temporal_adjacency("SENT")[1]) == 2
+    assert len(caught_up.reverse_adjacency("SENT")[1]) == 2
+    assert p.temporal_adjacency("SENT") is results[0]
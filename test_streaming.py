@@ -0,0 +1,38 @@
+"""Streaming query results into the projection"""
+
+from neo4j import READ_ACCESS
+
+from database.graph import GRAPH_VERSION_QUERY, Neo4jStore
+from services.projection import GraphProjection
+
+EDGES = [
+    {"source": "+911", "target": "+912", "source_label": "Phone", "target_label": "Phone",
+     "relation": "MADE", "ts": 1_700_000_000, "amount": None, "duration": 60},
+    {"source": "ACC1", "target": "ACC2", "source_label": "BankAccount", "target_label": "BankAccount",
+     "relation": "SENT", "ts": None, "amount": 500.0, "duration": None},
+]
+
+
+def respond(query, params):
+    if query == GRAPH_VERSION_QUERY:
+        return [{"version": 3}]
+    return EDGES
+
+
+def test_stream_query_pulls_in_fetch_size_batches(neo4j_connection):
+    db = neo4j_connection(respond)
+    rows = db.stream_query("MATCH ...", fetch_size=50, as_tuples=True)
+    assert db.driver.runs == []  # nothing runs until the first record is wanted
+    assert [tuple(r)[:2] for r in rows] == [("+911", "+912"), ("ACC1", "ACC2")]
+    (_, _, config), = db.driver.runs
+    assert config["fetch_size"] == 50 and config["default_access_mode"] == READ_ACCESS
+
+
+def test_projection_loads_from_streamed_tuples(neo4j_connection):
+    store = Neo4jStore(neo4j_connection(respond))
+    p = GraphProjection.load(store)
+    assert p.watermark == 3
+    assert list(p.node_ids) == ["+911", "+912", "ACC1", "ACC2"]
+    assert [p.label_of(n) for n in range(4)] == ["Phone", "Phone", "BankAccount", "BankAccount"]
+    assert list(p.src) == [0, 2] and list(p.dst) == [1, 3]
+    assert p.amount[1] == 500.0 and p.duration[0] == 60
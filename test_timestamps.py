@@ -0,0 +1,74 @@
+"""Native event timestamps and time-bounded timelines"""
+
+from datetime import datetime
+
+import pandas as pd
+
+from database.graph import timeline_query
+from services.etl import DataNormalizer
+
+PHONE = "+919876543210"
+HEADER_SIMS = "sim_number,phone_number,provider,activation_date"
+HEADER_CALLS = "call_id,from_phone,to_phone,duration_seconds,timestamp,call_type"
+
+
+def test_parse_timestamps_to_naive_utc():
+    df = pd.DataFrame({"timestamp": ["2024-01-15", "2024-01-15T10:30:00+05:30", "not a date"]})
+    DataNormalizer.parse_timestamps(df, "timestamp")
+
+    assert df["timestamp"][0].to_pydatetime() == datetime(2024, 1, 15)
+    assert df["timestamp"][1].to_pydatetime() == datetime(2024, 1, 15, 5, 0)
+    assert pd.isna(df["timestamp"][2])
+
+
+def test_windowed_timeline_keeps_untimestamped_relationships(store):
+    store.merge_sim("SIM1", PHONE, "Airtel", datetime(2024, 1, 1))
+    store.merge_call(PHONE, "+919123456789", "C1", 60, datetime(2024, 1, 10), "outgoing")
+    store.merge_call(PHONE, "+919123456789", "C2", 60, datetime(2024, 2, 10), "outgoing")
+
+    events = store.timeline(PHONE, datetime(2024, 2, 1), None)
+    assert sorted(e["relation"] for e in events) == ["HAS_SIM", "MADE"]
+    assert [e["call_id"] for e in events if e["relation"] == "MADE"] == ["C2"]
+
+    events = store.timeline(PHONE, None, datetime(2024, 1, 31))
+    assert [e["call_id"] for e in events if e["relation"] == "MADE"] == ["C1"]
+    assert len(store.timeline(PHONE, None, None)) == 3
+
+
+def test_timeline_query_has_one_predicate_per_bound():
+    unbounded = timeline_query(False, False)
+    assert "WHERE" not in unbounded
+
+    since_only = timeline_query(True, False)
+    assert "r.timestamp >= $since" in since_only
+    assert "$until" not in since_only
+    assert "IS NULL OR" not in since_only
+    # Untimestamped relationships come from their own branch
+    assert "WHERE r.timestamp IS NULL" in since_only
+
+
+def test_windowed_anomalies_report_sim_swaps(client, upload):
+    upload("sims", HEADER_SIMS, [(f"SIM{i}", "9876543210", "Jio", "2024-01-01") for i in range(4)])
+    upload("calls", HEADER_CALLS, [("C1", "9876543210", "9123456789", 60, "2024-03-01T10:00:00", "outgoing")])
+
+    response = client.get(f"/api/v1/intelligence/anomalies/{PHONE}", params={"since": "2024-02-01T00:00:00"})
+    assert response.status_code == 200
+    assert "sim_swap" in {a["anomaly_type"] for a in response.json()}
+
+
+def test_malformed_event_timestamps_are_rejected_not_dated_now(client, upload):
+    result = upload("calls", HEADER_CALLS, [
+        ("C1", "9876543210", "9123456789", 60, "2024-01-15T10:00:00", "outgoing"),
+        ("C2", "9876543210", "9123456789", 60, "yesterday-ish", "outgoing"),
+        ("C3", "9876543210", "9123456789", 60, "", "outgoing"),
+    ])
+    assert result["ingestion_result"]["inserted"] == 1
+    assert result["ingestion_result"]["errors"] == 2
+
+    timeline = client.get(f"/api/v1/intelligence/timeline/{PHONE}").json()
+    assert [e["timestamp"][:10] for e in timeline["events"]] == ["2024-01-15"]
+
+
+def test_sim_without_activation_date_is_kept(client, upload):
+    result = upload("sims", HEADER_SIMS, [("SIM1", "9876543210", "Jio", "not a date")])
+    assert result["ingestion_result"] == {"inserted": 1, "updated": 0, "errors": 0}
@@ -0,0 +1,45 @@
+"""Managed transactions, retry counters and pool reporting"""
+
+from types import SimpleNamespace
+
+from neo4j import READ_ACCESS, WRITE_ACCESS
+
+from config import settings
+from database.graph import driver_config, pool_snapshot
+
+
+def test_reads_and_writes_use_their_access_mode(neo4j_connection):
+    db = neo4j_connection(lambda query, params: [{"ok": 1}])
+    db.execute_read("MATCH (n) RETURN 1 AS ok")
+    db.execute_write("CREATE (n) RETURN 1 AS ok")
+    assert [config["default_access_mode"] for _, _, config in db.driver.runs] == [READ_ACCESS, WRITE_ACCESS]
+
+
+def test_transient_errors_are_retried_and_counted(neo4j_connection):
+    db = neo4j_connection(lambda query, params: [{"ok": 1}])
+    db.driver.transient_failures = 2
+    assert db.execute_write("MERGE (n) RETURN 1 AS ok") == [{"ok": 1}]
+
+    stats = db.pool_stats()
+    assert stats["completed"] == {"read": 0, "write": 1}
+    assert stats["retries"] == {"read": 0, "write": 2}
+    assert stats["in_flight"] == {"read": 0, "write": 0}
+    assert stats["max_pool_size"] == settings.NEO4J_MAX_POOL_SIZE
+
+
+def test_driver_config_comes_from_settings():
+    config = driver_config()
+    assert config["max_connection_pool_size"] == settings.NEO4J_MAX_POOL_SIZE
+    assert config["max_transaction_retry_time"] == settings.NEO4J_MAX_RETRY_TIME
+
+
+def test_pool_snapshot_reads_the_pool_defensively():
+    pool = SimpleNamespace(
+        connections={"core1:7687": [object()] * 3},
+        in_use_connection_count=lambda address: 1,
+    )
+    assert pool_snapshot(SimpleNamespace(_pool=pool)) == {
+        "core1:7687": {"open": 3, "in_use": 1, "idle": 2},
+    }
+    # A driver without the private pool reports nothing instead of failing
+    assert pool_snapshot(object()) == {}
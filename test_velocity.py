@@ -0,0 +1,34 @@
+"""Sliding-window velocity bursts"""
+
+from services.velocity import VelocityDetector
+
+T0 = 1_700_000_000
+
+
+def transfer(src, dst, ts, amount):
+    return (src, dst, "BankAccount", "BankAccount", "SENT", ts, amount, None)
+
+
+def call(src, dst, ts):
+    return (src, dst, "Phone", "Phone", "MADE", ts, None, 60)
+
+
+def test_lone_large_transfer_is_not_a_burst(graph):
+    p = graph([transfer("ACC1", "ACC2", T0, 5_000_000)])
+    assert VelocityDetector(p).detect() == []
+
+
+def test_rapid_transfers_break_the_ceiling(graph):
+    p = graph([transfer("ACC1", f"ACC{i + 2}", T0 + 10 * i, 60_000) for i in range(2)])
+    flagged = VelocityDetector(p).detect(windows=["1m"])
+    assert {a.entity_id for a in flagged} == {"ACC1"}
+    assert flagged[0].anomaly_type == "money_velocity"
+    assert flagged[0].details["event_count"] == 2
+    assert flagged[0].details["window_total"] == 120_000
+
+
+def test_call_burst_against_own_baseline(graph):
+    steady = [call("P1", "P2", T0 + 86400 * d) for d in range(30)]
+    burst = [call("P1", "P3", T0 + 86400 * 30 + i) for i in range(12)]
+    flagged = VelocityDetector(graph(steady + burst)).detect(windows=["1m"], entity_ids=["P1"])
+    assert [(a.entity_id, a.details["event_count"]) for a in flagged] == [("P1", 12)]